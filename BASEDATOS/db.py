@@ -67,6 +67,10 @@ def guardar_venta(usuario: str, carrito: list[dict], tipo_venta: str = "Normal")
     """Guarda una venta con sus detalles"""
     return VentasBuilder.guardar_venta(usuario, carrito, tipo_venta)
 
+def procesar_venta(usuario: str, carrito: list[dict], tipo_venta: str = "Normal", auditoria: tuple = None):
+    """Descuenta stock, guarda la venta y su auditoría en una sola transacción"""
+    return VentasBuilder.procesar_venta(usuario, carrito, tipo_venta, auditoria)
+
 def obtener_detalle_venta(venta_id: int):
     """Obtiene los detalles de una venta específica"""
     try:
@@ -121,9 +125,14 @@ def registrar_auditoria(usuario: str, tipo: str, descripcion: str, detalles: str
     """Registra una acción en la auditoría"""
     return VentasBuilder.registrar_auditoria(usuario, tipo, descripcion, detalles)
 
+def metricas_auditoria():
+    """Profundidad de la cola de auditoría, eventos escritos, descartados y errores"""
+    return VentasBuilder.sumidero_auditoria().metricas()
+
 def obtener_auditoria(usuario: str = None, tipo: str = None, fecha_inicio: str = None, fecha_fin: str = None, limite: int = 1000):
     """Obtiene registros de auditoría con filtros opcionales"""
     try:
+        VentasBuilder.vaciar_auditoria()   # incluir eventos aún en cola
         con = get_conexion()
         cur = con.cursor()
         
@@ -146,7 +155,9 @@ def obtener_auditoria(usuario: str = None, tipo: str = None, fecha_inicio: str =
             query += " AND fecha_hora <= ?"
             params.append(fecha_fin)
         
-        query += " ORDER BY id DESC LIMIT ?"
+        # fecha_hora acompaña al id (se inserta con la hora actual) y así
+        # el orden lo resuelven los índices idx_auditoria_*
+        query += " ORDER BY fecha_hora DESC, id DESC LIMIT ?"
         params.append(limite)
         
         cur.execute(query, params)
@@ -161,6 +172,7 @@ def obtener_auditoria(usuario: str = None, tipo: str = None, fecha_inicio: str =
 def obtener_estadisticas_auditoria():
     """Obtiene estadísticas generales de auditoría"""
     try:
+        VentasBuilder.vaciar_auditoria()   # incluir eventos aún en cola
         con = get_conexion()
         cur = con.cursor()
         
@@ -194,6 +206,7 @@ def obtener_estadisticas_auditoria():
 def eliminar_registros_auditoria(fecha_inicio: str = None, fecha_fin: str = None, tipo: str = None, usuario: str = None):
     """Elimina registros de auditoría con filtros opcionales"""
     try:
+        VentasBuilder.vaciar_auditoria()   # incluir eventos aún en cola
         con = get_conexion()
         cur = con.cursor()
         
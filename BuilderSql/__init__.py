@@ -8,11 +8,30 @@ from .proveedores_builder import ProveedoresBuilder
 from .ventas_builder import VentasBuilder
 from .usuarios_builder import UsuariosBuilder
 from .contratos_builder import ContratosBuilder
+from .pool_conexiones import ConexionPool, obtener_conexion, metricas_pools, cerrar_pools
+from .migraciones import aplicar_migraciones
+from .gateway_datos import GatewayDatos, obtener_gateway
+from .catalogo_productos import CatalogoProductos, obtener_catalogo
+from .indice_busqueda import IndiceBusqueda, normalizar_texto
+from .planificador_ui import PlanificadorUI, obtener_planificador
 
 __all__ = [
     'ProductosBuilder',
     'ProveedoresBuilder', 
     'VentasBuilder',
     'UsuariosBuilder',
-    'ContratosBuilder'
+    'ContratosBuilder',
+    'ConexionPool',
+    'obtener_conexion',
+    'metricas_pools',
+    'cerrar_pools',
+    'aplicar_migraciones',
+    'GatewayDatos',
+    'obtener_gateway',
+    'CatalogoProductos',
+    'obtener_catalogo',
+    'IndiceBusqueda',
+    'normalizar_texto',
+    'PlanificadorUI',
+    'obtener_planificador'
 ]
@@ -0,0 +1,292 @@
+"""
+CatalogoProductos - Caché en memoria del catálogo de productos
+Una sola copia por proceso de los productos activos (RegistroProducto),
+indexada por id y por código de barras. Se mantiene al día leyendo la bitácora productos_cambios
+(llenada por triggers), así que solo se vuelven a leer las filas que cambiaron
+"""
+
+import threading
+from collections import deque
+from datetime import date
+
+from .paginacion import codificar_cursor, decodificar_cursor
+from .productos_builder import ProductosBuilder
+from .registros import RegistroProducto
+
+
+class CatalogoProductos:
+    """Vista compacta e indexada de la tabla productos (solo activos)"""
+
+    # Columnas que definen el orden/membresía de las vistas ordenadas; si
+    # cambian hay que reordenar, si no (ej: stock) basta actualizar en sitio
+    COLUMNAS_ORDEN = ("activo", "nombre", "destacado", "creado_en")
+
+    # Órdenes disponibles para vista(): nombre -> (llave, descendente)
+    ORDENES = {
+        "nombre": (lambda p: (p.nombre or "", p.id), False),
+        "catalogo": (lambda p: (p.destacado or 0, p.creado_en or "", p.id), True),
+    }
+
+    # Renglones de bitácora que se conservan; los lectores más atrasados recargan todo
+    MAX_BITACORA = 20_000
+
+    # Cambios recientes recordados para cambios_desde()
+    MAX_HISTORIAL = 256
+
+    def __init__(self, builder=ProductosBuilder):
+        self._builder = builder
+        self._lock = threading.RLock()
+        self._por_id = {}
+        self._por_codigo = {}
+        self._vistas = {}
+        self._secuencia = None
+        self._dia_tarifas = None
+        self._historial = deque(maxlen=self.MAX_HISTORIAL)
+        self._metricas = {
+            "cargas_completas": 0,
+            "sincronizaciones": 0,
+            "filas_releidas": 0,
+        }
+
+    # ==================== SINCRONIZACIÓN ====================
+
+    def sincronizar(self) -> set:
+        """
+        Aplica los cambios registrados en productos_cambios desde la última vez
+        Returns:
+            set: ids que cambiaron (vacío si nada cambió)
+        """
+        with self._lock:
+            with self._builder.get_conexion() as conn:
+                if self._secuencia is None:
+                    self._builder.inicializar_bd()
+                minimo, maximo = conn.execute(
+                    "SELECT MIN(seq), MAX(seq) FROM productos_cambios"
+                ).fetchone()
+                maximo = maximo or 0
+                hoy = date.today().isoformat()
+                if hoy != self._dia_tarifas and self._secuencia is not None:
+                    # Cambió el día: las promociones pueden entrar o salir de vigencia
+                    for registro in self._por_id.values():
+                        registro.calcular_tarifas(hoy)
+                self._dia_tarifas = hoy
+                if self._secuencia == maximo:
+                    return set()
+
+                if self._secuencia is None or (minimo is not None and self._secuencia < minimo - 1):
+                    # Primera carga o la bitácora ya se recortó más allá de nuestra posición
+                    ids = self._cargar_todo(conn)
+                    self._historial.clear()
+                else:
+                    ids = {
+                        fila[0] for fila in conn.execute(
+                            "SELECT DISTINCT producto_id FROM productos_cambios WHERE seq > ?",
+                            (self._secuencia,),
+                        )
+                    }
+                    self._aplicar(conn, ids)
+                    self._historial.append((self._secuencia, maximo, ids))
+
+                self._secuencia = maximo
+                self._metricas["sincronizaciones"] += 1
+                if minimo is not None and maximo - minimo > self.MAX_BITACORA:
+                    conn.execute(
+                        "DELETE FROM productos_cambios WHERE seq <= ?",
+                        (maximo - self.MAX_BITACORA // 2,),
+                    )
+                    conn.commit()
+                return ids
+
+    def _leer(self, conn, sql: str, params=()) -> list:
+        """Filas de productos como RegistroProducto (tuplas, sin sqlite3.Row intermedio)"""
+        cur = conn.cursor()
+        cur.row_factory = None
+        cur.execute(f"SELECT {RegistroProducto.COLUMNAS_SQL} FROM productos WHERE {sql}", params)
+        desde_fila = RegistroProducto.desde_fila
+        hoy = self._dia_tarifas or date.today().isoformat()
+        registros = [desde_fila(fila) for fila in cur]
+        for registro in registros:
+            registro.calcular_tarifas(hoy)
+        return registros
+
+    def _cargar_todo(self, conn) -> set:
+        registros = self._leer(conn, "activo = 1")
+        self._por_id = {p.id: p for p in registros}
+        self._por_codigo = {
+            p.codigo_barras.strip(): p for p in registros if p.codigo_barras
+        }
+        self._vistas = {}
+        self._metricas["cargas_completas"] += 1
+        return set(self._por_id)
+
+    def _aplicar(self, conn, ids: set):
+        """Vuelve a leer solo los productos indicados"""
+        if not ids:
+            return
+        encontrados = {}
+        lista = list(ids)
+        # Lotes para no rebasar el límite de parámetros de SQLite
+        for i in range(0, len(lista), 500):
+            lote = lista[i:i + 500]
+            marcadores = ",".join("?" * len(lote))
+            for registro in self._leer(conn, f"id IN ({marcadores})", lote):
+                encontrados[registro.id] = registro
+        self._metricas["filas_releidas"] += len(encontrados)
+
+        for producto_id in ids:
+            nuevo = encontrados.get(producto_id)
+            actual = self._por_id.get(producto_id)
+            if nuevo is not None and not nuevo.activo:
+                nuevo = None
+
+            if actual is not None:
+                if actual.codigo_barras:
+                    self._por_codigo.pop(actual.codigo_barras.strip(), None)
+                if nuevo is None:
+                    del self._por_id[producto_id]
+                    self._vistas = {}
+                    continue
+                if any(getattr(actual, c) != getattr(nuevo, c) for c in self.COLUMNAS_ORDEN):
+                    self._vistas = {}
+                # Mismo registro: las vistas ordenadas ven el cambio sin reordenar
+                actual.actualizar(nuevo)
+                nuevo = actual
+            elif nuevo is None:
+                continue
+            else:
+                self._por_id[producto_id] = nuevo
+                self._vistas = {}
+
+            if nuevo.codigo_barras:
+                self._por_codigo[nuevo.codigo_barras.strip()] = nuevo
+
+    # ==================== LECTURA ====================
+
+    def obtener(self, producto_id: int):
+        """Producto activo por id (o None)"""
+        self.sincronizar()
+        return self._por_id.get(producto_id)
+
+    def por_codigo(self, codigo_barras: str):
+        """Producto activo por código de barras (o None)"""
+        self.sincronizar()
+        return self._por_codigo.get((codigo_barras or "").strip())
+
+    def obtener_varios(self, ids) -> list:
+        """Productos activos de una colección de ids (omite los que no existen)"""
+        self.sincronizar()
+        por_id = self._por_id
+        return [por_id[i] for i in ids if i in por_id]
+
+    def vista(self, orden: str = "nombre") -> list:
+        """
+        Productos activos ordenados según ORDENES[orden]
+        La lista se comparte: no debe modificarse
+        """
+        self.sincronizar()
+        with self._lock:
+            lista = self._vistas.get(orden)
+            if lista is None:
+                llave, descendente = self.ORDENES[orden]
+                lista = sorted(self._por_id.values(), key=llave, reverse=descendente)
+                self._vistas[orden] = lista
+            return lista
+
+    def instantanea(self, orden: str = "nombre"):
+        """
+        Vista ordenada junto con la secuencia a la que corresponde
+        Returns:
+            tuple: (secuencia, lista); usar la secuencia con cambios_desde()
+        """
+        with self._lock:
+            lista = self.vista(orden)
+            return self._secuencia, lista
+
+    def pagina(self, orden: str, filtro=None, cursor=None, limite: int = 12):
+        """
+        Página de una vista ordenada (paginación por llave, en memoria)
+        Args:
+            orden: llave de ORDENES
+            filtro: función producto -> bool (None para todos)
+            cursor: valor devuelto por la página anterior (None para la primera);
+                    mismo cursor opaco que ProductosBuilder.pagina_productos
+            limite: productos por página
+        Returns:
+            tuple: (lista de productos, cursor siguiente o None si ya no hay más)
+        Raises:
+            ValueError: si el cursor no es válido para ese orden
+        """
+        lista = self.vista(orden)
+        llave, descendente = self.ORDENES[orden]
+        if not lista:
+            return [], None
+        inicio = 0
+        if cursor:
+            objetivo = tuple(decodificar_cursor(cursor, len(llave(lista[0]))))
+            inicio = self._posicion_despues(lista, objetivo, llave, descendente)
+        resultado = []
+        for i in range(inicio, len(lista)):
+            producto = lista[i]
+            if filtro is not None and not filtro(producto):
+                continue
+            if len(resultado) == limite:
+                # Hay al menos uno más: la siguiente página empieza después del último
+                return resultado, codificar_cursor(llave(resultado[-1]))
+            resultado.append(producto)
+        return resultado, None
+
+    @staticmethod
+    def _posicion_despues(lista, objetivo, llave, descendente) -> int:
+        """Búsqueda binaria de la primera posición posterior a la llave objetivo"""
+        bajo, alto = 0, len(lista)
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            valor = llave(lista[medio])
+            if (valor >= objetivo) if descendente else (valor <= objetivo):
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+
+    def cambios_desde(self, secuencia):
+        """
+        Ids que cambiaron después de 'secuencia' (para consumidores con copia propia)
+        Returns:
+            tuple: (secuencia_actual, set de ids o None si hay que recargar todo)
+        """
+        self.sincronizar()
+        with self._lock:
+            # El historial cubre los cambios desde la secuencia previa a su primera entrada
+            cubre_desde = self._historial[0][0] if self._historial else self._secuencia
+            if secuencia is None or secuencia < cubre_desde:
+                return self._secuencia, None
+            ids = set()
+            for _antes, despues, cambiados in self._historial:
+                if despues > secuencia:
+                    ids |= cambiados
+            return self._secuencia, ids
+
+    @property
+    def secuencia(self):
+        return self._secuencia
+
+    def metricas(self) -> dict:
+        with self._lock:
+            datos = dict(self._metricas)
+            datos["productos"] = len(self._por_id)
+            datos["secuencia"] = self._secuencia
+        return datos
+
+
+_catalogo = None
+_catalogo_lock = threading.Lock()
+
+
+def obtener_catalogo() -> CatalogoProductos:
+    """Catálogo compartido por toda la aplicación"""
+    global _catalogo
+    if _catalogo is None:
+        with _catalogo_lock:
+            if _catalogo is None:
+                _catalogo = CatalogoProductos()
+    return _catalogo
@@ -7,43 +7,56 @@ import sqlite3
 from datetime import datetime
 from pathlib import Path
 
+from .pool_conexiones import obtener_conexion
+from .migraciones import aplicar_migraciones
+
 
 class ContratosBuilder:
     """Constructor de base de datos de contratos de empleados"""
     
     DB_PATH = Path("./BASEDATOS/contratos.db")
     
+    # ==================== ESQUEMAS SQL ====================
+    
+    SCHEMA_CONTRATOS = """
+        CREATE TABLE IF NOT EXISTS contratos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre_empleado TEXT NOT NULL,
+            puesto TEXT NOT NULL,
+            fecha_inicio TEXT NOT NULL,
+            salario REAL NOT NULL,
+            frecuencia_pago TEXT NOT NULL,
+            tipo_contrato TEXT NOT NULL,
+            estado TEXT NOT NULL DEFAULT 'Activo',
+            fecha_fin TEXT,
+            notas TEXT,
+            fecha_creacion TEXT NOT NULL,
+            fecha_modificacion TEXT
+        )
+    """
+    
+    # ==================== MIGRACIONES ====================
+    
+    # (version, descripcion, pasos) — nunca modificar una versión ya publicada
+    MIGRACIONES = [
+        (1, "tabla contratos", [
+            SCHEMA_CONTRATOS,
+        ]),
+    ]
+    
     # ==================== MÉTODOS ====================
     
     @classmethod
     def get_conexion(cls) -> sqlite3.Connection:
-        """Retorna una conexión a la base de datos"""
-        cls.DB_PATH.parent.mkdir(exist_ok=True)
-        return sqlite3.connect(str(cls.DB_PATH), check_same_thread=False)
+        """Retorna una conexión (del pool compartido) a la base de datos"""
+        return obtener_conexion(cls.DB_PATH)
     
     @classmethod
     def inicializar_bd(cls):
-        """Crea la tabla de contratos si no existe"""
+        """Aplica las migraciones pendientes de la base de datos de contratos"""
         with cls.get_conexion() as conn:
-            cur = conn.cursor()
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS contratos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre_empleado TEXT NOT NULL,
-                    puesto TEXT NOT NULL,
-                    fecha_inicio TEXT NOT NULL,
-                    salario REAL NOT NULL,
-                    frecuencia_pago TEXT NOT NULL,
-                    tipo_contrato TEXT NOT NULL,
-                    estado TEXT NOT NULL DEFAULT 'Activo',
-                    fecha_fin TEXT,
-                    notas TEXT,
-                    fecha_creacion TEXT NOT NULL,
-                    fecha_modificacion TEXT
-                )
-            """)
-            conn.commit()
-            print("✅ Tabla 'contratos' inicializada")
+            if aplicar_migraciones(conn, cls.MIGRACIONES):
+                print("✅ Tabla 'contratos' inicializada")
     
     @classmethod
     def crear_contrato(cls, datos: dict) -> bool:
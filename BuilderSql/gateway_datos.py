@@ -0,0 +1,147 @@
+"""
+GatewayDatos - Acceso asíncrono a las bases SQLite para la interfaz Flet
+Las lecturas corren en un pool acotado de hilos y las escrituras en un único
+hilo escritor con cola (ventas, productos, ajustes de stock y lotes de
+auditoría), así las escrituras de la interfaz no compiten entre sí y los
+manejadores de eventos no bloquean la interfaz
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class GatewayDatos:
+    """Puerta de acceso asíncrona delante de los builders"""
+
+    MAX_LECTORES = 4
+
+    def __init__(self, max_lectores: int = None):
+        self._lectores = ThreadPoolExecutor(
+            max_workers=max_lectores or self.MAX_LECTORES,
+            thread_name_prefix="gateway-lector",
+        )
+        self._cola_escritura = queue.Queue()
+        self._escritor = None
+        self._lock = threading.Lock()
+        self._generaciones = {}
+
+    # ==================== ESCRITOR SERIALIZADO ====================
+
+    def _asegurar_escritor(self):
+        with self._lock:
+            if self._escritor is None or not self._escritor.is_alive():
+                self._escritor = threading.Thread(
+                    target=self._bucle_escritor, name="gateway-escritor", daemon=True
+                )
+                self._escritor.start()
+
+    def _bucle_escritor(self):
+        while True:
+            tarea = self._cola_escritura.get()
+            if tarea is None:
+                self._cola_escritura.task_done()
+                return
+            futuro, funcion, args, kwargs = tarea
+            if futuro.set_running_or_notify_cancel():
+                try:
+                    futuro.set_result(funcion(*args, **kwargs))
+                except BaseException as e:
+                    futuro.set_exception(e)
+            self._cola_escritura.task_done()
+
+    def enviar_escritura(self, funcion, *args, **kwargs) -> Future:
+        """Encola una escritura; devuelve un concurrent.futures.Future"""
+        self._asegurar_escritor()
+        futuro = Future()
+        self._cola_escritura.put((futuro, funcion, args, kwargs))
+        return futuro
+
+    def enviar_lectura(self, funcion, *args, **kwargs) -> Future:
+        """Ejecuta una lectura en el pool de lectores"""
+        return self._lectores.submit(funcion, *args, **kwargs)
+
+    # ==================== API AWAITABLE ====================
+
+    async def leer(self, funcion, *args, **kwargs):
+        """Await de una lectura (ej: await gateway.leer(VentasBuilder.ventas_del_dia, 'ana'))"""
+        return await asyncio.wrap_future(self.enviar_lectura(funcion, *args, **kwargs))
+
+    async def escribir(self, funcion, *args, **kwargs):
+        """Await de una escritura serializada en el hilo escritor"""
+        return await asyncio.wrap_future(self.enviar_escritura(funcion, *args, **kwargs))
+
+    # ==================== INTEGRACIÓN CON FLET ====================
+
+    def en_pagina(self, page, funcion, *args, al_terminar=None, al_fallar=None,
+                  clave: str = None, escritura: bool = False):
+        """
+        Corre funcion(*args) fuera del hilo de la interfaz y entrega el
+        resultado a al_terminar(resultado) mediante page.run_task
+        Args:
+            page: ft.Page donde se entregará el resultado
+            funcion: consulta a ejecutar (bloqueante)
+            al_terminar: callback con el resultado
+            al_fallar: callback con la excepción (por defecto se imprime)
+            clave: si se indica, solo se entrega el resultado de la solicitud
+                   más reciente con esa clave (descarta búsquedas obsoletas)
+            escritura: True para mandarla por el hilo escritor
+        """
+        generacion = None
+        if clave is not None:
+            with self._lock:
+                generacion = self._generaciones.get(clave, 0) + 1
+                self._generaciones[clave] = generacion
+
+        async def _tarea():
+            try:
+                if escritura:
+                    resultado = await self.escribir(funcion, *args)
+                else:
+                    resultado = await self.leer(funcion, *args)
+            except Exception as e:
+                if al_fallar:
+                    al_fallar(e)
+                else:
+                    print(f"Error en gateway ({getattr(funcion, '__name__', funcion)}): {e}")
+                return
+            if generacion is not None and self._generaciones.get(clave) != generacion:
+                return
+            if al_terminar:
+                al_terminar(resultado)
+
+        return page.run_task(_tarea)
+
+    # ==================== ADMINISTRACIÓN ====================
+
+    def descartar(self, clave: str):
+        """Descarta los resultados pendientes de esa clave (no se entregará ninguno)"""
+        with self._lock:
+            self._generaciones[clave] = self._generaciones.get(clave, 0) + 1
+
+    def pendientes_escritura(self) -> int:
+        """Escrituras en cola"""
+        return self._cola_escritura.qsize()
+
+    def cerrar(self, esperar: bool = True):
+        """Detiene el escritor (tras vaciar la cola) y el pool de lectores"""
+        if self._escritor is not None and self._escritor.is_alive():
+            self._cola_escritura.put(None)
+            if esperar:
+                self._escritor.join()
+        self._lectores.shutdown(wait=esperar)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def obtener_gateway() -> GatewayDatos:
+    """Gateway compartido por toda la aplicación"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = GatewayDatos()
+    return _gateway
@@ -0,0 +1,129 @@
+"""
+IndiceBusqueda - Índice de trigramas en memoria para buscar productos al teclear
+Se arma una vez por lista de productos (ej: al cargar la caja) y responde
+cada tecla sin tocar SQLite: sin acentos ni mayúsculas, con subcadenas en
+cualquier parte del nombre o del código, y reutilizando el resultado anterior
+cuando la consulta solo creció
+"""
+
+import threading
+import unicodedata
+from array import array
+from collections import defaultdict
+
+
+class _Plegado(dict):
+    """Tabla para str.translate que calcula (una vez) cada carácter sin diacríticos"""
+
+    def __missing__(self, codigo):
+        descompuesto = unicodedata.normalize("NFD", chr(codigo))
+        plegado = "".join(c for c in descompuesto if unicodedata.category(c) != "Mn")
+        self[codigo] = plegado
+        return plegado
+
+
+_PLEGADO = _Plegado()
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas y sin diacríticos ('Piña Jalapeño' -> 'pina jalapeno')"""
+    texto = (texto or "").lower()
+    if texto.isascii():
+        return texto
+    return texto.translate(_PLEGADO)
+
+
+class IndiceBusqueda:
+    """Postings de trigramas -> posiciones dentro de la lista de productos"""
+
+    TAMANO_GRAMA = 3
+
+    def __init__(self, productos: list, campos: tuple = ("nombre", "codigo_barras")):
+        """
+        Args:
+            productos: lista de registros (el índice guarda posiciones, no copias)
+            campos: atributos que se indexan
+        """
+        self._productos = productos
+        self._campos = campos
+        self._textos = None
+        self._postings = None
+        self._ultima = (None, None)
+        self._lock = threading.Lock()
+
+    def preparar(self):
+        """Arma el índice si aún no existe (caro: conviene llamarlo en un hilo aparte)"""
+        with self._lock:
+            if self._postings is None:
+                self._construir()
+        return self
+
+    def _construir(self):
+        n = self.TAMANO_GRAMA
+        textos = []
+        listas = defaultdict(list)
+        for posicion, producto in enumerate(self._productos):
+            texto = normalizar_texto(" ".join(
+                str(valor) for valor in (getattr(producto, campo) for campo in self._campos) if valor
+            ))
+            textos.append(texto)
+            for palabra in texto.split():
+                for i in range(len(palabra) - n + 1):
+                    lista = listas[palabra[i:i + n]]
+                    # Un trigrama repetido en el mismo producto se anota una vez
+                    if not lista or lista[-1] != posicion:
+                        lista.append(posicion)
+        self._textos = textos
+        self._postings = {grama: array("I", posiciones) for grama, posiciones in listas.items()}
+
+    def buscar(self, texto: str):
+        """
+        Posiciones (ordenadas) de los productos que contienen todas las palabras
+        Returns:
+            array | None: None si la consulta está vacía (sin filtro)
+        """
+        consulta = normalizar_texto(texto).strip()
+        palabras = consulta.split()
+        if not palabras:
+            return None
+        with self._lock:
+            if self._postings is None:
+                self._construir()
+            previa, resultado_previo = self._ultima
+            if previa is not None and consulta.startswith(previa):
+                # La consulta solo creció: el resultado es un subconjunto del anterior
+                candidatos = resultado_previo
+            else:
+                candidatos = self._candidatos(palabras)
+            textos = self._textos
+            for palabra in palabras:
+                if isinstance(candidatos, range):
+                    candidatos = [i for i, t in enumerate(textos) if palabra in t]
+                else:
+                    candidatos = [i for i in candidatos if palabra in textos[i]]
+            resultado = array("I", candidatos)
+            self._ultima = (consulta, resultado)
+            return resultado
+
+    def _candidatos(self, palabras: list):
+        """Intersección de postings de los trigramas; todo el rango si no hay trigramas"""
+        n = self.TAMANO_GRAMA
+        gramas = {p[i:i + n] for p in palabras for i in range(len(p) - n + 1)}
+        if not gramas:
+            return range(len(self._textos))
+        postings = []
+        for grama in gramas:
+            lista = self._postings.get(grama)
+            if lista is None:
+                return ()
+            postings.append(lista)
+        postings.sort(key=len)
+        comunes = set(postings[0])
+        for lista in postings[1:]:
+            comunes.intersection_update(lista)
+            if not comunes:
+                return ()
+        return sorted(comunes)
+
+    def __len__(self):
+        return len(self._productos)
@@ -0,0 +1,70 @@
+"""
+Migraciones - Motor de migraciones versionadas para las bases SQLite
+Usa PRAGMA user_version para saber qué pasos ya se aplicaron; una base
+al día solo cuesta leer un entero al iniciar
+"""
+
+import sqlite3
+
+
+# Cada migración es una tupla (version, descripcion, pasos).
+# Un paso es una sentencia SQL o una función que recibe el cursor.
+# Los pasos deben ser idempotentes: bases antiguas (user_version = 0)
+# pueden tener ya parte del esquema creado por versiones previas del sistema.
+
+
+def version_actual(conn: sqlite3.Connection) -> int:
+    """Lee PRAGMA user_version"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def columna_existe(cur, tabla: str, columna: str) -> bool:
+    """Verifica si una columna existe en una tabla"""
+    cur.execute(f"PRAGMA table_info({tabla})")
+    return any(row[1] == columna for row in cur.fetchall())
+
+
+def agregar_columna(tabla: str, columna: str, definicion: str):
+    """Paso idempotente: ALTER TABLE ADD COLUMN solo si falta la columna"""
+    def _paso(cur):
+        if not columna_existe(cur, tabla, columna):
+            cur.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+    return _paso
+
+
+def aplicar_migraciones(conn: sqlite3.Connection, migraciones: list) -> int:
+    """
+    Aplica en orden las migraciones pendientes dentro de una transacción
+    Args:
+        conn: conexión a la base de datos
+        migraciones: lista ordenada de (version, descripcion, pasos)
+    Returns:
+        int: número de migraciones aplicadas (0 si la base ya estaba al día)
+    """
+    objetivo = migraciones[-1][0] if migraciones else 0
+    if version_actual(conn) >= objetivo:
+        return 0
+
+    # BEGIN IMMEDIATE bloquea a otros escritores (otra caja abriendo la misma base)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        actual = version_actual(conn)
+        cur = conn.cursor()
+        aplicadas = 0
+        for version, descripcion, pasos in migraciones:
+            if version <= actual:
+                continue
+            for paso in pasos:
+                if callable(paso):
+                    paso(cur)
+                else:
+                    cur.execute(paso)
+            # PRAGMA no acepta parámetros; version siempre es un int propio
+            cur.execute(f"PRAGMA user_version = {int(version)}")
+            aplicadas += 1
+            print(f"  ↳ Migración v{version}: {descripcion}")
+        conn.commit()
+        return aplicadas
+    except Exception:
+        conn.rollback()
+        raise
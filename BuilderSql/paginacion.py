@@ -0,0 +1,79 @@
+"""
+Paginacion - Paginación por llave (keyset / seek) para listados con scroll
+En lugar de LIMIT/OFFSET, cada página continúa desde la llave de orden de
+la última fila entregada, así la página 500 cuesta lo mismo que la primera
+"""
+
+import base64
+import json
+
+
+def codificar_cursor(valores) -> str:
+    """Convierte la llave de orden de la última fila en un cursor opaco"""
+    crudo = json.dumps(list(valores), separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(crudo.encode("utf-8")).decode("ascii")
+
+
+def decodificar_cursor(cursor: str, num_columnas: int) -> list:
+    """Recupera la llave de un cursor; ValueError si no es válido"""
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Cursor de paginación inválido: {cursor!r}") from e
+    if not isinstance(valores, list) or len(valores) != num_columnas:
+        raise ValueError(f"Cursor de paginación inválido: {cursor!r}")
+    return valores
+
+
+def consultar_pagina(conn, columnas: str, desde: str, condiciones: list, params: list,
+                     orden: list, descendente: bool, cursor: str = None, limite: int = 20):
+    """
+    Ejecuta una consulta paginada por llave
+    Args:
+        conn: conexión a la base
+        columnas: lista de columnas del SELECT (ej: "p.*")
+        desde: cláusula FROM sin la palabra FROM (ej: "productos p")
+        condiciones: fragmentos WHERE que se unen con AND
+        params: parámetros de las condiciones
+        orden: expresiones de orden; la última debe ser única (normalmente id).
+               Deben coincidir con las de un índice compuesto y no dar NULL
+        descendente: True para ORDER BY ... DESC en todas las expresiones
+        cursor: valor devuelto por la página anterior (None para la primera)
+        limite: filas por página
+    Returns:
+        tuple: (filas como dict, cursor_siguiente); cursor_siguiente es None en la última página
+    """
+    condiciones = list(condiciones)
+    params = list(params)
+    if cursor:
+        llave = decodificar_cursor(cursor, len(orden))
+        comparador = "<" if descendente else ">"
+        marcadores = ", ".join("?" * len(orden))
+        condiciones.append(f"({', '.join(orden)}) {comparador} ({marcadores})")
+        params.extend(llave)
+
+    # La llave de orden viaja al final de cada fila como _k0, _k1, ...
+    llaves = [f"_k{i}" for i in range(len(orden))]
+    sql = f"SELECT {columnas}, " + ", ".join(
+        f"{expr} AS {alias}" for expr, alias in zip(orden, llaves)
+    ) + f" FROM {desde}"
+    if condiciones:
+        sql += " WHERE " + " AND ".join(condiciones)
+    sentido = " DESC" if descendente else ""
+    sql += " ORDER BY " + ", ".join(expr + sentido for expr in orden)
+    # Una fila de más indica si hay otra página sin necesidad de COUNT
+    sql += " LIMIT ?"
+    params.append(limite + 1)
+
+    cur = conn.execute(sql, params)
+    nombres = [d[0] for d in cur.description]
+    filas = [dict(zip(nombres, fila)) for fila in cur.fetchall()]
+
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = codificar_cursor(filas[-1][alias] for alias in llaves)
+    for fila in filas:
+        for alias in llaves:
+            del fila[alias]
+    return filas, siguiente
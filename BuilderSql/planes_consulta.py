@@ -0,0 +1,59 @@
+"""
+PlanesConsulta - Verificación de planes de ejecución
+Corre EXPLAIN QUERY PLAN sobre las consultas conocidas de los builders y
+reporta las que recorren una tabla completa (SCAN) en lugar de usar un índice.
+Un "SCAN ... USING INDEX" es un recorrido en orden de índice: solo se acepta
+si la consulta tiene LIMIT (sin él recorre el índice completo)
+
+Uso desde la raíz del proyecto:
+    python -m BuilderSql.planes_consulta
+"""
+
+import re
+import sqlite3
+import sys
+
+_LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+
+def detalle_plan(conn: sqlite3.Connection, sql: str, params=()) -> list:
+    """Devuelve las líneas de detalle de EXPLAIN QUERY PLAN"""
+    return [fila[3] for fila in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+
+def consultas_con_scan(conn: sqlite3.Connection, consultas: list) -> list:
+    """
+    Revisa una lista de (nombre, sql, params)
+    Returns:
+        list: (nombre, detalle) por cada paso del plan que sea un SCAN sin
+              índice, o un SCAN en orden de índice en una consulta sin LIMIT
+    """
+    fallas = []
+    for nombre, sql, params in consultas:
+        con_limite = bool(_LIMIT.search(sql))
+        for detalle in detalle_plan(conn, sql, params):
+            if detalle.startswith("SCAN") and not ("USING" in detalle and con_limite):
+                fallas.append((nombre, detalle))
+    return fallas
+
+
+def verificar_builders() -> bool:
+    """Migra y verifica todas las bases conocidas; imprime el resultado"""
+    from .ventas_builder import VentasBuilder
+    from .productos_builder import ProductosBuilder
+    from .proveedores_builder import ProveedoresBuilder
+
+    ok = True
+    for builder in (VentasBuilder, ProductosBuilder, ProveedoresBuilder):
+        builder.inicializar_bd()
+        fallas = builder.verificar_planes()
+        for nombre, detalle in fallas:
+            print(f"❌ {builder.__name__}: {nombre} -> {detalle}")
+        if not fallas:
+            print(f"✓ {builder.__name__}: {len(builder.CONSULTAS_INDEXADAS)} consultas usan índices")
+        ok = ok and not fallas
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verificar_builders() else 1)
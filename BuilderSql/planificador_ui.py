@@ -0,0 +1,124 @@
+"""
+PlanificadorUI - Actualizaciones de la interfaz agrupadas por cuadro
+Las pantallas marcan los controles que cambiaron y el planificador los manda
+juntos en un solo page.update(*controles), a lo más una vez por cuadro, en
+lugar de un page.update() completo por cada cambio. Se puede llamar desde
+hilos de trabajo y cuenta cuántos envíos hace cada pantalla
+"""
+
+import asyncio
+import threading
+import weakref
+
+
+class PlanificadorUI:
+    """Controles pendientes de una página y el envío agrupado de sus cambios"""
+
+    CUADRO = 1 / 60     # segundos que se juntan cambios antes de enviarlos
+
+    def __init__(self, page):
+        self.page = page
+        self._lock = threading.Lock()
+        self._pendientes = {}           # id(control) -> control, en orden de llegada
+        self._pagina_completa = False
+        self._pantallas = set()         # pantallas con cambios en el cuadro actual
+        self._programado = False
+        self._metricas = {}
+
+    def actualizar(self, *controles, pantalla: str = "general"):
+        """
+        Marca controles para enviarlos en el próximo cuadro
+        Sin controles se envía la página completa (ej: se abrió un overlay)
+        Args:
+            controles: controles que cambiaron
+            pantalla: nombre con el que se cuentan los envíos
+        """
+        with self._lock:
+            if controles:
+                for control in controles:
+                    self._pendientes[id(control)] = control
+            else:
+                self._pagina_completa = True
+            self._pantallas.add(pantalla)
+            self._contador(pantalla)["solicitudes"] += 1
+            if self._programado:
+                return
+            self._programado = True
+        try:
+            self.page.run_task(self._enviar_en_cuadro)
+        except Exception:
+            # Sin ciclo de eventos de Flet (ej: la página aún no arranca): se envía ya
+            self.enviar()
+
+    async def _enviar_en_cuadro(self):
+        await asyncio.sleep(self.CUADRO)
+        self.enviar()
+
+    def enviar(self):
+        """Envía ya los cambios pendientes en un solo mensaje al cliente"""
+        with self._lock:
+            controles = list(self._pendientes.values())
+            completa = self._pagina_completa
+            pantallas = self._pantallas
+            self._pendientes = {}
+            self._pagina_completa = False
+            self._pantallas = set()
+            self._programado = False
+        if not controles and not completa:
+            return
+
+        envios = 1
+        try:
+            if completa:
+                self.page.update()
+            else:
+                self.page.update(*controles)
+        except Exception:
+            # Algún control ya no está en la página: se mandan uno por uno los que sí
+            envios = 0
+            for control in controles:
+                try:
+                    control.update()
+                    envios += 1
+                except Exception:
+                    pass
+
+        with self._lock:
+            for pantalla in pantallas:
+                contador = self._contador(pantalla)
+                contador["envios"] += envios
+                contador["controles"] += len(controles)
+                if completa:
+                    contador["paginas_completas"] += 1
+
+    def _contador(self, pantalla: str) -> dict:
+        contador = self._metricas.get(pantalla)
+        if contador is None:
+            contador = self._metricas[pantalla] = {
+                "solicitudes": 0, "envios": 0, "controles": 0, "paginas_completas": 0,
+            }
+        return contador
+
+    def metricas(self) -> dict:
+        """
+        Contadores por pantalla
+        Returns:
+            dict: {pantalla: {"solicitudes", "envios", "controles", "paginas_completas"}}
+                  solicitudes son las llamadas a actualizar(); envios los
+                  mensajes que realmente salieron hacia el cliente
+        """
+        with self._lock:
+            return {pantalla: dict(contador) for pantalla, contador in self._metricas.items()}
+
+
+_planificadores = weakref.WeakKeyDictionary()
+_lock_planificadores = threading.Lock()
+
+
+def obtener_planificador(page) -> PlanificadorUI:
+    """Planificador de la página (uno por página, compartido entre pantallas)"""
+    with _lock_planificadores:
+        planificador = _planificadores.get(page)
+        if planificador is None:
+            planificador = _planificadores[page] = PlanificadorUI(page)
+        return planificador
@@ -0,0 +1,239 @@
+"""
+PoolConexiones - Pool compartido de conexiones SQLite
+Mantiene conexiones de larga vida por archivo de base de datos para que los
+builders y paneles no abran un archivo nuevo en cada operación
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class ConexionPooled(sqlite3.Connection):
+    """Conexión SQLite que regresa a su pool en lugar de cerrarse"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = None
+        self._prestada = False
+        self._hilo = threading.get_ident()
+        self._ultimo_uso = time.monotonic()
+        self._adjuntas = {}
+
+    def adjuntar(self, alias: str, ruta):
+        """ATTACH de otra base una sola vez por conexión física"""
+        ruta = os.path.abspath(ruta)
+        if self._adjuntas.get(alias) == ruta:
+            return
+        if alias in self._adjuntas:
+            self.execute(f"DETACH DATABASE {alias}")
+        self.execute(f"ATTACH DATABASE ? AS {alias}", (ruta,))
+        self._adjuntas[alias] = ruta
+
+    def __exit__(self, tipo, valor, traza):
+        # Mismo comportamiento que sqlite3 (commit/rollback) y después se libera
+        resultado = super().__exit__(tipo, valor, traza)
+        self.close()
+        return resultado
+
+    def close(self):
+        """Devuelve la conexión al pool (o la cierra si no pertenece a uno)"""
+        if self._pool is not None:
+            self._pool._liberar(self)
+        else:
+            super().close()
+
+    def cerrar_real(self):
+        """Cierra la conexión física"""
+        self._pool = None
+        super().close()
+
+
+class ConexionPool:
+    """Pool de conexiones para un único archivo de base de datos"""
+
+    MAX_INACTIVAS_POR_HILO = 4
+    INTERVALO_VERIFICACION = 30.0
+    CACHE_SENTENCIAS = 256
+
+    def __init__(self, ruta: Path):
+        self.ruta = Path(ruta)
+        self._lock = threading.Lock()
+        self._inactivas: dict[int, list[ConexionPooled]] = {}
+        self._inodo = None
+        self._metricas = {
+            "creadas": 0,
+            "reutilizadas": 0,
+            "descartadas": 0,
+            "fallos_salud": 0,
+            "prestadas": 0,
+        }
+
+    # ==================== PRÉSTAMO ====================
+
+    def obtener(self, row_factory=None) -> ConexionPooled:
+        """Presta una conexión, preferentemente una creada por el hilo actual"""
+        conn = None
+        while conn is None:
+            candidata = self._tomar_inactiva()
+            if candidata is None:
+                conn = self._crear()
+                break
+            if self._saludable(candidata):
+                conn = candidata
+                with self._lock:
+                    self._metricas["reutilizadas"] += 1
+            else:
+                candidata.cerrar_real()
+                with self._lock:
+                    self._metricas["fallos_salud"] += 1
+                    self._metricas["descartadas"] += 1
+
+        conn.row_factory = row_factory
+        conn._prestada = True
+        with self._lock:
+            self._metricas["prestadas"] += 1
+        return conn
+
+    def _tomar_inactiva(self):
+        """Saca una conexión inactiva respetando la afinidad de hilo"""
+        ident = threading.get_ident()
+        with self._lock:
+            pila = self._inactivas.get(ident)
+            if pila:
+                return pila.pop()
+
+            # Adoptar conexiones de hilos que ya terminaron
+            vivos = {t.ident for t in threading.enumerate()}
+            for otro, pila in list(self._inactivas.items()):
+                if otro in vivos:
+                    continue
+                if pila:
+                    conn = pila.pop()
+                    conn._hilo = ident
+                    return conn
+                del self._inactivas[otro]
+        return None
+
+    def _crear(self) -> ConexionPooled:
+        """Abre una conexión física nueva"""
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            str(self.ruta),
+            check_same_thread=False,
+            factory=ConexionPooled,
+            cached_statements=self.CACHE_SENTENCIAS,
+        )
+        conn._pool = self
+        with self._lock:
+            self._metricas["creadas"] += 1
+            if self._inodo is None:
+                self._inodo = self._inodo_actual()
+        return conn
+
+    def _liberar(self, conn: ConexionPooled):
+        """Recibe una conexión de regreso; descarta transacciones a medias"""
+        if not conn._prestada:
+            return
+        conn._prestada = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error:
+            conn.cerrar_real()
+            with self._lock:
+                self._metricas["prestadas"] -= 1
+                self._metricas["descartadas"] += 1
+            return
+
+        conn._ultimo_uso = time.monotonic()
+        with self._lock:
+            self._metricas["prestadas"] -= 1
+            pila = self._inactivas.setdefault(conn._hilo, [])
+            if len(pila) < self.MAX_INACTIVAS_POR_HILO:
+                pila.append(conn)
+                return
+            self._metricas["descartadas"] += 1
+        conn.cerrar_real()
+
+    # ==================== SALUD ====================
+
+    def _inodo_actual(self):
+        try:
+            st = os.stat(self.ruta)
+            return (st.st_dev, st.st_ino)
+        except OSError:
+            return None
+
+    def _saludable(self, conn: ConexionPooled) -> bool:
+        """Verifica conexiones que llevan tiempo inactivas"""
+        if time.monotonic() - conn._ultimo_uso < self.INTERVALO_VERIFICACION:
+            return True
+        # Si el archivo fue borrado o reemplazado la conexión apunta al viejo
+        if self._inodo_actual() != self._inodo:
+            self._inodo = None
+            return False
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    # ==================== ADMINISTRACIÓN ====================
+
+    def metricas(self) -> dict:
+        """Devuelve contadores del pool"""
+        with self._lock:
+            datos = dict(self._metricas)
+            datos["inactivas"] = sum(len(p) for p in self._inactivas.values())
+        datos["ruta"] = str(self.ruta)
+        return datos
+
+    def cerrar_todo(self):
+        """Cierra todas las conexiones inactivas"""
+        with self._lock:
+            pilas = list(self._inactivas.values())
+            self._inactivas.clear()
+        for pila in pilas:
+            for conn in pila:
+                conn.cerrar_real()
+
+
+_pools: dict[str, ConexionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def obtener_pool(ruta) -> ConexionPool:
+    """Devuelve el pool asociado a un archivo (uno por ruta absoluta)"""
+    clave = os.path.abspath(ruta)
+    pool = _pools.get(clave)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(clave)
+            if pool is None:
+                pool = ConexionPool(Path(ruta))
+                _pools[clave] = pool
+    return pool
+
+
+def obtener_conexion(ruta, row_factory=None) -> ConexionPooled:
+    """Presta una conexión del pool del archivo indicado"""
+    return obtener_pool(ruta).obtener(row_factory)
+
+
+def metricas_pools() -> list[dict]:
+    """Métricas de todos los pools activos"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [p.metricas() for p in pools]
+
+
+def cerrar_pools():
+    """Cierra todas las conexiones inactivas de todos los pools"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.cerrar_todo()
@@ -4,10 +4,14 @@ Contiene todas las definiciones de tablas y operaciones de la base de datos de p
 """
 
 import sqlite3
-import os
+import re
 from pathlib import Path
 from datetime import datetime
 
+from .pool_conexiones import obtener_conexion
+from .migraciones import aplicar_migraciones
+from .paginacion import consultar_pagina
+
 
 class ProductosBuilder:
     """Constructor de base de datos de productos"""
@@ -70,24 +74,338 @@ class ProductosBuilder:
         )
     """
     
+    # Orden del catálogo (destacados y más nuevos primero). Coincide con
+    # idx_productos_catalogo para que la paginación por llave sea un recorrido
+    # del índice; las columnas de la llave nunca quedan en NULL (ver triggers)
+    ORDEN_CATALOGO = ["p.destacado", "p.creado_en", "p.id"]
+    
+    INDICES = [
+        "UPDATE productos SET destacado = 0 WHERE destacado IS NULL",
+        "UPDATE productos SET creado_en = COALESCE(actualizado_en, '') WHERE creado_en IS NULL",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_productos_llave_orden
+        AFTER INSERT ON productos
+        WHEN NEW.destacado IS NULL OR NEW.creado_en IS NULL
+        BEGIN
+            UPDATE productos SET
+                destacado = COALESCE(NEW.destacado, 0),
+                creado_en = COALESCE(NEW.creado_en, CURRENT_TIMESTAMP)
+            WHERE id = NEW.id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_productos_llave_orden_upd
+        AFTER UPDATE OF destacado, creado_en ON productos
+        WHEN NEW.destacado IS NULL OR NEW.creado_en IS NULL
+        BEGIN
+            UPDATE productos SET
+                destacado = COALESCE(NEW.destacado, 0),
+                creado_en = COALESCE(NEW.creado_en, OLD.creado_en, CURRENT_TIMESTAMP)
+            WHERE id = NEW.id;
+        END
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_productos_catalogo
+        ON productos(activo, destacado, creado_en, id)
+        """,
+    ]
+    
+    # Índice de texto completo (contenido externo: no duplica la tabla).
+    # remove_diacritics hace que "cafe" encuentre "Café"; prefix acelera "caf*"
+    SCHEMA_PRODUCTOS_FTS = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS productos_fts USING fts5(
+            nombre, descripcion, codigo_barras,
+            content='productos', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """
+    
+    TRIGGERS_PRODUCTOS_FTS = [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_productos_fts_ins AFTER INSERT ON productos
+        BEGIN
+            INSERT INTO productos_fts(rowid, nombre, descripcion, codigo_barras)
+            VALUES(NEW.id, NEW.nombre, NEW.descripcion, NEW.codigo_barras);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_productos_fts_del AFTER DELETE ON productos
+        BEGIN
+            INSERT INTO productos_fts(productos_fts, rowid, nombre, descripcion, codigo_barras)
+            VALUES('delete', OLD.id, OLD.nombre, OLD.descripcion, OLD.codigo_barras);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_productos_fts_upd
+        AFTER UPDATE OF nombre, descripcion, codigo_barras ON productos
+        BEGIN
+            INSERT INTO productos_fts(productos_fts, rowid, nombre, descripcion, codigo_barras)
+            VALUES('delete', OLD.id, OLD.nombre, OLD.descripcion, OLD.codigo_barras);
+            INSERT INTO productos_fts(rowid, nombre, descripcion, codigo_barras)
+            VALUES(NEW.id, NEW.nombre, NEW.descripcion, NEW.codigo_barras);
+        END
+        """,
+    ]
+    
+    # Bitácora de cambios para la caché en memoria (CatalogoProductos):
+    # cada alta, cambio o baja deja el id del producto afectado
+    SCHEMA_PRODUCTOS_CAMBIOS = """
+        CREATE TABLE IF NOT EXISTS productos_cambios (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            producto_id INTEGER NOT NULL
+        )
+    """
+    
+    TRIGGERS_PRODUCTOS_CAMBIOS = [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_productos_cambios_ins AFTER INSERT ON productos
+        BEGIN
+            INSERT INTO productos_cambios(producto_id) VALUES(NEW.id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_productos_cambios_upd AFTER UPDATE ON productos
+        BEGIN
+            INSERT INTO productos_cambios(producto_id) VALUES(NEW.id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_productos_cambios_del AFTER DELETE ON productos
+        BEGIN
+            INSERT INTO productos_cambios(producto_id) VALUES(OLD.id);
+        END
+        """,
+    ]
+    
+    # Relevancia bm25: el nombre pesa más que el código y éste más que la descripción
+    RANGO_FTS = "bm25(productos_fts, 10.0, 1.0, 5.0)"
+    
+    # None = sin verificar; False si SQLite no trae FTS5 (se usa LIKE)
+    _fts_disponible = None
+    
+    # ==================== MIGRACIONES ====================
+    
+    # (version, descripcion, pasos) — nunca modificar una versión ya publicada
+    MIGRACIONES = [
+        (1, "tablas productos e historial_precios", [
+            SCHEMA_PRODUCTOS,
+            SCHEMA_HISTORIAL_PRECIOS,
+        ]),
+        (2, "llave de orden e índice compuesto para paginar el catálogo", INDICES),
+        (3, "índice de texto completo productos_fts", [
+            lambda cur: ProductosBuilder._crear_indice_fts(cur),
+        ]),
+        (4, "bitácora productos_cambios para la caché del catálogo", [
+            SCHEMA_PRODUCTOS_CAMBIOS,
+            *TRIGGERS_PRODUCTOS_CAMBIOS,
+        ]),
+    ]
+    
+    # Filtros rápidos del catálogo: nombre -> (condición, función que da los parámetros)
+    FILTROS_CATALOGO = {
+        "Stock Bajo": ("p.stock_actual <= p.stock_minimo", lambda: []),
+        "Nuevos Hoy": ("DATE(p.creado_en) = ?", lambda: [datetime.now().strftime("%Y-%m-%d")]),
+        "Destacados": ("p.destacado = 1", lambda: []),
+        "Normal": ("p.venta_normal_activa = 1", lambda: []),
+        "Mayoreo": ("p.venta_mayoreo_activa = 1", lambda: []),
+        "Promoción": ("p.venta_promocion_activa = 1", lambda: []),
+    }
+    
+    # Consultas que deben resolverse con índice (ver planes_consulta)
+    CONSULTAS_INDEXADAS = [
+        ("catálogo: primera página",
+         "SELECT p.* FROM productos p WHERE p.activo = 1 "
+         "ORDER BY p.destacado DESC, p.creado_en DESC, p.id DESC LIMIT 13", ()),
+        ("catálogo: página siguiente",
+         "SELECT p.* FROM productos p WHERE p.activo = 1 "
+         "AND (p.destacado, p.creado_en, p.id) < (?, ?, ?) "
+         "ORDER BY p.destacado DESC, p.creado_en DESC, p.id DESC LIMIT 13",
+         (0, "2024-01-01 00:00:00", 100)),
+    ]
+    
     # ==================== MÉTODOS ====================
     
     @classmethod
     def get_conexion(cls) -> sqlite3.Connection:
-        """Retorna una conexión a la base de datos de productos"""
-        os.makedirs(cls.DB_PATH.parent, exist_ok=True)
-        conn = sqlite3.connect(str(cls.DB_PATH), check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Retorna una conexión (del pool compartido) a la base de datos de productos"""
+        return obtener_conexion(cls.DB_PATH, row_factory=sqlite3.Row)
     
     @classmethod
     def inicializar_bd(cls):
-        """Inicializa la base de datos con todas las tablas necesarias"""
+        """Aplica las migraciones pendientes de la base de datos de productos"""
+        with cls.get_conexion() as conn:
+            if aplicar_migraciones(conn, cls.MIGRACIONES):
+                print("✓ Base de datos de productos inicializada")
+    
+    @classmethod
+    def _crear_indice_fts(cls, cur):
+        """Paso de migración: crea productos_fts, sus triggers y lo llena"""
+        try:
+            cur.execute(cls.SCHEMA_PRODUCTOS_FTS)
+        except sqlite3.OperationalError as e:
+            if "fts5" not in str(e):
+                raise
+            # SQLite compilado sin FTS5: la búsqueda sigue funcionando con LIKE
+            print("⚠️ SQLite sin FTS5; la búsqueda de productos usará LIKE")
+            return
+        for trigger in cls.TRIGGERS_PRODUCTOS_FTS:
+            cur.execute(trigger)
+        cur.execute("INSERT INTO productos_fts(productos_fts) VALUES('rebuild')")
+    
+    @classmethod
+    def fts_disponible(cls, conn=None) -> bool:
+        """Indica si existe productos_fts (se consulta una sola vez)"""
+        if cls._fts_disponible is None:
+            propia = conn is None
+            if propia:
+                conn = cls.get_conexion()
+            try:
+                # Las pantallas de búsqueda pueden abrirse antes que ProductosWindow
+                aplicar_migraciones(conn, cls.MIGRACIONES)
+                fila = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'productos_fts'"
+                ).fetchone()
+            finally:
+                if propia:
+                    conn.close()
+            cls._fts_disponible = fila is not None
+        return cls._fts_disponible
+    
+    @staticmethod
+    def expresion_busqueda(texto: str) -> str:
+        """
+        Convierte lo que escribe el usuario en una consulta FTS5 de prefijos
+        Ej: 'coca-cola 600' -> '"coca"* "cola"* "600"*' (todas las palabras deben aparecer)
+        """
+        palabras = re.findall(r"\w+", texto or "")
+        return " ".join(f'"{p}"*' for p in palabras)
+    
+    @classmethod
+    def condicion_busqueda(cls, texto: str, alias: str = "p", conn=None):
+        """
+        Fragmento WHERE para filtrar productos por texto
+        Returns:
+            tuple: (sql, params); usa productos_fts si existe, si no LIKE
+        """
+        expresion = cls.expresion_busqueda(texto)
+        if not expresion:
+            return "1 = 1", []
+        if cls.fts_disponible(conn):
+            return (f"{alias}.id IN (SELECT rowid FROM productos_fts WHERE productos_fts MATCH ?)",
+                    [expresion])
+        patron = f"%{texto}%"
+        return (f"({alias}.nombre LIKE ? OR {alias}.descripcion LIKE ? OR {alias}.codigo_barras LIKE ?)",
+                [patron, patron, patron])
+    
+    @classmethod
+    def coincidencias(cls, texto: str) -> set:
+        """Ids (sin orden de relevancia) de todos los productos que coinciden con el texto"""
+        if not cls.expresion_busqueda(texto):
+            return set()
+        try:
+            with cls.get_conexion() as conn:
+                condicion, params = cls.condicion_busqueda(texto, conn=conn)
+                return {r[0] for r in conn.execute(f"SELECT p.id FROM productos p WHERE {condicion}", params)}
+        except Exception as e:
+            print(f"Error buscando productos: {e}")
+            return set()
+    
+    @classmethod
+    def buscar_ids(cls, texto: str, limite: int = 500, solo_con_stock: bool = False) -> list:
+        """
+        Ids de productos activos que coinciden con el texto, del más al menos relevante
+        Args:
+            texto: lo que escribió el usuario
+            limite: máximo de resultados
+            solo_con_stock: True para omitir productos sin existencias
+        """
+        expresion = cls.expresion_busqueda(texto)
+        if not expresion:
+            return []
+        filtro_stock = " AND p.stock_actual > 0" if solo_con_stock else ""
+        try:
+            with cls.get_conexion() as conn:
+                if cls.fts_disponible(conn):
+                    # Primero se ordena dentro del índice y solo los mejores candidatos
+                    # se cruzan con productos; si los filtros dejan menos de 'limite'
+                    # se repite cruzando todas las coincidencias
+                    rows = conn.execute(f"""
+                        SELECT p.id FROM (
+                            SELECT rowid AS id, {cls.RANGO_FTS} AS rango FROM productos_fts
+                            WHERE productos_fts MATCH ? ORDER BY rango LIMIT ?
+                        ) f
+                        JOIN productos p ON p.id = f.id
+                        WHERE p.activo = 1{filtro_stock}
+                        ORDER BY f.rango, p.id
+                    """, (expresion, limite * 2)).fetchall()
+                    if len(rows) < limite:
+                        rows = conn.execute(f"""
+                            SELECT p.id FROM productos_fts
+                            JOIN productos p ON p.id = productos_fts.rowid
+                            WHERE productos_fts MATCH ? AND p.activo = 1{filtro_stock}
+                            ORDER BY {cls.RANGO_FTS}, p.id
+                            LIMIT ?
+                        """, (expresion, limite)).fetchall()
+                    else:
+                        rows = rows[:limite]
+                else:
+                    condicion, params = cls.condicion_busqueda(texto, conn=conn)
+                    rows = conn.execute(
+                        f"SELECT p.id FROM productos p WHERE {condicion} AND p.activo = 1{filtro_stock} "
+                        "ORDER BY p.nombre LIMIT ?",
+                        (*params, limite),
+                    ).fetchall()
+            return [r[0] for r in rows]
+        except Exception as e:
+            print(f"Error buscando productos: {e}")
+            return []
+    
+    @classmethod
+    def verificar_planes(cls) -> list:
+        """EXPLAIN QUERY PLAN sobre CONSULTAS_INDEXADAS; lista vacía si todo usa índices"""
+        from .planes_consulta import consultas_con_scan
+        
         with cls.get_conexion() as conn:
-            conn.execute(cls.SCHEMA_PRODUCTOS)
-            conn.execute(cls.SCHEMA_HISTORIAL_PRECIOS)
-            conn.commit()
-        print("✓ Base de datos de productos inicializada")
+            return consultas_con_scan(conn, cls.CONSULTAS_INDEXADAS)
+    
+    @classmethod
+    def pagina_productos(cls, busqueda: str = "", filtro: str = "Todos",
+                         cursor: str = None, limite: int = 12):
+        """
+        Página del catálogo de productos activos (paginación por llave)
+        Args:
+            busqueda: texto a buscar (prefijos) en nombre, descripción o código de barras
+            filtro: "Todos" o una llave de FILTROS_CATALOGO
+            cursor: cursor devuelto por la página anterior (None para la primera)
+            limite: productos por página
+        Returns:
+            tuple: (lista de dict, cursor_siguiente o None si ya no hay más)
+        """
+        condiciones = ["p.activo = 1"]
+        params = []
+        if filtro in cls.FILTROS_CATALOGO:
+            condicion, parametros = cls.FILTROS_CATALOGO[filtro]
+            condiciones.append(condicion)
+            params.extend(parametros())
+        
+        expresion = cls.expresion_busqueda(busqueda)
+        with cls.get_conexion() as conn:
+            if expresion and cls.fts_disponible(conn):
+                # Con búsqueda se ordena por relevancia; la llave es (bm25, id)
+                return consultar_pagina(
+                    conn, "p.*", "productos_fts JOIN productos p ON p.id = productos_fts.rowid",
+                    ["productos_fts MATCH ?", *condiciones], [expresion, *params],
+                    [cls.RANGO_FTS, "p.id"], descendente=False, cursor=cursor, limite=limite,
+                )
+            if expresion:
+                condicion, parametros = cls.condicion_busqueda(busqueda, conn=conn)
+                condiciones.append(condicion)
+                params.extend(parametros)
+            return consultar_pagina(
+                conn, "p.*", "productos p", condiciones, params,
+                cls.ORDEN_CATALOGO, descendente=True, cursor=cursor, limite=limite,
+            )
     
     @classmethod
     def registrar_cambio_precio(cls, producto_id: int, tipo_precio: str, 
@@ -161,6 +479,56 @@ class ProductosBuilder:
             print(f"Error actualizando stock: {e}")
             return False
     
+    @classmethod
+    def ajustar_stock_lote(cls, ajustes: dict) -> dict:
+        """
+        Suma varios ajustes de stock en una sola transacción (sin bajar de 0)
+        Args:
+            ajustes: {producto_id: diferencia} (ej: {12: +5, 40: -1})
+        Returns:
+            dict: {producto_id: stock_actual resultante}; vacío si falla
+        """
+        if not ajustes:
+            return {}
+        try:
+            ahora = datetime.now().isoformat()
+            with cls.get_conexion() as conn:
+                conn.executemany("""
+                    UPDATE productos
+                    SET stock_actual = MAX(0, stock_actual + ?),
+                        actualizado_en = ?
+                    WHERE id = ?
+                """, [(diferencia, ahora, producto_id) for producto_id, diferencia in ajustes.items()])
+                marcas = ", ".join("?" * len(ajustes))
+                filas = conn.execute(
+                    f"SELECT id, stock_actual FROM productos WHERE id IN ({marcas})",
+                    list(ajustes)
+                ).fetchall()
+                conn.commit()
+            return {fila["id"]: fila["stock_actual"] for fila in filas}
+        except Exception as e:
+            print(f"Error ajustando stock: {e}")
+            return {}
+    
+    @classmethod
+    def fijar_stock(cls, producto_id: int, stock: int):
+        """
+        Fija el stock de un producto en un valor exacto (ajuste fino)
+        Returns:
+            int: stock_actual guardado; None si falla o el producto no existe
+        """
+        try:
+            with cls.get_conexion() as conn:
+                cur = conn.execute(
+                    "UPDATE productos SET stock_actual = ?, actualizado_en = ? WHERE id = ?",
+                    (stock, datetime.now().isoformat(), producto_id)
+                )
+                conn.commit()
+            return stock if cur.rowcount else None
+        except Exception as e:
+            print(f"Error fijando stock: {e}")
+            return None
+    
     @classmethod
     def obtener_estadisticas(cls):
         """Obtiene estadísticas de productos"""
@@ -4,10 +4,13 @@ Contiene todas las definiciones de tablas y operaciones de la base de datos de p
 """
 
 import sqlite3
-import os
 from pathlib import Path
 from datetime import datetime
 
+from .pool_conexiones import obtener_conexion
+from .migraciones import aplicar_migraciones
+from .paginacion import consultar_pagina
+
 
 class ProveedoresBuilder:
     """Constructor de base de datos de proveedores y compras"""
@@ -55,25 +58,71 @@ class ProveedoresBuilder:
         )
     """
     
+    # Orden del listado de proveedores; coincide con idx_proveedores_nombre
+    ORDEN_PROVEEDORES = ["nombre", "id"]
+    
+    INDICES = [
+        "CREATE INDEX IF NOT EXISTS idx_proveedores_nombre ON proveedores(nombre, id)",
+    ]
+    
+    # ==================== MIGRACIONES ====================
+    
+    # (version, descripcion, pasos) — nunca modificar una versión ya publicada
+    MIGRACIONES = [
+        (1, "tablas proveedores, compras y detalle_compras", [
+            SCHEMA_PROVEEDORES,
+            SCHEMA_COMPRAS,
+            SCHEMA_DETALLE_COMPRAS,
+        ]),
+        (2, "índice compuesto para paginar proveedores", INDICES),
+    ]
+    
+    # Consultas que deben resolverse con índice (ver planes_consulta)
+    CONSULTAS_INDEXADAS = [
+        ("proveedores: primera página",
+         "SELECT * FROM proveedores ORDER BY nombre, id LIMIT 11", ()),
+        ("proveedores: página siguiente",
+         "SELECT * FROM proveedores WHERE (nombre, id) > (?, ?) ORDER BY nombre, id LIMIT 11",
+         ("M", 10)),
+    ]
+    
     # ==================== MÉTODOS ====================
     
     @classmethod
     def get_conexion(cls) -> sqlite3.Connection:
-        """Retorna una conexión a la base de datos de proveedores"""
-        os.makedirs(cls.DB_PATH.parent, exist_ok=True)
-        conn = sqlite3.connect(str(cls.DB_PATH), check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Retorna una conexión (del pool compartido) a la base de datos de proveedores"""
+        return obtener_conexion(cls.DB_PATH, row_factory=sqlite3.Row)
     
     @classmethod
     def inicializar_bd(cls):
-        """Inicializa la base de datos con todas las tablas necesarias"""
+        """Aplica las migraciones pendientes de la base de datos de proveedores"""
+        with cls.get_conexion() as conn:
+            if aplicar_migraciones(conn, cls.MIGRACIONES):
+                print("✓ Base de datos de proveedores inicializada")
+    
+    @classmethod
+    def verificar_planes(cls) -> list:
+        """EXPLAIN QUERY PLAN sobre CONSULTAS_INDEXADAS; lista vacía si todo usa índices"""
+        from .planes_consulta import consultas_con_scan
+        
+        with cls.get_conexion() as conn:
+            return consultas_con_scan(conn, cls.CONSULTAS_INDEXADAS)
+    
+    @classmethod
+    def pagina_proveedores(cls, cursor: str = None, limite: int = 10):
+        """
+        Página de proveedores ordenados por nombre (paginación por llave)
+        Args:
+            cursor: cursor devuelto por la página anterior (None para la primera)
+            limite: proveedores por página
+        Returns:
+            tuple: (lista de dict, cursor_siguiente o None si ya no hay más)
+        """
         with cls.get_conexion() as conn:
-            conn.execute(cls.SCHEMA_PROVEEDORES)
-            conn.execute(cls.SCHEMA_COMPRAS)
-            conn.execute(cls.SCHEMA_DETALLE_COMPRAS)
-            conn.commit()
-        print("✓ Base de datos de proveedores inicializada")
+            return consultar_pagina(
+                conn, "*", "proveedores", [], [],
+                cls.ORDEN_PROVEEDORES, descendente=False, cursor=cursor, limite=limite,
+            )
     
     @classmethod
     def obtener_proveedores_activos(cls):
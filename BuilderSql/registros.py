@@ -0,0 +1,108 @@
+"""
+Registros - Registros compactos (__slots__) para listas grandes en memoria
+Un objeto con __slots__ guarda sus campos en un arreglo fijo en lugar de un
+dict por instancia, así un catálogo de cientos de miles de productos ocupa
+una fracción de la memoria. Conservan el acceso r["campo"] / r.get() para
+el código que todavía trata las filas como diccionarios
+"""
+
+# Tipos de venta de la caja, en el orden de las tarifas precalculadas
+TIPOS_VENTA = ("normal", "mayoreo", "promocion")
+NORMAL, MAYOREO, PROMOCION = range(3)
+
+
+def indice_tarifa(tipo_venta: str) -> int:
+    """Índice en RegistroProducto.tarifas de un tipo de venta (normal si no se conoce)"""
+    try:
+        return TIPOS_VENTA.index(tipo_venta)
+    except ValueError:
+        return NORMAL
+
+
+class RegistroCompacto:
+    """Base de los registros: acceso por atributo y compatibilidad con dict"""
+
+    __slots__ = ()
+
+    @classmethod
+    def desde_fila(cls, fila):
+        """Crea el registro a partir de una tupla con los campos en orden de __slots__"""
+        registro = cls.__new__(cls)
+        for campo, valor in zip(cls.__slots__, fila):
+            setattr(registro, campo, valor)
+        return registro
+
+    def actualizar(self, otro):
+        """Copia en sitio los campos de otro registro del mismo tipo"""
+        for campo in self.__slots__:
+            setattr(self, campo, getattr(otro, campo))
+
+    def keys(self):
+        return self.__slots__
+
+    def __getitem__(self, campo):
+        try:
+            return getattr(self, campo)
+        except AttributeError:
+            raise KeyError(campo) from None
+
+    def get(self, campo, defecto=None):
+        return getattr(self, campo, defecto)
+
+    def __contains__(self, campo):
+        return campo in self.__slots__
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={getattr(self, 'id', None)!r}, nombre={getattr(self, 'nombre', None)!r})"
+
+
+class RegistroProducto(RegistroCompacto):
+    """Fila de la tabla productos (mismas columnas que SCHEMA_PRODUCTOS) más sus tarifas"""
+
+    COLUMNAS = (
+        "id", "codigo_barras", "nombre", "descripcion",
+        "precio_compra", "precio_venta_normal", "precio_venta_mayoreo", "precio_venta_promocion",
+        "stock_actual", "stock_minimo", "stock_maximo",
+        "venta_normal_activa", "venta_mayoreo_activa", "venta_promocion_activa",
+        "minimo_mayoreo", "fecha_inicio_promocion", "fecha_fin_promocion",
+        "iva_porcentaje", "imagen_path", "especificaciones_json",
+        "activo", "destacado", "creado_en", "actualizado_en",
+    )
+
+    # tarifas: (precio, etiqueta) efectivos por tipo de venta, aplanados en una
+    # tupla en el orden de TIPOS_VENTA; los calcula calcular_tarifas()
+    __slots__ = COLUMNAS + ("tarifas",)
+
+    # SELECT con las columnas en el orden de los slots (para desde_fila)
+    COLUMNAS_SQL = ", ".join(COLUMNAS)
+
+    def keys(self):
+        return self.COLUMNAS
+
+    def calcular_tarifas(self, hoy: str):
+        """
+        Precalcula el precio de cada tipo de venta; un tipo inactivo, sin precio
+        o (promoción) fuera de fecha_inicio/fin_promocion cae al precio normal
+        Args:
+            hoy: fecha ISO (YYYY-MM-DD) contra la que se evalúa la promoción
+        """
+        normal = self.precio_venta_normal
+        mayoreo = self.precio_venta_mayoreo
+        promocion = self.precio_venta_promocion
+        mayoreo_vigente = bool(self.venta_mayoreo_activa and mayoreo and mayoreo > 0)
+        inicio = (self.fecha_inicio_promocion or "")[:10]
+        fin = (self.fecha_fin_promocion or "")[:10]
+        promocion_vigente = bool(
+            self.venta_promocion_activa and promocion and promocion > 0
+            and (not inicio or inicio <= hoy) and (not fin or hoy <= fin)
+        )
+        self.tarifas = (
+            normal, "Normal",
+            *((mayoreo, "Mayoreo") if mayoreo_vigente else (normal, "Normal")),
+            *((promocion, "Promoción") if promocion_vigente else (normal, "Normal")),
+        )
+
+    def tarifa(self, tipo_venta: str):
+        """(precio, etiqueta) del tipo de venta indicado"""
+        i = indice_tarifa(tipo_venta) * 2
+        return self.tarifas[i], self.tarifas[i + 1]
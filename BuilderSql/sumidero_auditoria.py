@@ -0,0 +1,193 @@
+"""
+SumideroAuditoria - Escritura diferida (write-behind) de la auditoría
+Los eventos se encolan en memoria y un hilo los escribe por lotes con
+executemany cuando se junta cierto tamaño o pasa cierto tiempo
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+from collections import deque
+
+
+class SumideroAuditoria:
+    """Cola de eventos de auditoría con commit agrupado"""
+
+    # Modos de durabilidad:
+    #   "lote"      -> se confirma en lotes (tamano_lote / intervalo)
+    #   "inmediata" -> cada registrar() espera a que su lote quede confirmado
+    DURABILIDADES = ("lote", "inmediata")
+
+    SQL_INSERTAR = (
+        "INSERT INTO auditoria(fecha_hora, usuario, tipo, descripcion, detalles) "
+        "VALUES(?,?,?,?,?)"
+    )
+
+    def __init__(self, obtener_conexion, tamano_lote: int = 50, intervalo: float = 1.0,
+                 max_pendientes: int = 10_000, durabilidad: str = "lote", ejecutor=None):
+        """
+        Args:
+            obtener_conexion: callable que devuelve una conexión a ventas.db
+            tamano_lote: eventos que disparan una escritura inmediata
+            intervalo: segundos máximos que un evento espera en la cola
+            max_pendientes: tope de la cola; al excederse se descartan los eventos nuevos
+            durabilidad: "lote" o "inmediata"
+            ejecutor: callable(funcion) -> Future donde corren los vaciados del
+                      hilo de fondo (ej: GatewayDatos.enviar_escritura); None = en el hilo
+        """
+        if durabilidad not in self.DURABILIDADES:
+            raise ValueError(f"Durabilidad desconocida: {durabilidad}")
+        self._obtener_conexion = obtener_conexion
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.max_pendientes = max_pendientes
+        self.durabilidad = durabilidad
+        self._ejecutor = ejecutor
+
+        self._cola = deque()
+        self._cond = threading.Condition()
+        self._escritura = threading.Lock()
+        self._hilo = None
+        self._cerrado = False
+        self._metricas = {
+            "registrados": 0,
+            "escritos": 0,
+            "descartados": 0,
+            "errores": 0,
+            "lotes": 0,
+        }
+        self.ultimo_error = None
+        atexit.register(self.cerrar)
+
+    # ==================== ENTRADA ====================
+
+    def registrar(self, fecha_hora: str, usuario: str, tipo: str, descripcion: str, detalles: str = ""):
+        """Encola un evento; en modo 'inmediata' espera a que quede escrito"""
+        # Las columnas son TEXT NOT NULL: un None no debe trabar la cola
+        fila = tuple("" if v is None else str(v)
+                     for v in (fecha_hora, usuario, tipo, descripcion, detalles))
+        with self._cond:
+            self._metricas["registrados"] += 1
+            if len(self._cola) >= self.max_pendientes:
+                # Cola llena (la base no acepta escrituras): se descarta y se cuenta
+                self._metricas["descartados"] += 1
+                return False
+            self._cola.append(fila)
+            if not self._cerrado:
+                self._asegurar_hilo()
+                self._cond.notify()
+        if self._cerrado or self.durabilidad == "inmediata":
+            return self.vaciar()
+        return True
+
+    def _asegurar_hilo(self):
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self._bucle, name="auditoria-sumidero", daemon=True)
+            self._hilo.start()
+
+    # ==================== ESCRITURA ====================
+
+    def _bucle(self):
+        while True:
+            with self._cond:
+                while not self._cola and not self._cerrado:
+                    self._cond.wait()
+                # Dar tiempo a que se junte un lote, salvo que ya esté lleno
+                limite = time.monotonic() + self.intervalo
+                while len(self._cola) < self.tamano_lote and not self._cerrado:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._cond.wait(restante)
+                if self._cerrado and not self._cola:
+                    return
+            if not self._vaciar_lote():
+                # Error de escritura: esperar antes de reintentar el mismo lote
+                time.sleep(self.intervalo)
+
+    def _vaciar_lote(self) -> bool:
+        """Vaciado del hilo de fondo: por el ejecutor si hay uno (escritor único)"""
+        if self._ejecutor is None:
+            return self.vaciar()
+        try:
+            return self._ejecutor(self.vaciar).result()
+        except Exception as e:
+            print(f"⚠️ Error enviando auditoría al escritor: {e}")
+            return False
+
+    # Errores de la fila y no de la base: reintentar el lote no los arregla
+    ERRORES_FILA = (sqlite3.IntegrityError, sqlite3.DataError)
+
+    def vaciar(self) -> bool:
+        """
+        Escribe todo lo pendiente; devuelve False si hubo error (los eventos se conservan)
+        Si alguna fila es inválida se reintenta de a una y solo se descartan las que fallan
+        """
+        with self._escritura:
+            with self._cond:
+                lote = list(self._cola)
+            if not lote:
+                return True
+            con = None
+            rechazados = 0
+            try:
+                con = self._obtener_conexion()
+                try:
+                    con.executemany(self.SQL_INSERTAR, lote)
+                except self.ERRORES_FILA:
+                    con.rollback()
+                    rechazados = self._insertar_por_fila(con, lote)
+                con.commit()
+            except Exception as e:
+                # Error transitorio (ej: database is locked): el lote queda en cola
+                if con is not None:
+                    con.rollback()
+                with self._cond:
+                    self._metricas["errores"] += 1
+                if self.ultimo_error is None or str(e) != str(self.ultimo_error):
+                    print(f"⚠️ Error escribiendo auditoría ({len(lote)} pendientes): {e}")
+                self.ultimo_error = e
+                return False
+            finally:
+                if con is not None:
+                    con.close()
+            with self._cond:
+                # Solo salen de la cola los eventos procesados (pudieron llegar otros)
+                for _ in range(len(lote)):
+                    self._cola.popleft()
+                self._metricas["escritos"] += len(lote) - rechazados
+                self._metricas["descartados"] += rechazados
+                self._metricas["lotes"] += 1
+            return True
+
+    def _insertar_por_fila(self, con, lote) -> int:
+        """Inserta fila por fila; devuelve cuántas se rechazaron"""
+        rechazados = 0
+        for fila in lote:
+            try:
+                con.execute(self.SQL_INSERTAR, fila)
+            except self.ERRORES_FILA as e:
+                rechazados += 1
+                self.ultimo_error = e
+                print(f"⚠️ Evento de auditoría descartado ({e}): {fila}")
+        return rechazados
+
+    # ==================== ADMINISTRACIÓN ====================
+
+    def metricas(self) -> dict:
+        """Profundidad de cola y contadores"""
+        with self._cond:
+            datos = dict(self._metricas)
+            datos["pendientes"] = len(self._cola)
+        datos["ultimo_error"] = str(self.ultimo_error) if self.ultimo_error else None
+        return datos
+
+    def cerrar(self):
+        """Vacía la cola y detiene el hilo (se llama también al salir del proceso)"""
+        with self._cond:
+            self._cerrado = True
+            self._cond.notify_all()
+        self.vaciar()
+        if self._hilo is not None and self._hilo is not threading.current_thread():
+            self._hilo.join(timeout=self.intervalo * 2)
@@ -5,8 +5,13 @@ Contiene todas las definiciones de tablas y operaciones de la base de datos de u
 
 import sqlite3
 import json
+import hashlib
 from pathlib import Path
 
+from .pool_conexiones import obtener_conexion
+from .migraciones import aplicar_migraciones, columna_existe
+from .ventas_builder import VentasBuilder
+
 
 class UsuariosBuilder:
     """Constructor de base de datos de usuarios (integrado con ventas.db)"""
@@ -14,21 +19,44 @@ class UsuariosBuilder:
     DB_PATH = Path("./BASEDATOS/ventas.db")
     JSON_FILE = Path("Json files/users.json")
     
+    # ==================== ESQUEMAS ====================
+    
+    # Hash del contenido de cada usuario la última vez que se copió del JSON
+    SCHEMA_USUARIOS_SYNC = """
+        CREATE TABLE IF NOT EXISTS usuarios_sync(
+            nombre TEXT PRIMARY KEY,
+            hash TEXT NOT NULL
+        ) WITHOUT ROWID
+    """
+    
+    # Estado de sincronizaciones (clave 'usuarios_json': hash del archivo completo)
+    SCHEMA_SYNC_ESTADO = """
+        CREATE TABLE IF NOT EXISTS sync_estado(
+            clave TEXT PRIMARY KEY,
+            valor TEXT
+        )
+    """
+    
     # ==================== MÉTODOS ====================
     
     @classmethod
     def get_conexion(cls) -> sqlite3.Connection:
-        """Retorna una conexión a la base de datos"""
-        cls.DB_PATH.parent.mkdir(exist_ok=True)
-        return sqlite3.connect(str(cls.DB_PATH), check_same_thread=False)
+        """Retorna una conexión (del pool compartido) a la base de datos"""
+        return obtener_conexion(cls.DB_PATH)
     
     @classmethod
     def _leer_usuarios_json(cls) -> list:
         """Devuelve lista de dicts con 'nombre' + propiedades del JSON"""
         if not cls.JSON_FILE.exists():
             return []
-        with cls.JSON_FILE.open(encoding="utf-8") as f:
-            data = json.load(f)
+        return cls._parsear_usuarios(cls.JSON_FILE.read_bytes())
+    
+    @classmethod
+    def _parsear_usuarios(cls, crudo: bytes) -> list:
+        """Lista de dicts con 'nombre' + propiedades a partir del contenido del JSON"""
+        if not crudo.strip():
+            return []
+        data = json.loads(crudo.decode("utf-8"))
         usuarios_raw = data.get("usuarios", {})
         lista = []
         for nombre, props in usuarios_raw.items():
@@ -50,24 +78,75 @@ class UsuariosBuilder:
     @classmethod
     def _columna_existe(cls, cur, tabla: str, columna: str) -> bool:
         """Verifica si una columna existe en una tabla"""
-        cur.execute(f"PRAGMA table_info({tabla})")
-        return any(row[1] == columna for row in cur.fetchall())
+        return columna_existe(cur, tabla, columna)
+    
+    @classmethod
+    def _hash_usuario(cls, usuario: dict) -> str:
+        """Hash estable del contenido de un usuario (no depende del orden de las llaves)"""
+        texto = json.dumps(usuario, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+    
+    @classmethod
+    def _estado_sync(cls, cur, clave: str):
+        fila = cur.execute("SELECT valor FROM sync_estado WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else None
     
     @classmethod
     def inicializar_bd(cls):
-        """Inicializa la tabla de usuarios con columnas dinámicas desde JSON"""
-        usuarios = cls._leer_usuarios_json()
-        columnas = cls._columnas_dinamicas(usuarios)
-        
-        if not columnas:
-            print("⚠️ No hay usuarios en el JSON")
-            return
+        """
+        Sincroniza la tabla usuarios con users.json de forma incremental
+        Si el archivo no cambió desde el último inicio (mismo hash) no se parsea
+        ni se escribe nada. Si cambió, solo se insertan, actualizan o borran los
+        usuarios cuyo hash cambió (con executemany) y se agregan las columnas
+        de llaves nuevas del JSON
+        """
+        crudo = cls.JSON_FILE.read_bytes() if cls.JSON_FILE.exists() else b""
+        hash_json = hashlib.sha1(crudo).hexdigest()
         
         con = cls.get_conexion()
-        cur = con.cursor()
-        
-        # Crear tabla usuarios con columnas dinámicas
-        cols_def = ", ".join([f"{col} TEXT" for col in columnas])
+        try:
+            # La tabla auditoria pertenece a las migraciones de ventas.db
+            aplicar_migraciones(con, VentasBuilder.MIGRACIONES)
+            cur = con.cursor()
+            cur.execute(cls.SCHEMA_USUARIOS_SYNC)
+            cur.execute(cls.SCHEMA_SYNC_ESTADO)
+            if cls._estado_sync(cur, "usuarios_json") == hash_json:
+                return
+            
+            usuarios = cls._parsear_usuarios(crudo)
+            if not usuarios:
+                print("⚠️ No hay usuarios en el JSON")
+            
+            # BEGIN IMMEDIATE bloquea a otra caja que inicie a la vez
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                if cls._estado_sync(cur, "usuarios_json") == hash_json:
+                    # La otra caja ya sincronizó este mismo contenido
+                    con.rollback()
+                    return
+                nuevos, actualizados, borrados = cls._sincronizar_usuarios(cur, usuarios)
+                cur.execute(
+                    "INSERT OR REPLACE INTO sync_estado(clave, valor) VALUES('usuarios_json', ?)",
+                    (hash_json,)
+                )
+                con.commit()
+            except Exception:
+                con.rollback()
+                raise
+        finally:
+            con.close()
+        print(f"✓ Usuarios sincronizados: {nuevos} nuevos, {actualizados} actualizados, {borrados} eliminados")
+    
+    @classmethod
+    def _sincronizar_usuarios(cls, cur, usuarios: list) -> tuple:
+        """
+        Aplica a la tabla usuarios solo las diferencias con el JSON (dentro de
+        la transacción abierta por inicializar_bd)
+        Returns:
+            tuple: (insertados, actualizados, eliminados)
+        """
+        columnas_json = cls._columnas_dinamicas(usuarios) or ["nombre"]
+        cols_def = ", ".join(f'"{col}" TEXT' for col in columnas_json)
         cur.execute(f"""
             CREATE TABLE IF NOT EXISTS usuarios(
                 id INTEGER PRIMARY KEY AUTOINCREMENT, 
@@ -75,31 +154,58 @@ class UsuariosBuilder:
             )
         """)
         
-        # Crear tabla auditoria (si no existe)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS auditoria(
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                fecha_hora TEXT NOT NULL,
-                usuario TEXT NOT NULL,
-                tipo TEXT NOT NULL,
-                descripcion TEXT,
-                detalles TEXT
-            )
-        """)
+        # Llaves nuevas del JSON: columnas nuevas (vacías para los demás usuarios)
+        cur.execute("PRAGMA table_info(usuarios)")
+        existentes = [fila[1] for fila in cur.fetchall()]
+        for col in columnas_json:
+            if col not in existentes:
+                cur.execute(f"ALTER TABLE usuarios ADD COLUMN \"{col}\" TEXT DEFAULT ''")
+                existentes.append(col)
+        columnas = [col for col in existentes if col != "id"]
         
-        # Insertar o ignorar usuarios del JSON
-        col_id = "nombre" if "nombre" in columnas else columnas[0]
-        placeholders = ", ".join(["?"] * len(columnas))
-        sql_insert = f"INSERT OR IGNORE INTO usuarios({','.join(columnas)}) VALUES({placeholders})"
+        previos = dict(cur.execute("SELECT nombre, hash FROM usuarios_sync").fetchall())
+        if not previos:
+            # Primera sincronización: las versiones anteriores insertaban a los
+            # usuarios en cada inicio; se deja una fila por nombre y se
+            # actualizan todas (sin hash previo)
+            cur.execute("DELETE FROM usuarios WHERE id NOT IN (SELECT MIN(id) FROM usuarios GROUP BY nombre)")
+            previos = {nombre: None for (nombre,) in cur.execute("SELECT nombre FROM usuarios").fetchall()}
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_usuarios_nombre ON usuarios(nombre)")
         
+        hashes = {}
+        nuevos, cambiados = [], []
         for u in usuarios:
-            values = [u.get(col, "") for col in columnas]
-            cur.execute(sql_insert, values)
+            h = cls._hash_usuario(u)
+            hashes[u["nombre"]] = h
+            if u["nombre"] not in previos:
+                nuevos.append(u)
+            elif previos[u["nombre"]] != h:
+                cambiados.append(u)
+        borrados = [(nombre,) for nombre in previos if nombre not in hashes]
         
-        con.commit()
-        con.close()
-        print("✓ Base de datos de usuarios inicializada")
-        print("✓ Tabla de auditoría creada")
+        if nuevos:
+            lista = ", ".join(f'"{col}"' for col in columnas)
+            placeholders = ", ".join(["?"] * len(columnas))
+            cur.executemany(
+                f"INSERT INTO usuarios({lista}) VALUES({placeholders})",
+                [[u.get(col, "") for col in columnas] for u in nuevos]
+            )
+        otras = [col for col in columnas if col != "nombre"]
+        if cambiados and otras:
+            # Todas las columnas: una llave quitada del JSON queda vacía
+            asignaciones = ", ".join(f'"{col}" = ?' for col in otras)
+            cur.executemany(
+                f"UPDATE usuarios SET {asignaciones} WHERE nombre = ?",
+                [[u.get(col, "") for col in otras] + [u["nombre"]] for u in cambiados]
+            )
+        if borrados:
+            cur.executemany("DELETE FROM usuarios WHERE nombre = ?", borrados)
+            cur.executemany("DELETE FROM usuarios_sync WHERE nombre = ?", borrados)
+        cur.executemany(
+            "INSERT OR REPLACE INTO usuarios_sync(nombre, hash) VALUES(?, ?)",
+            [(u["nombre"], hashes[u["nombre"]]) for u in nuevos + cambiados]
+        )
+        return len(nuevos), len(cambiados), len(borrados)
     
     @classmethod
     def obtener_usuario(cls, nombre: str):
@@ -194,18 +300,16 @@ class UsuariosBuilder:
     
     @classmethod
     def verificar_credenciales(cls, nombre: str, password: str) -> bool:
-        """Verifica las credenciales de un usuario"""
+        """
+        Verifica las credenciales de un usuario
+        Usa el directorio en memoria (misma fuente que el login: admin.json y
+        users.json) en lugar de la copia de la tabla usuarios, que solo se
+        sincroniza al iniciar
+        """
         try:
-            con = cls.get_conexion()
-            con.row_factory = sqlite3.Row
-            cur = con.cursor()
-            cur.execute(
-                "SELECT * FROM usuarios WHERE nombre = ? AND password = ?",
-                (nombre, password)
-            )
-            usuario = cur.fetchone()
-            con.close()
-            return usuario is not None
+            # Import tardío: user_manager crea los archivos JSON al importarse
+            from mananger.directorio_usuarios import obtener_directorio
+            return obtener_directorio().verificar(nombre, password) is not None
         except Exception as e:
             print(f"Error verificando credenciales: {e}")
             return False
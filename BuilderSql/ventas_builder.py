@@ -5,8 +5,15 @@ Contiene todas las definiciones de tablas y operaciones de la base de datos de v
 
 import sqlite3
 import datetime
+import heapq
+import threading
 from pathlib import Path
 
+from .pool_conexiones import obtener_conexion
+from .gateway_datos import obtener_gateway
+from .migraciones import aplicar_migraciones, agregar_columna
+from .sumidero_auditoria import SumideroAuditoria
+
 
 class VentasBuilder:
     """Constructor de base de datos de ventas"""
@@ -48,42 +55,245 @@ class VentasBuilder:
         )
     """
     
+    # Resumen por (fecha, usuario, tipo_venta) mantenido por triggers
+    SCHEMA_VENTAS_DIARIAS = """
+        CREATE TABLE IF NOT EXISTS ventas_diarias(
+            fecha      DATE NOT NULL,
+            usuario    TEXT NOT NULL,
+            tipo_venta TEXT NOT NULL,
+            num_ventas INTEGER NOT NULL DEFAULT 0,
+            total      REAL NOT NULL DEFAULT 0,
+            articulos  INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY(fecha, usuario, tipo_venta)
+        ) WITHOUT ROWID
+    """
+    
+    # Las claves usan COALESCE para que filas antiguas con NULL caigan en un grupo fijo
+    TRIGGERS_VENTAS_DIARIAS = [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_ventas_diarias_ins AFTER INSERT ON ventas
+        BEGIN
+            INSERT INTO ventas_diarias(fecha, usuario, tipo_venta, num_ventas, total)
+            VALUES(NEW.fecha, COALESCE(NEW.usuario, ''), COALESCE(NEW.tipo_venta, 'Normal'),
+                   1, COALESCE(NEW.total, 0))
+            ON CONFLICT(fecha, usuario, tipo_venta) DO UPDATE SET
+                num_ventas = num_ventas + 1,
+                total = total + excluded.total;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_ventas_diarias_del AFTER DELETE ON ventas
+        BEGIN
+            UPDATE ventas_diarias SET
+                num_ventas = num_ventas - 1,
+                total = total - COALESCE(OLD.total, 0),
+                articulos = articulos - COALESCE(
+                    (SELECT SUM(cantidad) FROM ventas_detalle WHERE venta_id = OLD.id), 0)
+            WHERE fecha = OLD.fecha
+              AND usuario = COALESCE(OLD.usuario, '')
+              AND tipo_venta = COALESCE(OLD.tipo_venta, 'Normal');
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_ventas_diarias_upd
+        AFTER UPDATE OF fecha, usuario, tipo_venta, total ON ventas
+        BEGIN
+            UPDATE ventas_diarias SET
+                num_ventas = num_ventas - 1,
+                total = total - COALESCE(OLD.total, 0),
+                articulos = articulos - COALESCE(
+                    (SELECT SUM(cantidad) FROM ventas_detalle WHERE venta_id = OLD.id), 0)
+            WHERE fecha = OLD.fecha
+              AND usuario = COALESCE(OLD.usuario, '')
+              AND tipo_venta = COALESCE(OLD.tipo_venta, 'Normal');
+            INSERT INTO ventas_diarias(fecha, usuario, tipo_venta, num_ventas, total, articulos)
+            VALUES(NEW.fecha, COALESCE(NEW.usuario, ''), COALESCE(NEW.tipo_venta, 'Normal'),
+                   1, COALESCE(NEW.total, 0),
+                   COALESCE((SELECT SUM(cantidad) FROM ventas_detalle WHERE venta_id = NEW.id), 0))
+            ON CONFLICT(fecha, usuario, tipo_venta) DO UPDATE SET
+                num_ventas = num_ventas + 1,
+                total = total + excluded.total,
+                articulos = articulos + excluded.articulos;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_ventas_diarias_det AFTER INSERT ON ventas_detalle
+        BEGIN
+            UPDATE ventas_diarias SET articulos = articulos + COALESCE(NEW.cantidad, 0)
+            WHERE (fecha, usuario, tipo_venta) = (
+                SELECT fecha, COALESCE(usuario, ''), COALESCE(tipo_venta, 'Normal')
+                FROM ventas WHERE id = NEW.venta_id
+            );
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_ventas_diarias_det_del AFTER DELETE ON ventas_detalle
+        BEGIN
+            UPDATE ventas_diarias SET articulos = articulos - COALESCE(OLD.cantidad, 0)
+            WHERE (fecha, usuario, tipo_venta) = (
+                SELECT fecha, COALESCE(usuario, ''), COALESCE(tipo_venta, 'Normal')
+                FROM ventas WHERE id = OLD.venta_id
+            );
+        END
+        """,
+    ]
+    
+    # Carga inicial del resumen a partir de las ventas existentes
+    BACKFILL_VENTAS_DIARIAS = """
+        INSERT INTO ventas_diarias(fecha, usuario, tipo_venta, num_ventas, total, articulos)
+        SELECT v.fecha, COALESCE(v.usuario, ''), COALESCE(v.tipo_venta, 'Normal'),
+               COUNT(*), COALESCE(SUM(v.total), 0), COALESCE(SUM(d.articulos), 0)
+        FROM ventas v
+        LEFT JOIN (
+            SELECT venta_id, SUM(cantidad) AS articulos
+            FROM ventas_detalle GROUP BY venta_id
+        ) d ON d.venta_id = v.id
+        WHERE v.fecha IS NOT NULL
+        GROUP BY v.fecha, COALESCE(v.usuario, ''), COALESCE(v.tipo_venta, 'Normal')
+    """
+    
+    # Índices secundarios para las consultas calientes (ver CONSULTAS_INDEXADAS)
+    INDICES = [
+        "CREATE INDEX IF NOT EXISTS idx_ventas_usuario_fecha ON ventas(usuario, fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas(fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_detalle_venta ON ventas_detalle(venta_id)",
+        "CREATE INDEX IF NOT EXISTS idx_auditoria_fecha_hora ON auditoria(fecha_hora)",
+        "CREATE INDEX IF NOT EXISTS idx_auditoria_usuario ON auditoria(usuario, fecha_hora)",
+        "CREATE INDEX IF NOT EXISTS idx_auditoria_tipo ON auditoria(tipo, fecha_hora)",
+    ]
+    
+    # ==================== CONSULTAS ====================
+    
+    SQL_VENTAS_DEL_DIA = "SELECT SUM(total) FROM ventas WHERE usuario=? AND fecha=?"
+    
+    SQL_ULTIMAS_VENTAS_DIA = """
+        SELECT COALESCE(v.fecha_hora, v.fecha || ' 00:00:00') as fecha_hora,
+               GROUP_CONCAT(vd.producto, ', ') as productos,
+               v.total
+        FROM ventas v
+        LEFT JOIN ventas_detalle vd ON v.id = vd.venta_id
+        WHERE v.usuario = ? AND v.fecha = ?
+        GROUP BY v.id
+        ORDER BY v.id DESC
+    """
+    
+    SQL_ULTIMAS_VENTAS = """
+        SELECT COALESCE(v.fecha_hora, v.fecha || ' 00:00:00') as fecha_hora,
+               GROUP_CONCAT(vd.producto, ', ') as productos,
+               v.total
+        FROM ventas v
+        LEFT JOIN ventas_detalle vd ON v.id = vd.venta_id
+        WHERE v.usuario = ?
+        GROUP BY v.id
+        ORDER BY v.id DESC
+        LIMIT ?
+    """
+    
+    SQL_VENTAS_RANGO = """
+        SELECT * FROM ventas 
+        WHERE fecha BETWEEN ? AND ?
+        ORDER BY fecha DESC
+    """
+    
+    SQL_DETALLE_VENTA = "SELECT * FROM ventas_detalle WHERE venta_id = ?"
+    
+    SQL_RESUMEN_DIARIO = """
+        SELECT fecha, tipo_venta, SUM(num_ventas), SUM(total), SUM(articulos)
+        FROM ventas_diarias
+        WHERE fecha BETWEEN ? AND ?
+        GROUP BY fecha, tipo_venta
+    """
+    
+    # Cantidad e ingresos por producto en un rango, en una sola consulta agrupada
+    SQL_PRODUCTOS_RANGO = """
+        SELECT d.producto, SUM(d.cantidad), SUM(d.cantidad * d.precio_unit)
+        FROM ventas v
+        JOIN ventas_detalle d ON d.venta_id = v.id
+        WHERE v.fecha BETWEEN ? AND ?
+        GROUP BY d.producto
+    """
+    
+    # (nombre, sql, parámetros de ejemplo) — ninguna debe resolverse con SCAN.
+    # Las lecturas "últimos N por id" sin filtro quedan fuera: recorren el
+    # rowid hacia atrás y se detienen en LIMIT.
+    CONSULTAS_INDEXADAS = [
+        ("ventas_del_dia", SQL_VENTAS_DEL_DIA, ("cajero", "2024-01-01")),
+        ("ultimas_ventas (día)", SQL_ULTIMAS_VENTAS_DIA, ("cajero", "2024-01-01")),
+        ("ultimas_ventas", SQL_ULTIMAS_VENTAS, ("cajero", 10)),
+        ("reportes: ventas por rango", SQL_VENTAS_RANGO, ("2024-01-01", "2024-01-31")),
+        ("reportes: detalle de venta", SQL_DETALLE_VENTA, (1,)),
+        ("reportes: resumen diario", SQL_RESUMEN_DIARIO, ("2024-01-01", "2024-12-31")),
+        ("reportes: productos del rango", SQL_PRODUCTOS_RANGO, ("2024-01-01", "2024-12-31")),
+        ("auditoria por usuario",
+         "SELECT * FROM auditoria WHERE usuario = ? ORDER BY id DESC LIMIT ?", ("admin", 100)),
+        ("auditoria por tipo",
+         "SELECT * FROM auditoria WHERE 1=1 AND tipo = ? ORDER BY fecha_hora DESC, id DESC LIMIT ?",
+         ("venta", 100)),
+        ("auditoria por fecha",
+         "SELECT * FROM auditoria WHERE 1=1 AND fecha_hora >= ? ORDER BY fecha_hora DESC, id DESC LIMIT ?",
+         ("2024-01-01", 1000)),
+        ("auditoria por usuario y rango",
+         "SELECT * FROM auditoria WHERE 1=1 AND usuario = ? AND fecha_hora >= ? AND fecha_hora <= ? "
+         "ORDER BY fecha_hora DESC, id DESC LIMIT ?",
+         ("admin", "2024-01-01", "2024-01-31", 1000)),
+    ]
+    
+    # Escritura diferida de auditoría; durabilidad "inmediata" confirma cada evento
+    CONFIG_AUDITORIA = {"tamano_lote": 50, "intervalo": 1.0, "durabilidad": "lote"}
+    _sumidero = None
+    _sumidero_lock = threading.Lock()
+    
+    # ==================== MIGRACIONES ====================
+    
+    # (version, descripcion, pasos) — nunca modificar una versión ya publicada
+    MIGRACIONES = [
+        (1, "tablas ventas, ventas_detalle y auditoria", [
+            SCHEMA_VENTAS,
+            SCHEMA_VENTAS_DETALLE,
+            SCHEMA_AUDITORIA,
+            agregar_columna("ventas", "fecha_hora", "TEXT"),
+            agregar_columna("ventas", "tipo_venta", "TEXT DEFAULT 'Normal'"),
+        ]),
+        (2, "índices de ventas, ventas_detalle y auditoria", INDICES),
+        (3, "resumen ventas_diarias con triggers y carga inicial", [
+            SCHEMA_VENTAS_DIARIAS,
+            "DELETE FROM ventas_diarias",
+            BACKFILL_VENTAS_DIARIAS,
+            *TRIGGERS_VENTAS_DIARIAS,
+        ]),
+    ]
+    
     # ==================== MÉTODOS ====================
     
     @classmethod
     def get_conexion(cls) -> sqlite3.Connection:
-        """Retorna una conexión a la base de datos de ventas"""
-        cls.DB_PATH.parent.mkdir(exist_ok=True)
-        return sqlite3.connect(str(cls.DB_PATH), check_same_thread=False)
+        """Retorna una conexión (del pool compartido) a la base de datos de ventas"""
+        return obtener_conexion(cls.DB_PATH)
     
     @classmethod
     def inicializar_bd(cls):
-        """Inicializa la base de datos con todas las tablas necesarias"""
+        """Aplica las migraciones pendientes de la base de datos de ventas"""
         con = cls.get_conexion()
-        cur = con.cursor()
-        
-        # Crear tablas
-        cur.execute(cls.SCHEMA_VENTAS)
-        cur.execute(cls.SCHEMA_VENTAS_DETALLE)
-        cur.execute(cls.SCHEMA_AUDITORIA)
-        
-        # Verificar y agregar columna fecha_hora si no existe
-        if not cls._columna_existe(cur, "ventas", "fecha_hora"):
-            cur.execute("ALTER TABLE ventas ADD COLUMN fecha_hora TEXT")
-        
-        # Verificar y agregar columna tipo_venta si no existe
-        if not cls._columna_existe(cur, "ventas", "tipo_venta"):
-            cur.execute("ALTER TABLE ventas ADD COLUMN tipo_venta TEXT DEFAULT 'Normal'")
-        
-        con.commit()
-        con.close()
-        print("✓ Base de datos de ventas inicializada")
+        try:
+            if aplicar_migraciones(con, cls.MIGRACIONES):
+                print("✓ Base de datos de ventas inicializada")
+        finally:
+            con.close()
     
     @classmethod
-    def _columna_existe(cls, cur, tabla: str, columna: str) -> bool:
-        """Verifica si una columna existe en una tabla"""
-        cur.execute(f"PRAGMA table_info({tabla})")
-        return any(row[1] == columna for row in cur.fetchall())
+    def verificar_planes(cls) -> list:
+        """
+        Ejecuta EXPLAIN QUERY PLAN sobre CONSULTAS_INDEXADAS
+        Returns:
+            list: (nombre, detalle) de cada consulta que cae en SCAN; vacía si todo usa índices
+        """
+        from .planes_consulta import consultas_con_scan
+        
+        con = cls.get_conexion()
+        try:
+            return consultas_con_scan(con, cls.CONSULTAS_INDEXADAS)
+        finally:
+            con.close()
     
     @classmethod
     def guardar_venta(cls, usuario: str, carrito: list[dict], tipo_venta: str = "Normal") -> bool:
@@ -147,6 +357,102 @@ class VentasBuilder:
             traceback.print_exc()
             return False
     
+    @classmethod
+    def procesar_venta(cls, usuario: str, carrito: list[dict], tipo_venta: str = "Normal",
+                       auditoria: tuple = None) -> tuple:
+        """
+        Cobra una venta en una sola transacción durable
+        Valida y descuenta stock en productos.db (ATTACH), inserta la venta,
+        sus detalles (executemany) y el registro de auditoría, y confirma todo
+        con un único COMMIT. Si algo falla no queda ningún cambio aplicado.
+        Args:
+            usuario: cajero que realiza la venta
+            carrito: lista de {"producto": {...}, "cantidad": n}
+            tipo_venta: 'Normal', 'Mayoreo' o 'Promoción'
+            auditoria: (tipo, descripcion, detalles) opcional
+        Returns:
+            tuple: (ok, mensaje, venta_id)
+        """
+        if not carrito:
+            return False, "Carrito vacío", None
+        
+        try:
+            lineas = []
+            total = 0.0
+            for item in carrito:
+                p = item["producto"]
+                cantidad = int(item["cantidad"])
+                precio_unit = float(p.get("precio", 0))
+                total += precio_unit * cantidad
+                lineas.append((p["id"], p.get("nombre", "Producto sin nombre"), cantidad, precio_unit))
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"ERROR: Error calculando total para item: {e}")
+            return False, "Datos del carrito inválidos", None
+        
+        from .productos_builder import ProductosBuilder
+        
+        con = cls.get_conexion()
+        try:
+            con.adjuntar("inv", ProductosBuilder.DB_PATH)
+            cur = con.cursor()
+            # Reserva de escritura sobre ambas bases antes de leer stock
+            cur.execute("BEGIN IMMEDIATE")
+            
+            cur.executemany(
+                "UPDATE inv.productos SET stock_actual = stock_actual - ? "
+                "WHERE id = ? AND stock_actual >= ?",
+                [(cantidad, producto_id, cantidad) for producto_id, _, cantidad, _ in lineas]
+            )
+            if cur.rowcount != len(lineas):
+                # Deshacer primero: el mensaje se arma con el stock confirmado
+                con.rollback()
+                return False, cls._mensaje_stock_insuficiente(cur, lineas), None
+            
+            hoy = datetime.date.today()
+            ahora = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            cur.execute(
+                "INSERT INTO ventas(usuario, fecha, fecha_hora, total, tipo_venta) VALUES(?,?,?,?,?)",
+                (usuario, hoy, ahora, total, tipo_venta)
+            )
+            venta_id = cur.lastrowid
+            cur.executemany(
+                "INSERT INTO ventas_detalle(venta_id, producto, cantidad, precio_unit) VALUES(?,?,?,?)",
+                [(venta_id, nombre, cantidad, precio_unit) for _, nombre, cantidad, precio_unit in lineas]
+            )
+            
+            if auditoria:
+                tipo, descripcion, detalles = auditoria
+                cur.execute(
+                    "INSERT INTO auditoria(fecha_hora, usuario, tipo, descripcion, detalles) VALUES(?,?,?,?,?)",
+                    (ahora, usuario, tipo, descripcion, detalles)
+                )
+            
+            con.commit()
+            print(f"✓ Venta guardada: ID {venta_id}, Total ${total:.2f}")
+            return True, "", venta_id
+        except Exception as e:
+            con.rollback()
+            print(f"ERROR en procesar_venta: {e}")
+            import traceback
+            traceback.print_exc()
+            return False, "Error al procesar la venta en la base de datos", None
+        finally:
+            con.close()
+    
+    @classmethod
+    def _mensaje_stock_insuficiente(cls, cur, lineas: list) -> str:
+        """Describe el primer renglón del carrito que no tiene stock suficiente"""
+        for producto_id, _, cantidad, _ in lineas:
+            row = cur.execute(
+                "SELECT nombre, stock_actual FROM inv.productos WHERE id = ?", (producto_id,)
+            ).fetchone()
+            if not row:
+                return "Producto no encontrado en inventario"
+            nombre_producto, stock_actual = row
+            if stock_actual < cantidad:
+                return f"Stock insuficiente para {nombre_producto}. Disponible: {stock_actual}"
+        return "Stock insuficiente al procesar la venta"
+    
     @classmethod
     def ventas_del_dia(cls, usuario: str) -> float:
         """Retorna el total de ventas del día para un usuario"""
@@ -154,10 +460,7 @@ class VentasBuilder:
             con = cls.get_conexion()
             cur = con.cursor()
             hoy = datetime.date.today()
-            cur.execute(
-                "SELECT SUM(total) FROM ventas WHERE usuario=? AND fecha=?",
-                (usuario, hoy)
-            )
+            cur.execute(cls.SQL_VENTAS_DEL_DIA, (usuario, hoy))
             total = cur.fetchone()[0] or 0.0
             con.close()
             return total
@@ -174,28 +477,9 @@ class VentasBuilder:
             hoy = datetime.date.today()
             
             if limite == 0:  # Si es 0, obtener todas las ventas del día
-                cur.execute("""
-                    SELECT COALESCE(v.fecha_hora, v.fecha || ' 00:00:00') as fecha_hora,
-                           GROUP_CONCAT(vd.producto, ', ') as productos,
-                           v.total
-                    FROM ventas v
-                    LEFT JOIN ventas_detalle vd ON v.id = vd.venta_id
-                    WHERE v.usuario = ? AND v.fecha = ?
-                    GROUP BY v.id
-                    ORDER BY v.id DESC
-                """, (usuario, hoy))
+                cur.execute(cls.SQL_ULTIMAS_VENTAS_DIA, (usuario, hoy))
             else:
-                cur.execute("""
-                    SELECT COALESCE(v.fecha_hora, v.fecha || ' 00:00:00') as fecha_hora,
-                           GROUP_CONCAT(vd.producto, ', ') as productos,
-                           v.total
-                    FROM ventas v
-                    LEFT JOIN ventas_detalle vd ON v.id = vd.venta_id
-                    WHERE v.usuario = ?
-                    GROUP BY v.id
-                    ORDER BY v.id DESC
-                    LIMIT ?
-                """, (usuario, limite))
+                cur.execute(cls.SQL_ULTIMAS_VENTAS, (usuario, limite))
             
             rows = cur.fetchall()
             con.close()
@@ -235,29 +519,114 @@ class VentasBuilder:
             return []
     
     @classmethod
-    def registrar_auditoria(cls, usuario: str, tipo: str, descripcion: str, detalles: str = ""):
-        """Registra una acción en la auditoría"""
+    def resumen_diario(cls, fecha_inicio: str, fecha_fin: str) -> dict:
+        """
+        Totales de un rango leídos de ventas_diarias (una fila por día y tipo)
+        Args:
+            fecha_inicio, fecha_fin: 'YYYY-MM-DD' inclusivas
+        Returns:
+            dict: total_ventas, num_transacciones, articulos,
+                  ventas_por_dia {fecha: total}, ventas_por_tipo {tipo: total}
+        """
+        resumen = {
+            "total_ventas": 0.0,
+            "num_transacciones": 0,
+            "articulos": 0,
+            "ventas_por_dia": {},
+            "ventas_por_tipo": {"Normal": 0, "Mayoreo": 0, "Promoción": 0},
+        }
         try:
             con = cls.get_conexion()
-            cur = con.cursor()
-            ahora = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            cur.execute(
-                "INSERT INTO auditoria(fecha_hora, usuario, tipo, descripcion, detalles) VALUES(?,?,?,?,?)",
-                (ahora, usuario, tipo, descripcion, detalles)
-            )
-            con.commit()
-            con.close()
-            return True
+            try:
+                # Los paneles de admin pueden abrirse sin haber pasado por db.inicializar_bd
+                aplicar_migraciones(con, cls.MIGRACIONES)
+                rows = con.execute(cls.SQL_RESUMEN_DIARIO, (fecha_inicio, fecha_fin)).fetchall()
+            finally:
+                con.close()
         except Exception as e:
-            # Silenciar errores de auditoría para no afectar la operación principal
-            # print(f"⚠️ Error registrando auditoría: {e}")
-            return False
+            print(f"Error obteniendo resumen diario: {e}")
+            return resumen
+        
+        por_dia = resumen["ventas_por_dia"]
+        por_tipo = resumen["ventas_por_tipo"]
+        for fecha, tipo, num, total, articulos in rows:
+            resumen["total_ventas"] += total
+            resumen["num_transacciones"] += num
+            resumen["articulos"] += articulos
+            por_dia[fecha] = por_dia.get(fecha, 0) + total
+            por_tipo[tipo] = por_tipo.get(tipo, 0) + total
+        return resumen
+    
+    @classmethod
+    def resumen_reporte(cls, fecha_inicio: str, fecha_fin: str, top_n: int = 10) -> dict:
+        """
+        Todo lo que necesita la pantalla de reportes con dos consultas agrupadas
+        Args:
+            fecha_inicio, fecha_fin: 'YYYY-MM-DD' inclusivas
+            top_n: cuántos productos devolver en cada ranking
+        Returns:
+            dict: lo de resumen_diario más ticket_promedio,
+                  productos_top (por ingresos) y productos_top_cantidad;
+                  cada producto es {"nombre", "cantidad", "ingresos"}
+        """
+        resumen = cls.resumen_diario(fecha_inicio, fecha_fin)
+        num = resumen["num_transacciones"]
+        resumen["ticket_promedio"] = resumen["total_ventas"] / num if num > 0 else 0
+        resumen["productos_top"] = []
+        resumen["productos_top_cantidad"] = []
+        if num == 0:
+            return resumen
+        
+        try:
+            con = cls.get_conexion()
+            try:
+                rows = con.execute(cls.SQL_PRODUCTOS_RANGO, (fecha_inicio, fecha_fin)).fetchall()
+            finally:
+                con.close()
+        except Exception as e:
+            print(f"Error obteniendo productos del reporte: {e}")
+            return resumen
+        
+        productos = [
+            {"nombre": nombre, "cantidad": cantidad or 0, "ingresos": ingresos or 0.0}
+            for nombre, cantidad, ingresos in rows
+        ]
+        resumen["productos_top"] = heapq.nlargest(top_n, productos, key=lambda p: p["ingresos"])
+        resumen["productos_top_cantidad"] = heapq.nlargest(top_n, productos, key=lambda p: p["cantidad"])
+        return resumen
+    
+    @classmethod
+    def sumidero_auditoria(cls) -> SumideroAuditoria:
+        """Cola de escritura diferida de auditoría (se crea al primer uso)"""
+        if cls._sumidero is None:
+            with cls._sumidero_lock:
+                if cls._sumidero is None:
+                    # Los lotes se escriben en el hilo escritor del gateway, en la
+                    # misma cola que ventas y ajustes de stock
+                    cls._sumidero = SumideroAuditoria(
+                        cls.get_conexion, ejecutor=obtener_gateway().enviar_escritura,
+                        **cls.CONFIG_AUDITORIA
+                    )
+        return cls._sumidero
+    
+    @classmethod
+    def registrar_auditoria(cls, usuario: str, tipo: str, descripcion: str, detalles: str = ""):
+        """Registra una acción en la auditoría (se escribe por lotes en segundo plano)"""
+        ahora = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return cls.sumidero_auditoria().registrar(ahora, usuario, tipo, descripcion, detalles)
+    
+    @classmethod
+    def vaciar_auditoria(cls) -> bool:
+        """Escribe en la base los eventos de auditoría aún en cola"""
+        if cls._sumidero is None:
+            return True
+        return cls._sumidero.vaciar()
     
     @classmethod
     def obtener_auditoria(cls, limite: int = 100, usuario: str = None):
         """Obtiene registros de auditoría"""
         try:
+            cls.vaciar_auditoria()
             con = cls.get_conexion()
             cur = con.cursor()
             
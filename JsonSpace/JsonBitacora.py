@@ -0,0 +1,240 @@
+# JsonBitacora.py
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Optional
+
+from .JsonSP import JsonDB
+
+
+class JsonDBBitacora(JsonDB):
+    """
+    JsonDB con almacenamiento en bitácora (log-structured).
+
+    En lugar de reescribir el documento completo en cada cambio, cada
+    guardar / agregar / actualizar / eliminar agrega una línea JSONL a la
+    bitácora con la operación ("set", "merge" o "delete") y su ruta, así
+    escribir cuesta lo mismo con 10 o con 100 000 llaves. Al cargar se lee
+    la última foto (snapshot) y se le aplican las líneas de la bitácora.
+
+    Cuando la bitácora crece más de `proporcion_compactacion` veces la foto,
+    un hilo aparte escribe una foto nueva y reinicia la bitácora. Los
+    respaldos son la foto y el segmento de bitácora anteriores, enlazados
+    (sin copiarlos) al compactar, en lugar de una copia completa por cambio.
+
+    Archivos:
+        datos.json            foto del documento (JSON normal)
+        datos.json.log        cambios posteriores a la foto, uno por línea
+        datos.json.backups/   fotos y segmentos anteriores
+
+    Ejemplo:
+        >>> db = JsonDBBitacora("Json files/users.json")
+        >>> db.guardar("usuarios.ana", {"rol": "Empleado"})   # una línea en users.json.log
+        >>> db.compactar()                                     # foto nueva, bitácora vacía
+    """
+
+    def __init__(
+        self,
+        ruta_archivo: str = "datos.json",
+        crear_si_no_existe: bool = True,
+        respaldos: bool = True,
+        max_respaldos: int = 5,
+        compacto: bool = False,
+        proporcion_compactacion: float = 1.0,
+        minimo_compactacion: int = 64 * 1024,
+        fsync: bool = True,
+        espera_bloqueo: float = 10.0
+    ):
+        """
+        Inicializa la base de datos con bitácora.
+
+        :param ruta_archivo: Ruta de la foto JSON (la bitácora es ruta + ".log").
+        :param crear_si_no_existe: Si es True, crea la foto si no existe.
+        :param respaldos: Si es True, conserva fotos y segmentos anteriores al compactar.
+        :param max_respaldos: Número máximo de respaldos (foto + segmento) a mantener.
+        :param compacto: Si es True, la foto se guarda sin sangría.
+        :param proporcion_compactacion: Compacta cuando bitácora > proporción × foto.
+        :param minimo_compactacion: Bytes de bitácora por debajo de los cuales nunca compacta.
+        :param fsync: Si es True, cada línea se fuerza a disco antes de seguir.
+        :param espera_bloqueo: Segundos máximos esperando el bloqueo de otro proceso.
+        """
+        self.ruta_bitacora = os.path.abspath(ruta_archivo) + ".log"
+        self.proporcion_compactacion = proporcion_compactacion
+        self.minimo_compactacion = minimo_compactacion
+        self.fsync = fsync
+        self._tam_bitacora = 0
+        self._compactando = False
+        # Una compactación a la vez (dos a la vez calcularían mal lo que resta de la bitácora)
+        self._lock_compactacion = threading.Lock()
+        super().__init__(
+            ruta_archivo,
+            crear_si_no_existe=crear_si_no_existe,
+            respaldos=respaldos,
+            max_respaldos=max_respaldos,
+            compacto=compacto,
+            espera_bloqueo=espera_bloqueo,
+        )
+
+    # ==============================
+    # 🔹 LECTURA: FOTO + BITÁCORA
+    # ==============================
+
+    def _firma_archivo(self) -> Optional[tuple]:
+        """Firma de la foto y de la bitácora juntas (cambia si cualquiera cambia)."""
+        firmas = []
+        for ruta in (self.ruta_archivo, self.ruta_bitacora):
+            try:
+                info = os.stat(ruta)
+                firmas.append((info.st_mtime_ns, info.st_size, info.st_ino))
+            except FileNotFoundError:
+                firmas.append(None)
+        return None if firmas == [None, None] else tuple(firmas)
+
+    def _cargar(self) -> dict:
+        """Lee la foto y le aplica, en orden, los cambios de la bitácora."""
+        datos = super()._cargar()
+        self._tam_bitacora = 0
+        try:
+            f = open(self.ruta_bitacora, 'rb')
+        except FileNotFoundError:
+            return datos
+        with f:
+            for linea in f:
+                self._tam_bitacora += len(linea)
+                try:
+                    if not linea.endswith(b"\n"):
+                        raise ValueError("línea sin terminar")
+                    registro = json.loads(linea)
+                    datos = self._aplicar(datos, registro["op"], registro["ruta"], registro.get("valor"))
+                except (ValueError, KeyError, TypeError):
+                    # Línea a medio escribir (corte durante un cambio): se descarta
+                    print(f"Advertencia: se ignora un cambio incompleto en '{self.ruta_bitacora}'")
+        return datos
+
+    # ==============================
+    # 🔹 ESCRITURA: UNA LÍNEA POR CAMBIO
+    # ==============================
+
+    def _escribir_datos(self, datos: dict, cambios: list = None):
+        """Agrega los cambios a la bitácora (una escritura) y deja `datos` como contenido vigente."""
+        cambios = cambios or [("set", [], datos)]
+        linea = "".join(
+            json.dumps(
+                {"op": operacion, "ruta": list(claves), "valor": valor},
+                ensure_ascii=False, separators=(",", ":")
+            ) + "\n"
+            for operacion, claves, valor in cambios
+        )
+        with self._lock, self._bloqueo.exclusivo():
+            # Líneas de otro proceso desde la última lectura: quedan antes de
+            # las nuestras en la bitácora, igual que en el caché
+            datos, externo = self._al_dia(datos, cambios)
+            with open(self.ruta_bitacora, 'a+b') as f:
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        # Quedó una línea cortada: se cierra para no pegarle este cambio
+                        linea = "\n" + linea
+                f.write(linea.encode('utf-8'))
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._cache, self._firma = datos, self._firma_archivo()
+            self._version += 1
+            self._tam_bitacora = self._firma[1][1] if self._firma[1] else 0
+            compactar = not self._compactando and self._requiere_compactacion()
+            if compactar:
+                self._compactando = True
+        self._notificar(externo=externo)
+        if compactar:
+            threading.Thread(target=self._compactar_en_segundo_plano, name="JsonDB-compactar", daemon=True).start()
+
+    def _requiere_compactacion(self) -> bool:
+        tam_foto = self._firma[0][1] if self._firma and self._firma[0] else 0
+        return self._tam_bitacora > max(self.minimo_compactacion, self.proporcion_compactacion * tam_foto)
+
+    def _compactar_en_segundo_plano(self):
+        try:
+            self.compactar()
+        except Exception as e:
+            print(f"Error compactando '{self.ruta_archivo}': {e}")
+        finally:
+            with self._lock:
+                self._compactando = False
+
+    def compactar(self):
+        """
+        Escribe una foto con el contenido vigente y deja en la bitácora solo
+        los cambios que llegaron mientras tanto.
+
+        La foto se serializa sin bloquear a los escritores: los cambios nunca
+        modifican objetos del caché ya publicados (copian su ruta), así que la
+        raíz tomada bajo el lock es una versión fija.
+        """
+        with self._lock_compactacion:
+            with self._lock:
+                datos = self._leer_datos()
+                hasta = self._tam_bitacora
+                foto = self._firma[0] if self._firma else None
+            texto = self._serializar(datos)
+            self._reemplazar_foto(texto, hasta, foto)
+
+    def _reemplazar_foto(self, texto: str, hasta: int, foto: Optional[tuple] = None):
+        """Escribe la foto nueva y recorta la bitácora hasta el byte `hasta`."""
+        with self._lock, self._bloqueo.exclusivo():
+            firma = self._firma_archivo()
+            if (firma[0] if firma else None) != foto:
+                # Otro proceso compactó mientras tanto: `hasta` ya no aplica
+                return
+            # Otro proceso agregó líneas desde la última lectura: quedan en
+            # `resto`, pero el caché no las tiene
+            externo = firma != self._firma
+            if self.respaldos:
+                self._crear_respaldo()
+            # Cambios agregados después de tomar la foto
+            try:
+                with open(self.ruta_bitacora, 'rb') as f:
+                    f.seek(hasta)
+                    resto = f.read()
+            except FileNotFoundError:
+                resto = b""
+            # Si se corta entre los dos reemplazos queda la foto nueva con la
+            # bitácora anterior completa: volver a aplicar set/merge/delete en
+            # orden sobre la foto deja el mismo resultado
+            self._escribir_atomico(self.ruta_archivo, texto)
+            self._escribir_atomico(self.ruta_bitacora, resto.decode('utf-8'))
+            self._tam_bitacora = len(resto)
+            # Con cambios externos la firma queda sin coincidir: la siguiente
+            # lectura o escritura recarga foto + bitácora
+            self._firma = None if externo else self._firma_archivo()
+
+    def _crear_respaldo(self):
+        """Enlaza (sin copiar) la foto y el segmento de bitácora actuales en .backups."""
+        backup_dir = self.ruta_archivo + ".backups"
+        os.makedirs(backup_dir, exist_ok=True)
+        marca = time.time_ns()
+        for origen, extension in ((self.ruta_archivo, ".json"), (self.ruta_bitacora, ".log")):
+            if not os.path.exists(origen):
+                continue
+            destino = os.path.join(backup_dir, f"backup_{marca}{extension}")
+            try:
+                os.link(origen, destino)
+            except OSError:
+                # Sistemas de archivos sin enlaces duros
+                shutil.copy2(origen, destino)
+
+        marcas = sorted({
+            int(nombre.split('_')[1].split('.')[0])
+            for nombre in os.listdir(backup_dir) if nombre.startswith("backup_")
+        })
+        for vieja in marcas[:-self.max_respaldos]:
+            for extension in (".json", ".log"):
+                try:
+                    os.remove(os.path.join(backup_dir, f"backup_{vieja}{extension}"))
+                except FileNotFoundError:
+                    pass
+
+    def __repr__(self):
+        return f"<JsonDBBitacora ruta='{self.ruta_archivo}'>"
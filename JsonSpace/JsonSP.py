@@ -1,10 +1,209 @@
 # JsonDB.py
+import atexit
+import copy
 import json
 import os
 import shutil
 import threading
+import tempfile
 import time
-from typing import Any, Dict, List, Optional, Union
+import weakref
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:     # POSIX
+    msvcrt = None
+
+
+def _vista(valor: Any) -> Any:
+    """Envuelve dicts y listas del caché para que no se puedan modificar."""
+    if isinstance(valor, dict):
+        return VistaJson(valor)
+    if isinstance(valor, list):
+        return tuple(_vista(v) for v in valor)
+    return valor
+
+
+class VistaJson(Mapping):
+    """
+    Vista de solo lectura sobre un objeto del caché de JsonDB.
+    
+    Se usa como un dict (get, items, in, [clave]) pero no permite
+    modificarlo; los objetos anidados también son vistas y las listas
+    se entregan como tuplas. Para modificar, pedir una copia.
+    
+    Ejemplo:
+        >>> usuario = db.obtener("usuarios.ana")
+        >>> usuario.get("rol")
+        'Admin'
+        >>> editable = usuario.copia()   # dict independiente
+    """
+
+    __slots__ = ("_datos",)
+
+    def __init__(self, datos: dict):
+        self._datos = datos
+
+    def __getitem__(self, clave):
+        return _vista(self._datos[clave])
+
+    def __iter__(self):
+        return iter(self._datos)
+
+    def __len__(self):
+        return len(self._datos)
+
+    def __contains__(self, clave):
+        return clave in self._datos
+
+    def copia(self) -> dict:
+        """Devuelve una copia profunda y modificable como dict."""
+        return copy.deepcopy(self._datos)
+
+    def __repr__(self):
+        return f"VistaJson({self._datos!r})"
+
+
+class ConflictoVersion(Exception):
+    """El contenido cambió (otro proceso u otra ventana) desde la versión leída."""
+
+
+class BloqueoArchivo:
+    """
+    Bloqueo entre procesos (advisory) sobre el archivo auxiliar "<ruta>.lock".
+    
+    Se bloquea un archivo aparte porque el de datos se reemplaza con
+    os.replace en cada escritura y un bloqueo sobre él quedaría en el archivo
+    viejo. Usa fcntl.flock en POSIX (compartido para lectores, exclusivo para
+    escritores), msvcrt.locking en Windows (siempre exclusivo) y, si no hay
+    ninguno, un directorio "<ruta>.lock.d" creado con os.mkdir (exclusivo).
+    
+    Es reentrante: quien ya lo tiene puede volver a pedirlo. No protege entre
+    hilos por sí solo; JsonDB lo toma siempre con su RLock tomado.
+    
+    Ejemplo:
+        >>> bloqueo = BloqueoArchivo("Json files/users.json")
+        >>> with bloqueo.exclusivo():
+        ...     pass   # ningún otro proceso lee ni escribe aquí
+    """
+
+    # Segundos tras los que un directorio de bloqueo se da por abandonado
+    ABANDONO = 60.0
+
+    def __init__(self, ruta: str, espera: float = 10.0):
+        """
+        :param ruta: Ruta del archivo a proteger (el bloqueo es ruta + ".lock").
+        :param espera: Segundos máximos esperando el bloqueo antes de TimeoutError.
+        """
+        self.ruta = ruta + ".lock"
+        self.espera = espera
+        self._fd = None
+        self._nivel = 0
+        self._exclusivo = False
+
+    def compartido(self):
+        """Bloqueo de lectura: varios procesos pueden tenerlo a la vez."""
+        return self._tomar(exclusivo=False)
+
+    def exclusivo(self):
+        """Bloqueo de escritura: un solo proceso y sin lectores."""
+        return self._tomar(exclusivo=True)
+
+    @contextmanager
+    def _tomar(self, exclusivo: bool):
+        if self._nivel:
+            if exclusivo and not self._exclusivo:
+                raise RuntimeError("No se puede pasar de bloqueo compartido a exclusivo")
+            self._nivel += 1
+            try:
+                yield
+            finally:
+                self._nivel -= 1
+            return
+        
+        limite = time.monotonic() + self.espera
+        pausa = 0.001
+        while not self._intentar(exclusivo):
+            if time.monotonic() >= limite:
+                raise TimeoutError(f"No se pudo bloquear '{self.ruta}' en {self.espera} s")
+            time.sleep(pausa)
+            pausa = min(pausa * 2, 0.05)
+        self._nivel, self._exclusivo = 1, exclusivo
+        try:
+            yield
+        finally:
+            self._nivel = 0
+            self._liberar()
+
+    def _abrir(self) -> int:
+        if self._fd is None:
+            os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            self._fd = os.open(self.ruta, os.O_RDWR | os.O_CREAT, 0o666)
+        return self._fd
+
+    def _intentar(self, exclusivo: bool) -> bool:
+        """Intenta tomar el bloqueo sin esperar."""
+        if fcntl is not None:
+            modo = fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH
+            try:
+                fcntl.flock(self._abrir(), modo | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            return True
+        if msvcrt is not None:
+            fd = self._abrir()
+            os.lseek(fd, 0, os.SEEK_SET)
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            except OSError:
+                return False
+            return True
+        
+        directorio = self.ruta + ".d"
+        try:
+            os.mkdir(directorio)
+        except FileExistsError:
+            try:
+                # Un proceso que murió con el bloqueo tomado no lo libera
+                if time.time() - os.stat(directorio).st_mtime > self.ABANDONO:
+                    os.rmdir(directorio)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def _liberar(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        else:
+            try:
+                os.rmdir(self.ruta + ".d")
+            except OSError:
+                pass
+
+
+# Bases con escrituras diferidas o manuales: se sincronizan al salir
+_por_sincronizar = weakref.WeakSet()
+
+
+@atexit.register
+def _sincronizar_al_salir():
+    for db in list(_por_sincronizar):
+        try:
+            db.sincronizar()
+        except Exception as e:
+            print(f"Error guardando '{db.ruta_archivo}' al salir: {e}")
+
 
 class JsonDB:
     """
@@ -14,6 +213,24 @@ class JsonDB:
     Soporta rutas anidadas (ej: "usuario.perfil.nombre"), respaldos automáticos,
     y operaciones seguras en entornos con hilos.
     
+    El contenido se mantiene en memoria: cada lectura solo hace os.stat y se
+    vuelve a parsear el archivo únicamente si cambió (st_mtime_ns, st_size).
+    Las lecturas devuelven vistas de solo lectura (VistaJson) sobre ese caché;
+    las escrituras copian solo la ruta que modifican.
+    
+    El archivo se escribe de forma atómica (archivo temporal + fsync +
+    os.replace): un corte a media escritura deja la versión anterior intacta.
+    Con modo_escritura="diferido" o "manual" una ráfaga de cambios se junta
+    en una sola escritura.
+    
+    Varios procesos (dos cajas con la carpeta "Json files" compartida) pueden
+    usar el mismo archivo: se coordinan con un BloqueoArchivo (compartido al
+    leer, exclusivo al escribir). Si al escribir el archivo cambió desde la
+    última lectura, los cambios propios se vuelven a aplicar sobre la versión
+    del otro proceso en lugar de pisarla; transaccion() toma el bloqueo
+    exclusivo de principio a fin, y transaccion(version=...) avisa con
+    ConflictoVersion si el contenido cambió desde version().
+    
     Ejemplo básico:
         >>> db = JsonDB("mi_app.json")
         >>> db["usuario"] = "Carlos"
@@ -22,12 +239,18 @@ class JsonDB:
         Carlos
     """
 
+    MODOS_ESCRITURA = ("inmediato", "diferido", "manual")
+
     def __init__(
         self,
         ruta_archivo: str = "datos.json",
         crear_si_no_existe: bool = True,
         respaldos: bool = True,
-        max_respaldos: int = 5
+        max_respaldos: int = 5,
+        modo_escritura: str = "inmediato",
+        retraso_escritura: float = 0.5,
+        compacto: bool = False,
+        espera_bloqueo: float = 10.0
     ):
         """
         Inicializa la base de datos JSON.
@@ -36,14 +259,48 @@ class JsonDB:
         :param crear_si_no_existe: Si es True, crea el archivo si no existe.
         :param respaldos: Si es True, crea copias de seguridad antes de sobrescribir.
         :param max_respaldos: Número máximo de respaldos a mantener.
+        :param modo_escritura: "inmediato" escribe en cada cambio; "diferido"
+                               escribe una vez, retraso_escritura segundos
+                               después del primer cambio pendiente; "manual"
+                               solo al llamar sincronizar() (o al salir).
+        :param retraso_escritura: Segundos que junta cambios el modo "diferido".
+        :param compacto: Si es True, guarda sin sangría ni espacios (más
+                         rápido y pequeño; por defecto indent=2, legible).
+        :param espera_bloqueo: Segundos máximos esperando a otro proceso que
+                               tiene el archivo bloqueado (luego TimeoutError).
         
         Ejemplo:
             >>> db = JsonDB("config.json", respaldos=True, max_respaldos=3)
+            >>> rapido = JsonDB("ventas.json", modo_escritura="diferido", compacto=True)
         """
+        if modo_escritura not in self.MODOS_ESCRITURA:
+            raise ValueError(f"modo_escritura debe ser uno de {self.MODOS_ESCRITURA}")
         self.ruta_archivo = os.path.abspath(ruta_archivo)
         self.respaldos = respaldos
         self.max_respaldos = max_respaldos
+        self.modo_escritura = modo_escritura
+        self.retraso_escritura = retraso_escritura
+        self.compacto = compacto
         self._lock = threading.RLock()
+        self._bloqueo = BloqueoArchivo(self.ruta_archivo, espera=espera_bloqueo)
+        
+        # Cambios en el caché que aún no llegan al archivo
+        self._pendiente = False
+        self._cambios_pendientes = []
+        self._temporizador = None
+        
+        # Transacción abierta con transaccion(): copia de trabajo y cambios
+        self._transaccion = None
+        if modo_escritura != "inmediato":
+            _por_sincronizar.add(self)
+        
+        # Caché del contenido, firma (st_mtime_ns, st_size, st_ino) del
+        # archivo leído y número de versión (sube con cada cambio del caché)
+        self._cache = None
+        self._firma = None
+        self._version = 0
+        self._suscriptores = []
+        self._vigilancia = None
         
         if crear_si_no_existe:
             self._crear_si_no_existe()
@@ -52,27 +309,250 @@ class JsonDB:
         """Crea el archivo con un objeto vacío {} si no existe."""
         if not os.path.exists(self.ruta_archivo):
             os.makedirs(os.path.dirname(self.ruta_archivo), exist_ok=True)
-            self._escribir_datos({})
+            with self._lock, self._bloqueo.exclusivo():
+                # Otro proceso pudo crearlo mientras se esperaba el bloqueo
+                if not os.path.exists(self.ruta_archivo):
+                    self._persistir({})
+                    self._cache, self._firma = {}, self._firma_archivo()
+
+    def _firma_archivo(self) -> Optional[tuple]:
+        """(st_mtime_ns, st_size, st_ino) del archivo, o None si no existe."""
+        try:
+            info = os.stat(self.ruta_archivo)
+        except FileNotFoundError:
+            return None
+        # st_ino cambia con cada os.replace aunque el reloj del sistema de
+        # archivos sea grueso (carpetas compartidas en red)
+        return (info.st_mtime_ns, info.st_size, info.st_ino)
 
     def _leer_datos(self) -> dict:
-        """Lee y devuelve el contenido del archivo JSON."""
+        """
+        Devuelve el contenido del archivo JSON desde el caché.
+        
+        Solo se vuelve a leer y parsear si la firma del archivo cambió (otro
+        proceso lo editó). El dict devuelto es el del caché: no modificarlo.
+        """
         with self._lock:
-            if not os.path.exists(self.ruta_archivo):
-                return {}
-            try:
-                with open(self.ruta_archivo, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                raise ValueError(f"El archivo '{self.ruta_archivo}' no contiene JSON válido.")
+            if self._transaccion is not None:
+                # Solo el hilo de la transacción llega aquí (tiene el lock)
+                return self._transaccion["datos"]
+            cambio_externo = self._revalidar()
+        if cambio_externo:
+            self._notificar(externo=True)
+        return self._cache
+
+    def _revalidar(self) -> bool:
+        """Recarga el caché si el archivo cambió; True si cambió después de la primera lectura."""
+        if self._pendiente:
+            # Hay cambios propios sin escribir: el caché es la versión vigente
+            return False
+        if self._cache is not None and self._firma_archivo() == self._firma:
+            return False
+        # Compartido: otros lectores siguen, un escritor espera a que termine
+        with self._bloqueo.compartido():
+            firma = self._firma_archivo()
+            datos = self._cargar()
+        habia_cache = self._cache is not None
+        self._cache, self._firma = datos, firma
+        self._version += 1
+        return habia_cache
+
+    def _cargar(self) -> dict:
+        """Lee y parsea el archivo completo ({} si no existe)."""
+        try:
+            with open(self.ruta_archivo, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError:
+            raise ValueError(f"El archivo '{self.ruta_archivo}' no contiene JSON válido.")
+
+    @staticmethod
+    def _aplicar(datos: dict, operacion: str, ruta: List[str], valor: Any) -> dict:
+        """Aplica un cambio (set, merge o delete); devuelve la raíz (cambia si ruta es [])."""
+        if not ruta:
+            return valor if operacion == "set" else datos
+        padre = datos
+        for k in ruta[:-1]:
+            if not isinstance(padre.get(k), dict):
+                if operacion == "delete":
+                    return datos
+                padre[k] = {}
+            padre = padre[k]
+        ultima = ruta[-1]
+        if operacion == "set":
+            padre[ultima] = valor
+        elif operacion == "merge":
+            if isinstance(padre.get(ultima), dict):
+                padre[ultima].update(valor)
+            else:
+                padre[ultima] = valor
+        elif operacion == "delete":
+            padre.pop(ultima, None)
+        return datos
 
-    def _escribir_datos(self, datos: dict):
-        """Escribe un diccionario en el archivo JSON."""
+    def _al_dia(self, datos: dict, cambios: list) -> tuple:
+        """
+        Con el bloqueo exclusivo tomado: si otro proceso escribió el archivo
+        desde la última lectura, vuelve a aplicar `cambios` sobre su versión.
+        
+        :return: (datos a escribir, True si se incorporaron cambios externos)
+        """
+        if self._firma_archivo() == self._firma:
+            return datos, False
+        datos = self._cargar()
+        for operacion, claves, valor in cambios:
+            datos = self._aplicar(datos, operacion, list(claves), valor)
+        return datos, True
+
+    def _registrar(self, datos: dict, cambio: tuple):
+        """Aplica un cambio: a la transacción abierta o directo al archivo."""
+        if self._transaccion is not None:
+            self._transaccion["datos"] = datos
+            self._transaccion["cambios"].append(cambio)
+        else:
+            self._escribir_datos(datos, [cambio])
+
+    def _escribir_datos(self, datos: dict, cambios: list = None):
+        """
+        Deja el diccionario como contenido vigente y lo escribe según
+        modo_escritura (ya, con retraso o al llamar sincronizar()).
+        
+        :param cambios: lista de (operacion, claves, valor) que produjeron
+                        `datos` ("set", "merge" o "delete"); se vuelven a
+                        aplicar si otro proceso escribió el archivo antes.
+        """
+        cambios = cambios or [("set", [], datos)]
+        externo = False
         with self._lock:
-            if self.respaldos and os.path.exists(self.ruta_archivo):
-                self._crear_respaldo()
-            
-            with open(self.ruta_archivo, 'w', encoding='utf-8') as f:
-                json.dump(datos, f, ensure_ascii=False, indent=2)
+            if self.modo_escritura == "inmediato":
+                with self._bloqueo.exclusivo():
+                    datos, externo = self._al_dia(datos, cambios)
+                    # Si la escritura falla el caché conserva la versión anterior
+                    self._persistir(datos)
+                    self._cache, self._firma = datos, self._firma_archivo()
+                self._version += 1
+            else:
+                self._cache = datos
+                self._version += 1
+                self._pendiente = True
+                self._cambios_pendientes.extend(cambios)
+                if self.modo_escritura == "diferido" and self._temporizador is None:
+                    self._temporizador = threading.Timer(self.retraso_escritura, self._sincronizar_diferido)
+                    self._temporizador.daemon = True
+                    self._temporizador.start()
+        self._notificar(externo=externo)
+
+    def sincronizar(self):
+        """
+        Escribe ya los cambios pendientes (modos "diferido" y "manual").
+        
+        Ejemplo:
+            >>> db = JsonDB("empleados.json", modo_escritura="manual")
+            >>> for nombre in nombres:
+            ...     db.guardar(f"usuarios.{nombre}", {"rol": "Empleado"})
+            >>> db.sincronizar()   # una sola escritura
+        """
+        with self._lock:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+            if not self._pendiente:
+                return
+            with self._bloqueo.exclusivo():
+                datos, externo = self._al_dia(self._cache, self._cambios_pendientes)
+                self._persistir(datos)
+                self._cache, self._firma = datos, self._firma_archivo()
+            self._pendiente = False
+            self._cambios_pendientes = []
+            if externo:
+                self._version += 1
+        if externo:
+            self._notificar(externo=True)
+
+    def _sincronizar_diferido(self):
+        try:
+            self.sincronizar()
+        except Exception as e:
+            print(f"Error guardando '{self.ruta_archivo}': {e}")
+
+    def _persistir(self, datos: dict):
+        """Respalda (si aplica) y escribe el documento completo de forma atómica."""
+        if self.respaldos and os.path.exists(self.ruta_archivo):
+            self._crear_respaldo()
+        self._escribir_atomico(self.ruta_archivo, self._serializar(datos))
+
+    def _serializar(self, datos: Any) -> str:
+        """Texto JSON del documento según `compacto`."""
+        # json.dumps arma el texto de una vez (mucho más rápido que json.dump
+        # escribiendo fragmento por fragmento)
+        if self.compacto:
+            return json.dumps(datos, ensure_ascii=False, separators=(",", ":"))
+        return json.dumps(datos, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def _escribir_atomico(ruta: str, texto: str):
+        """Escribe `texto` en `ruta` vía archivo temporal + fsync + os.replace."""
+        directorio = os.path.dirname(ruta)
+        fd, temporal = tempfile.mkstemp(
+            dir=directorio, prefix=f".{os.path.basename(ruta)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(texto)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, ruta)
+        except BaseException:
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+            raise
+        
+        # El cambio de nombre queda en disco al sincronizar el directorio (POSIX)
+        if hasattr(os, "O_DIRECTORY"):
+            try:
+                fd_dir = os.open(directorio, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(fd_dir)
+                finally:
+                    os.close(fd_dir)
+            except OSError:
+                pass
+
+    def _copiar_ruta(self, datos: dict, claves: List[str]) -> dict:
+        """
+        Copia superficial de la raíz y de los dicts en la ruta claves[:-1].
+        
+        Las escrituras modifican esa copia, así el caché que ven los lectores
+        no cambia hasta que el archivo quedó escrito. En los modos "diferido"
+        y "manual" el caché ya es la versión vigente (aún sin escribir) y se
+        modifica en su lugar, así una ráfaga no copia el documento por cambio.
+        """
+        if self._transaccion is not None:
+            # Cada dict se copia solo la primera vez que la transacción lo toca
+            propios = self._transaccion["propios"]
+            def copiar(d):
+                if id(d) in propios:
+                    return d
+                copia = dict(d)
+                propios[id(copia)] = copia
+                return copia
+        elif self.modo_escritura != "inmediato":
+            return datos
+        else:
+            copiar = dict
+        raiz = copiar(datos)
+        actual = raiz
+        for k in claves[:-1]:
+            hijo = actual.get(k)
+            if not isinstance(hijo, dict):
+                break
+            hijo = copiar(hijo)
+            actual[k] = hijo
+            actual = hijo
+        return raiz
 
     def _crear_respaldo(self):
         """Crea una copia de seguridad del archivo actual."""
@@ -112,13 +592,16 @@ class JsonDB:
     # 🔹 MÉTODOS PRINCIPALES
     # ==============================
 
-    def obtener(self, clave: str, valor_por_defecto: Any = None, separador: str = ".") -> Any:
+    def obtener(self, clave: str, valor_por_defecto: Any = None, separador: str = ".",
+                copia: bool = False) -> Any:
         """
         Obtiene el valor asociado a una clave. Soporta rutas anidadas.
         
         :param clave: Clave a buscar (ej: "usuario.nombre").
         :param valor_por_defecto: Valor a devolver si la clave no existe.
         :param separador: Carácter usado para separar niveles (por defecto ".").
+        :param copia: Si es True, devuelve una copia modificable en lugar de
+                      una vista de solo lectura (VistaJson / tupla).
         :return: Valor encontrado o valor_por_defecto.
         
         Ejemplos:
@@ -131,7 +614,9 @@ class JsonDB:
         """
         datos = self._leer_datos()
         valor = self._obtener_valor_anidado(datos, clave, separador)
-        return valor if valor is not None else valor_por_defecto
+        if valor is None:
+            return valor_por_defecto
+        return copy.deepcopy(valor) if copia else _vista(valor)
 
     def guardar(self, clave: str, valor: Any, separador: str = "."):
         """
@@ -147,9 +632,12 @@ class JsonDB:
             >>> db.guardar("app.version", "1.0")
             # Resultado: {"app": {"nombre": "MiApp", "version": "1.0"}}
         """
-        datos = self._leer_datos()
-        self._establecer_valor_anidado(datos, clave, valor, separador)
-        self._escribir_datos(datos)
+        # El caché no debe cambiar si quien llama modifica después su objeto
+        valor = copy.deepcopy(valor)
+        with self._lock:
+            datos = self._copiar_ruta(self._leer_datos(), clave.split(separador))
+            self._establecer_valor_anidado(datos, clave, valor, separador)
+            self._registrar(datos, ("set", clave.split(separador), valor))
 
     def agregar(self, clave: str, valor: Any, separador: str = "."):
         """
@@ -172,31 +660,33 @@ class JsonDB:
             >>> db.agregar("config", {"idioma": "es"})
             # Resultado: {"config": {"tema": "oscuro", "idioma": "es"}}
         """
-        datos = self._leer_datos()
-        valor_actual = self._obtener_valor_anidado(datos, clave, separador)
-        
-        if valor_actual is None:
-            # La clave no existe: 
-            # - Si el valor es un dict, guardar como dict
-            # - Si no, guardar como lista con un elemento
-            if isinstance(valor, dict):
-                self._establecer_valor_anidado(datos, clave, valor, separador)
+        valor = copy.deepcopy(valor)
+        with self._lock:
+            datos = self._copiar_ruta(self._leer_datos(), clave.split(separador))
+            valor_actual = self._obtener_valor_anidado(datos, clave, separador)
+            
+            # Se arma un valor nuevo en lugar de modificar el del caché
+            if valor_actual is None:
+                # La clave no existe: 
+                # - Si el valor es un dict, guardar como dict
+                # - Si no, guardar como lista con un elemento
+                nuevo = valor if isinstance(valor, dict) else [valor]
+                cambio = ("set", nuevo)
+            elif isinstance(valor_actual, list):
+                # Ya es una lista: añadir
+                nuevo = valor_actual + [valor]
+                cambio = ("set", nuevo)
+            elif isinstance(valor_actual, dict) and isinstance(valor, dict):
+                # Fusionar diccionarios
+                nuevo = {**valor_actual, **valor}
+                cambio = ("merge", valor)
             else:
-                self._establecer_valor_anidado(datos, clave, [valor], separador)
-        elif isinstance(valor_actual, list):
-            # Ya es una lista: añadir
-            valor_actual.append(valor)
-            self._establecer_valor_anidado(datos, clave, valor_actual, separador)
-        elif isinstance(valor_actual, dict) and isinstance(valor, dict):
-            # Fusionar diccionarios
-            valor_actual.update(valor)
-            self._establecer_valor_anidado(datos, clave, valor_actual, separador)
-        else:
-            # Caso mixto: convertir a lista
-            nueva_lista = [valor_actual, valor]
-            self._establecer_valor_anidado(datos, clave, nueva_lista, separador)
-        
-        self._escribir_datos(datos)
+                # Caso mixto: convertir a lista
+                nuevo = [valor_actual, valor]
+                cambio = ("set", nuevo)
+            
+            self._establecer_valor_anidado(datos, clave, nuevo, separador)
+            self._registrar(datos, (cambio[0], clave.split(separador), cambio[1]))
 
     def actualizar(self, clave: str, actualizaciones: dict, separador: str = "."):
         """
@@ -214,16 +704,17 @@ class JsonDB:
             >>> db.actualizar("usuario", {"edad": 26, "ciudad": "Madrid"})
             # Resultado: {"usuario": {"nombre": "Ana", "edad": 26, "ciudad": "Madrid"}}
         """
-        datos = self._leer_datos()
-        valor_actual = self._obtener_valor_anidado(datos, clave, separador)
-        if valor_actual is None:
-            raise KeyError(f"La clave '{clave}' no existe.")
-        if not isinstance(valor_actual, dict):
-            raise TypeError(f"El valor en '{clave}' no es un diccionario.")
-        
-        valor_actual.update(actualizaciones)
-        self._establecer_valor_anidado(datos, clave, valor_actual, separador)
-        self._escribir_datos(datos)
+        with self._lock:
+            datos = self._copiar_ruta(self._leer_datos(), clave.split(separador))
+            valor_actual = self._obtener_valor_anidado(datos, clave, separador)
+            if valor_actual is None:
+                raise KeyError(f"La clave '{clave}' no existe.")
+            if not isinstance(valor_actual, dict):
+                raise TypeError(f"El valor en '{clave}' no es un diccionario.")
+            
+            actualizaciones = copy.deepcopy(actualizaciones)
+            self._establecer_valor_anidado(datos, clave, {**valor_actual, **actualizaciones}, separador)
+            self._registrar(datos, ("merge", clave.split(separador), actualizaciones))
 
     def eliminar(self, clave: str, separador: str = "."):
         """
@@ -248,12 +739,13 @@ class JsonDB:
                 return _eliminar_recursivo(d[claves[0]], claves[1:])
             return False
 
-        datos = self._leer_datos()
-        claves = clave.split(separador)
-        if _eliminar_recursivo(datos, claves):
-            self._escribir_datos(datos)
-        else:
-            raise KeyError(f"La clave '{clave}' no existe.")
+        with self._lock:
+            claves = clave.split(separador)
+            datos = self._copiar_ruta(self._leer_datos(), claves)
+            if _eliminar_recursivo(datos, claves):
+                self._registrar(datos, ("delete", claves, None))
+            else:
+                raise KeyError(f"La clave '{clave}' no existe.")
 
     def existe(self, clave: str, separador: str = ".") -> bool:
         """
@@ -265,7 +757,8 @@ class JsonDB:
             >>> db.existe("nombre")
             True
         """
-        return self.obtener(clave, separador=separador) is not None
+        datos = self._leer_datos()
+        return self._obtener_valor_anidado(datos, clave, separador) is not None
 
     def todas_las_claves(self, datos: dict = None, prefijo: str = "") -> List[str]:
         """
@@ -289,13 +782,141 @@ class JsonDB:
                 claves.append(clave_actual)
         return claves
 
-    def todo(self) -> dict:
-        """Devuelve todo el contenido como diccionario."""
-        return self._leer_datos()
+    def todo(self, copia: bool = False) -> Union[VistaJson, dict]:
+        """
+        Devuelve todo el contenido: vista de solo lectura o, con copia=True, un dict.
+        """
+        datos = self._leer_datos()
+        return copy.deepcopy(datos) if copia else VistaJson(datos)
 
     def vaciar(self):
         """Elimina todos los datos (deja un objeto vacío {})."""
-        self._escribir_datos({})
+        with self._lock:
+            self._registrar({}, ("set", [], {}))
+
+    # ==============================
+    # 🔹 TRANSACCIONES
+    # ==============================
+
+    def version(self) -> int:
+        """
+        Número de versión del contenido; cambia con cada escritura propia o
+        de otro proceso. Se pasa a transaccion(version=...) para detectar que
+        alguien más cambió los datos mientras el usuario los editaba.
+        """
+        with self._lock:
+            self._leer_datos()
+            return self._version
+
+    @contextmanager
+    def transaccion(self, version: Optional[int] = None):
+        """
+        Agrupa varios cambios en una sola escritura (y un solo respaldo).
+        
+        Dentro del bloque guardar / agregar / actualizar / eliminar trabajan
+        sobre una copia en memoria (las lecturas del mismo hilo ya ven los
+        cambios); al salir se escribe una vez. Si ocurre una excepción no se
+        escribe nada y el contenido queda como estaba. En los modos "diferido"
+        y "manual" también se escribe al salir (con lo pendiente).
+        
+        Mientras dura, los demás hilos esperan el lock y los demás procesos el
+        bloqueo exclusivo del archivo, así leer-modificar-escribir no pierde
+        cambios ajenos.
+        Una transacción dentro de otra se une a la exterior.
+        
+        :param version: Valor de version() con el que se leyeron los datos;
+                        si el contenido cambió desde entonces lanza
+                        ConflictoVersion sin escribir nada.
+        
+        Ejemplo:
+            >>> with db.transaccion():
+            ...     folio = int(db.obtener("folio_actual", 1))
+            ...     db.guardar("folio_actual", folio + 1)
+        """
+        with self._lock:
+            if self._transaccion is not None:
+                if version is not None and version != self._transaccion["version"]:
+                    raise ConflictoVersion(f"'{self.ruta_archivo}' cambió desde la versión {version}")
+                yield self
+                return
+            with self._bloqueo.exclusivo():
+                # Con cambios propios sin escribir no se verían los de otros procesos
+                self.sincronizar()
+                datos = self._leer_datos()
+                if version is not None and version != self._version:
+                    raise ConflictoVersion(f"'{self.ruta_archivo}' cambió desde la versión {version}")
+                self._transaccion = {"datos": datos, "cambios": [], "propios": {}, "version": self._version}
+                try:
+                    yield self
+                except BaseException:
+                    self._transaccion = None
+                    raise
+                transaccion, self._transaccion = self._transaccion, None
+                if transaccion["cambios"]:
+                    self._escribir_datos(transaccion["datos"], transaccion["cambios"])
+                    # También en "diferido" y "manual": se escribe antes de soltar el bloqueo
+                    self.sincronizar()
+
+    # ==============================
+    # 🔹 NOTIFICACIONES DE CAMBIOS
+    # ==============================
+
+    def suscribir(self, callback: Callable[["JsonDB", bool], None]):
+        """
+        Registra una función que se llama cada vez que el contenido cambia.
+        
+        :param callback: callback(db, externo); externo es True si el cambio
+                         vino de otro proceso (se detecta al leer o con vigilar()).
+        
+        Ejemplo:
+            >>> db.suscribir(lambda db, externo: print("cambió", externo))
+            >>> db.vigilar()
+        """
+        with self._lock:
+            if callback not in self._suscriptores:
+                self._suscriptores.append(callback)
+
+    def desuscribir(self, callback: Callable[["JsonDB", bool], None]):
+        """Quita una función registrada con suscribir()."""
+        with self._lock:
+            if callback in self._suscriptores:
+                self._suscriptores.remove(callback)
+
+    def _notificar(self, externo: bool):
+        with self._lock:
+            suscriptores = list(self._suscriptores)
+        for callback in suscriptores:
+            try:
+                callback(self, externo)
+            except Exception as e:
+                print(f"Error notificando cambio de '{self.ruta_archivo}': {e}")
+
+    def vigilar(self, intervalo: float = 1.0):
+        """
+        Revisa el archivo cada `intervalo` segundos en un hilo aparte, así los
+        suscriptores se enteran de ediciones de otros procesos aunque nadie lea.
+        """
+        with self._lock:
+            if self._vigilancia is not None:
+                return
+            self._vigilancia = threading.Event()
+            detener = self._vigilancia
+
+        def _bucle():
+            while not detener.wait(intervalo):
+                try:
+                    self._leer_datos()
+                except Exception as e:
+                    print(f"Error vigilando '{self.ruta_archivo}': {e}")
+
+        threading.Thread(target=_bucle, name="JsonDB-vigilar", daemon=True).start()
+
+    def detener_vigilancia(self):
+        """Detiene el hilo iniciado por vigilar()."""
+        with self._lock:
+            if self._vigilancia is not None:
+                self._vigilancia.set()
+                self._vigilancia = None
 
     # ==============================
     # 🔹 SOPORTE PARA DICCIONARIO
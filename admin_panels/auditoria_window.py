@@ -2,6 +2,7 @@ import flet as ft
 from datetime import datetime, timedelta
 from pathlib import Path
 from BASEDATOS import db
+from BuilderSql.gateway_datos import obtener_gateway
 
 
 class AuditoriaWindow:
@@ -179,7 +180,16 @@ class AuditoriaWindow:
         elif periodo == "mes":
             fecha_inicio = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
         
-        self.registros = db.obtener_auditoria(fecha_inicio=fecha_inicio)
+        # La consulta corre en el gateway; la tabla se pinta al llegar el resultado
+        obtener_gateway().en_pagina(
+            self.page, lambda: db.obtener_auditoria(fecha_inicio=fecha_inicio),
+            al_terminar=self._recibir_registros,
+            clave="auditoria",
+        )
+    
+    def _recibir_registros(self, registros):
+        """Guarda los registros consultados y aplica los filtros de pantalla"""
+        self.registros = registros
         self._aplicar_filtros()
     
     def _aplicar_filtros(self):
@@ -3,58 +3,27 @@ import flet as ft
 import sqlite3
 import datetime
 import os
+from BuilderSql.pool_conexiones import obtener_conexion
+from BuilderSql.proveedores_builder import ProveedoresBuilder
+from BuilderSql.gateway_datos import obtener_gateway
 
 
 BASEDB = "./BASEDATOS/provedores.db"
 os.makedirs(os.path.dirname(BASEDB), exist_ok=True)
 
-# ----------  AYUDANTE: conexión nueva por uso  ----------
+# ----------  AYUDANTE: conexión del pool compartido  ----------
 def get_conn() -> sqlite3.Connection:
-    """Devuelve una conexión nueva para el hilo actual."""
-    conn = sqlite3.connect(BASEDB, check_same_thread=False)
-    conn.row_factory = sqlite3.Row      # filas tipo dict
-    return conn
+    """Devuelve una conexión del pool compartido para el hilo actual."""
+    return obtener_conexion(BASEDB, row_factory=sqlite3.Row)      # filas tipo dict
 
-# ----------  CREAR TABLAS (si no existen)  ----------
-def init_db():
+def _consultar(sql, params):
+    """Corre una consulta en un hilo del gateway y devuelve dicts."""
     with get_conn() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS proveedores (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre      TEXT NOT NULL,
-                contacto    TEXT,
-                telefono    TEXT,
-                email       TEXT,
-                direccion   TEXT,
-                activo      INTEGER DEFAULT 1,
-                creado_en   TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS compras (
-                id            INTEGER PRIMARY KEY AUTOINCREMENT,
-                folio         TEXT UNIQUE,
-                fecha         TEXT NOT NULL,
-                proveedor_id  INTEGER,
-                total         REAL DEFAULT 0,
-                estado        TEXT DEFAULT 'Pendiente',
-                notas         TEXT,
-                creado_en     TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (proveedor_id) REFERENCES proveedores(id)
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS detalle_compras (
-                id              INTEGER PRIMARY KEY AUTOINCREMENT,
-                compra_id       INTEGER,
-                producto        TEXT NOT NULL,
-                cantidad        INTEGER DEFAULT 1,
-                precio_unitario REAL DEFAULT 0,
-                total           REAL DEFAULT 0,
-                FOREIGN KEY (compra_id) REFERENCES compras(id)
-            )
-        """)
-        conn.commit()
+        return [dict(r) for r in conn.execute(sql, params).fetchall()]
+
+# ----------  CREAR TABLAS (migraciones)  ----------
+def init_db():
+    ProveedoresBuilder.inicializar_bd()   # migraciones versionadas de provedores.db
 
 # =========================  VENTANA PRINCIPAL  =========================
 class ComprasWindow:
@@ -193,9 +162,13 @@ class ComprasWindow:
             params.append(estado)
         sql += " ORDER BY c.fecha DESC"
 
-        with get_conn() as conn:
-            rows = conn.execute(sql, params).fetchall()
+        # consulta en el gateway; solo se pinta la búsqueda más reciente
+        obtener_gateway().en_pagina(
+            self.page, _consultar, sql, params,
+            al_terminar=self._pintar_compras, clave="compras"
+        )
 
+    def _pintar_compras(self, rows):
         def color_estado(e):
             return {"Recibido": ft.Colors.GREEN,
                     "Parcial": ft.Colors.ORANGE,
@@ -543,7 +516,7 @@ class VentanaProveedores:
         self.page = page
         self.win = win
         self.items_por_pagina = 10
-        self.offset_actual = 0
+        self.cursor_pagina = None
         self.total_proveedores = 0
         self.todos_cargados = False
         
@@ -593,18 +566,13 @@ class VentanaProveedores:
             # Obtener total de proveedores
             total = conn.execute("SELECT COUNT(*) as cnt FROM proveedores").fetchone()
             self.total_proveedores = total["cnt"] if total else 0
-            
-            # Cargar primeros 10
-            rows = conn.execute(
-                f"SELECT * FROM proveedores ORDER BY nombre LIMIT {self.items_por_pagina}"
-            ).fetchall()
+        
+        rows, self.cursor_pagina = ProveedoresBuilder.pagina_proveedores(limite=self.items_por_pagina)
         
         self.lista_proveedores.controls.clear()
-        self.offset_actual = len(rows)
         
-        # Verificar si ya están todos cargados
-        if len(rows) < self.items_por_pagina:
-            self.todos_cargados = True
+        # Sin cursor siguiente ya están todos cargados
+        self.todos_cargados = self.cursor_pagina is None
         
         for r in rows:
             self.lista_proveedores.controls.append(self._crear_fila_proveedor(r))
@@ -613,23 +581,21 @@ class VentanaProveedores:
 
     def cargar_mas_proveedores(self):
         """Carga los siguientes 10 proveedores cuando se scrollea al final"""
-        with get_conn() as conn:
-            rows = conn.execute(
-                f"SELECT * FROM proveedores ORDER BY nombre LIMIT {self.items_por_pagina} OFFSET {self.offset_actual}"
-            ).fetchall()
-        
-        if not rows:
+        if self.cursor_pagina is None:
             self.todos_cargados = True
             return
         
+        # Paginación por llave: continúa después del último (nombre, id) mostrado
+        rows, self.cursor_pagina = ProveedoresBuilder.pagina_proveedores(
+            self.cursor_pagina, limite=self.items_por_pagina
+        )
+        
         # Agregar nuevos proveedores a la lista
         for r in rows:
             self.lista_proveedores.controls.append(self._crear_fila_proveedor(r))
         
-        self.offset_actual += len(rows)
-        
-        # Si la cantidad de registros cargados es menor que items_por_pagina, ya no hay más
-        if len(rows) < self.items_por_pagina:
+        # Sin cursor siguiente ya no hay más
+        if self.cursor_pagina is None:
             self.todos_cargados = True
         
         self.page.update()
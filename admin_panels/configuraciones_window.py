@@ -7,6 +7,7 @@ import json
 from pathlib import Path
 import shutil 
 from admin_panels.info_software_window import InfoSoftwareWindow
+from JsonSpace.JsonSP import JsonDB, ConflictoVersion
 
 class ConfiguracionesWindow:
     def __init__(self, page: ft.Page, admin_panel):
@@ -64,13 +65,14 @@ class ConfiguracionesWindow:
         }
         
         try:
-            if self.facturas_file.exists():
-                with open(self.facturas_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            else:
-                with open(self.facturas_file, 'w', encoding='utf-8') as f:
-                    json.dump(config_default, f, indent=4, ensure_ascii=False)
-                return config_default
+            # Las cajas avanzan el folio en este mismo archivo: se guarda con control de versión
+            self.db_facturas = JsonDB(str(self.facturas_file), crear_si_no_existe=False)
+            with self.db_facturas.transaccion():
+                if not self.db_facturas.todo():
+                    for clave, valor in config_default.items():
+                        self.db_facturas.guardar(clave, valor)
+            self._version_facturas = self.db_facturas.version()
+            return self.db_facturas.todo(copia=True)
         except Exception as e:
             print(f"Error cargando configuración de facturas: {e}")
             return config_default
@@ -120,10 +122,15 @@ class ConfiguracionesWindow:
 
     def _guardar_config_facturas(self, config):
         try:
-            with open(self.facturas_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
+            # ConflictoVersion si una caja facturó mientras se editaba (no se pisa su folio)
+            with self.db_facturas.transaccion(version=self._version_facturas):
+                for clave, valor in config.items():
+                    self.db_facturas.guardar(clave, valor)
+            self._version_facturas = self.db_facturas.version()
             self.config_facturas = config
             return True
+        except ConflictoVersion:
+            raise
         except Exception as e:
             print(f"Error guardando configuración de facturas: {e}")
             return False
@@ -490,6 +497,7 @@ class ConfiguracionesWindow:
             return ft.Icon(Icons.BROKEN_IMAGE, size=40, color=Colors.ORANGE_400)
 
     def _editar_configuracion_facturas(self, e=None):
+        self.config_facturas = self._cargar_config_facturas()
         serie_field = ft.TextField(label="Serie de facturas", value=self.config_facturas.get("serie_facturas", "A"), expand=True, border_color=Colors.INDIGO_200)
         folio_field = ft.TextField(label="Folio actual", value=self.config_facturas.get("folio_actual", "0001"), expand=True, border_color=Colors.INDIGO_200)
         formato_pdf = ft.Switch(label="Generar facturas en PDF", value=self.config_facturas.get("formato_pdf", True), active_color=Colors.INDIGO_600)
@@ -510,7 +518,17 @@ class ConfiguracionesWindow:
                 "leyenda_pie_pagina": leyenda_field.value
             }
             
-            if self._guardar_config_facturas(nueva_config):
+            try:
+                guardado = self._guardar_config_facturas(nueva_config)
+            except ConflictoVersion:
+                self.config_facturas = self._cargar_config_facturas()
+                self.page.close(dlg_facturas)
+                self._mostrar_mensaje_error("Otra caja cambió la configuración (ej: avanzó el folio). Se recargó, revise y guarde de nuevo")
+                self.page.clean()
+                self.page.add(self.build_ui())
+                self.page.update()
+                return
+            if guardado:
                 self.page.close(dlg_facturas)
                 self._mostrar_mensaje_exito("Configuración de facturas actualizada correctamente")
                 self.page.clean()
@@ -1,11 +1,13 @@
 import flet as ft
 from datetime import datetime, timedelta
+from BuilderSql.planificador_ui import obtener_planificador
 
 class GraficasWindow:
     """Ventana de gráficas interactivas con Flet - Diseño Profesional"""
     
     def __init__(self, page: ft.Page, datos_ventas, fecha_inicio, fecha_fin, reportes_window=None):
         self.page = page
+        self._ui = obtener_planificador(page)
         self.datos = datos_ventas
         self.fecha_inicio = fecha_inicio
         self.fecha_fin = fecha_fin
@@ -111,14 +113,8 @@ class GraficasWindow:
     def _generar_grafica_ventas_diarias_bonita(self):
         """Genera gráfica interactiva de ventas por día con diseño profesional"""
         try:
-            ventas_por_dia = {}
-            for v in self.datos.get("ventas", []):
-                try:
-                    fecha = v["fecha"]
-                    monto = v["total"] or 0.0
-                except (KeyError, TypeError):
-                    continue
-                ventas_por_dia[fecha] = ventas_por_dia.get(fecha, 0) + monto
+            # Ya viene agregado por día desde ventas_diarias
+            ventas_por_dia = self.datos.get("ventas_por_dia") or {}
             
             if not ventas_por_dia:
                 return self._crear_mensaje_sin_datos("No hay datos de ventas diarias")
@@ -150,7 +146,7 @@ class GraficasWindow:
                         self.info_text.value = f"📊 {fechas[index]}: ${montos[index]:,.2f} en ventas"
                         self.info_text.color = self.colors["primary"]
                         self.info_text.italic = False
-                        self.page.update()
+                        self._ui.actualizar(self.info_text, pantalla="graficas")
             
             data = ft.LineChartData(
                 data_points=puntos,
@@ -276,7 +272,7 @@ class GraficasWindow:
                         self.info_text.value = f"📦 {prod['nombre']}: ${prod['ingresos']:,.2f} - {cantidad} unidades vendidas"
                         self.info_text.color = colores_barra[index % len(colores_barra)]
                         self.info_text.italic = False
-                        self.page.update()
+                        self._ui.actualizar(self.info_text, pantalla="graficas")
             
             bar_groups = [
                 ft.BarChartGroup(
@@ -459,7 +455,7 @@ class GraficasWindow:
                         self.info_text.value = f"📊 {tipo}: ${valor:,.2f} ({porcentaje:.1f}% del total)"
                         self.info_text.color = colores_pastel[index % len(colores_pastel)]
                         self.info_text.italic = False
-                        self.page.update()
+                        self._ui.actualizar(self.info_text, pantalla="graficas")
             
             chart = ft.PieChart(
                 sections=sections,
@@ -544,7 +540,7 @@ class GraficasWindow:
             self.info_text.value = f"📊 {tipos[index]}: ${valores[index]:,.2f} ({porcentaje:.1f}% del total)"
             self.info_text.color = colores[index % len(colores)]
             self.info_text.italic = False
-            self.page.update()
+            self._ui.actualizar(self.info_text, pantalla="graficas")
     
     def _crear_mensaje_sin_datos(self, mensaje):
         """Crea un mensaje profesional cuando no hay datos"""
@@ -641,7 +637,7 @@ class GraficasWindow:
                 # Mostrar error
                 self.info_text.value = "⚠️ La fecha de inicio debe ser anterior a la fecha de fin"
                 self.info_text.color = self.colors["danger"]
-                self.page.update()
+                self._ui.actualizar(self.info_text, pantalla="graficas")
                 return
             
             self.fecha_inicio = nueva_inicio
@@ -653,7 +649,7 @@ class GraficasWindow:
         except ValueError as e:
             self.info_text.value = "⚠️ Formato de fecha inválido. Use YYYY-MM-DD"
             self.info_text.color = self.colors["danger"]
-            self.page.update()
+            self._ui.actualizar(self.info_text, pantalla="graficas")
     
     def _abrir_selector_fecha(self, e, es_inicio=True):
         """Abre el selector de fecha"""
@@ -664,9 +660,12 @@ class GraficasWindow:
                     self.fecha_inicio_picker.value = fecha_formateada
                 else:
                     self.fecha_fin_picker.value = fecha_formateada
-                self.page.update()
                 date_picker.open = False
-                self.page.update()
+                self._ui.actualizar(
+                    self.fecha_inicio_picker if es_inicio else self.fecha_fin_picker,
+                    date_picker,
+                    pantalla="graficas"
+                )
         
         fecha_actual = self.fecha_inicio if es_inicio else self.fecha_fin
         date_picker = ft.DatePicker(
@@ -678,7 +677,7 @@ class GraficasWindow:
         
         self.page.overlay.append(date_picker)
         date_picker.open = True
-        self.page.update()
+        self._ui.actualizar(pantalla="graficas")
     
     def _crear_panel_intervalos(self):
         """Crea el panel de selección de intervalos"""
@@ -861,12 +860,8 @@ class GraficasWindow:
         )
         
         # Calcular estadísticas
-        ventas_list = self.datos.get("ventas", [])
-        try:
-            total_ventas = sum([v["total"] or 0 for v in ventas_list])
-        except (KeyError, TypeError):
-            total_ventas = 0
-        num_ventas = len(ventas_list)
+        total_ventas = self.datos.get("total_ventas", 0) or 0
+        num_ventas = self.datos.get("num_transacciones", 0) or 0
         promedio = total_ventas / num_ventas if num_ventas > 0 else 0
         productos_vendidos = len(self.datos.get("productos_top", []))
         
@@ -6,19 +6,74 @@ from flet import (
 )
 import sqlite3
 import os
-from datetime import datetime
+import asyncio
+import threading
+import heapq
+import itertools
+from BuilderSql.pool_conexiones import obtener_conexion
+from BuilderSql.gateway_datos import obtener_gateway
+from BuilderSql.productos_builder import ProductosBuilder
+from BuilderSql.catalogo_productos import obtener_catalogo
 
 # Configuración de base de datos
 BASEDB = "./BASEDATOS/productos.db"
 os.makedirs(os.path.dirname(BASEDB), exist_ok=True)
 
 def get_conn() -> sqlite3.Connection:
-    """Devuelve una conexión nueva para el hilo actual."""
-    conn = sqlite3.connect(BASEDB, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Devuelve una conexión del pool compartido para el hilo actual."""
+    return obtener_conexion(BASEDB, row_factory=sqlite3.Row)
+
+# Filtros de estado y ordenamientos del inventario sobre la caché del catálogo
+ESTADOS_INVENTARIO = {
+    "Bajo Stock": lambda p: 0 < (p.stock_actual or 0) <= (p.stock_minimo or 0),
+    "Sin Stock": lambda p: (p.stock_actual or 0) == 0,
+    "Normal": lambda p: (p.stock_actual or 0) > (p.stock_minimo or 0),
+}
+
+ORDENES_INVENTARIO = {
+    "Nombre A-Z": (lambda p: (p.nombre or "", p.id), False),
+    "Nombre Z-A": (lambda p: (p.nombre or "", p.id), True),
+    "Stock Ascendente": (lambda p: (p.stock_actual or 0, p.id), False),
+    "Stock Descendente": (lambda p: (p.stock_actual or 0, p.id), True),
+    "Valor Ascendente": (lambda p: ((p.stock_actual or 0) * (p.precio_compra or 0), p.id), False),
+    "Valor Descendente": (lambda p: ((p.stock_actual or 0) * (p.precio_compra or 0), p.id), True),
+}
+
+def _consultar_inventario(termino, estado, orden, limite=100):
+    """Arma la lista del inventario desde la caché compartida (en un hilo del gateway)."""
+    catalogo = obtener_catalogo()
+    if termino:
+        candidatos = catalogo.obtener_varios(ProductosBuilder.coincidencias(termino))
+    else:
+        candidatos = catalogo.vista("nombre")
+
+    filtro = ESTADOS_INVENTARIO.get(estado)
+    if filtro:
+        candidatos = (p for p in candidatos if filtro(p))
+
+    if orden not in ORDENES_INVENTARIO:
+        orden = "Nombre A-Z"
+    if orden == "Nombre A-Z" and not termino:
+        # La vista ya viene ordenada por nombre: basta tomar los primeros
+        seleccion = list(itertools.islice(candidatos, limite))
+    else:
+        llave, descendente = ORDENES_INVENTARIO[orden]
+        elegir = heapq.nlargest if descendente else heapq.nsmallest
+        seleccion = elegir(limite, candidatos, key=llave)
+    return [dict(p) for p in seleccion]
+
+def _estado_stock(stock, minimo):
+    """Texto y color del estado de una tarjeta ('SIN STOCK', 'BAJO STOCK' o 'NORMAL')."""
+    if stock == 0:
+        return "SIN STOCK", Colors.RED_500
+    if stock <= minimo:
+        return "BAJO STOCK", Colors.ORANGE_500
+    return "NORMAL", Colors.GREEN_500
 
 class InventarioWindow:
+    # Segundos que se esperan para juntar clics rápidos de +/- en una sola escritura
+    ESPERA_AJUSTES = 0.4
+
     def __init__(self, page: ft.Page, admin_panel):
         self.page = page
         self.admin_panel = admin_panel
@@ -31,6 +86,14 @@ class InventarioWindow:
         self.bajo_stock = ft.Text("0", size=24, weight=FontWeight.W_700, color=Colors.INDIGO_900)
         self.sin_stock = ft.Text("0", size=24, weight=FontWeight.W_700, color=Colors.INDIGO_900)
         self.valor_total = ft.Text("$0.00", size=24, weight=FontWeight.W_700, color=Colors.INDIGO_900)
+        self._estadisticas = {"total": 0, "BAJO STOCK": 0, "SIN STOCK": 0, "valor": 0.0}
+        
+        # Tarjetas pintadas por id de producto (para parchar solo la que cambia)
+        # y ajustes de stock aún no guardados {id: diferencia}
+        self._tarjetas = {}
+        self._ajustes_pendientes = {}
+        self._guardado_programado = False
+        self._lock_ajustes = threading.Lock()
         
         # Controles de UI
         self.grid_inventario = ft.GridView(
@@ -106,11 +169,13 @@ class InventarioWindow:
                     "SELECT SUM(stock_actual * precio_compra) as total FROM productos WHERE activo = 1"
                 ).fetchone()["total"] or 0
                 
-                # Actualizar los controles de texto
-                self.total_productos.value = str(total)
-                self.bajo_stock.value = str(bajo_stock)
-                self.sin_stock.value = str(sin_stock)
-                self.valor_total.value = f"${valor_total:,.2f}"
+                self._estadisticas = {
+                    "total": total,
+                    "BAJO STOCK": bajo_stock,
+                    "SIN STOCK": sin_stock,
+                    "valor": valor_total,
+                }
+                self._pintar_estadisticas()
                 
                 # Forzar actualización
                 self.page.update()
@@ -118,6 +183,13 @@ class InventarioWindow:
         except Exception as e:
             print(f"Error actualizando estadísticas: {e}")
 
+    def _pintar_estadisticas(self):
+        """Pasa las estadísticas en memoria a los controles del header"""
+        self.total_productos.value = str(self._estadisticas["total"])
+        self.bajo_stock.value = str(self._estadisticas["BAJO STOCK"])
+        self.sin_stock.value = str(self._estadisticas["SIN STOCK"])
+        self.valor_total.value = f"${self._estadisticas['valor']:,.2f}"
+
     def build_ui(self):
         """Construye la interfaz premium de inventario"""
         return ft.Container(
@@ -255,20 +327,25 @@ class InventarioWindow:
 
     def _crear_tarjeta_inventario(self, producto):
         """Crea una tarjeta premium para cada producto en inventario"""
-        if producto["stock_actual"] == 0:
-            stock_color = Colors.RED_500
-            estado_texto = "SIN STOCK"
-            estado_color = Colors.RED_500
-        elif producto["stock_actual"] <= producto["stock_minimo"]:
-            stock_color = Colors.ORANGE_500
-            estado_texto = "BAJO STOCK"
-            estado_color = Colors.ORANGE_500
-        else:
-            stock_color = Colors.GREEN_500
-            estado_texto = "NORMAL"
-            estado_color = Colors.GREEN_500
-        
-        valor_total = producto["stock_actual"] * producto["precio_compra"]
+        # Los controles que cambian con el stock se guardan para parcharlos luego
+        texto_estado = ft.Text("", size=10, color=Colors.WHITE, weight=FontWeight.BOLD)
+        estado = ft.Container(
+            content=texto_estado,
+            padding=ft.padding.symmetric(horizontal=10, vertical=3),
+            border_radius=12,
+            alignment=ft.alignment.center
+        )
+        texto_stock = ft.Text("", size=14, weight=FontWeight.W_700)
+        texto_valor = ft.Text("", size=12, weight=FontWeight.W_600, color=Colors.INDIGO_700)
+        tarjeta = {
+            "producto": producto,
+            "estado": estado,
+            "texto_estado": texto_estado,
+            "stock": texto_stock,
+            "valor": texto_valor,
+        }
+        self._pintar_tarjeta(tarjeta)
+        self._tarjetas[producto["id"]] = tarjeta
 
         return ft.Container(
             content=ft.Column([
@@ -282,18 +359,7 @@ class InventarioWindow:
                             color=Colors.INDIGO_900,
                             text_align="center"
                         ),
-                        ft.Container(
-                            content=ft.Text(
-                                estado_texto,
-                                size=10,
-                                color=Colors.WHITE,
-                                weight=FontWeight.BOLD
-                            ),
-                            bgcolor=estado_color,
-                            padding=ft.padding.symmetric(horizontal=10, vertical=3),
-                            border_radius=12,
-                            alignment=ft.alignment.center
-                        )
+                        estado
                     ], spacing=6),
                     margin=ft.margin.only(bottom=8)
                 ),
@@ -303,8 +369,7 @@ class InventarioWindow:
                     content=ft.Column([
                         ft.Row([
                             ft.Text("Stock Actual:", size=12, color=Colors.GREY_700, expand=True),
-                            ft.Text(str(producto["stock_actual"]), 
-                                   size=14, weight=FontWeight.W_700, color=stock_color)
+                            texto_stock
                         ], alignment=MainAxisAlignment.SPACE_BETWEEN),
                         
                         ft.Row([
@@ -321,8 +386,7 @@ class InventarioWindow:
                         
                         ft.Row([
                             ft.Text("Valor Total:", size=12, color=Colors.GREY_700, expand=True),
-                            ft.Text(f"${valor_total:,.2f}", 
-                                   size=12, weight=FontWeight.W_600, color=Colors.INDIGO_700)
+                            texto_valor
                         ], alignment=MainAxisAlignment.SPACE_BETWEEN),
                     ], spacing=4),
                     margin=ft.margin.only(bottom=10)
@@ -411,13 +475,24 @@ class InventarioWindow:
             on_hover=lambda e: self._animar_tarjeta(e)
         )
 
+    def _pintar_tarjeta(self, tarjeta):
+        """Pone en los controles de la tarjeta el stock actual de su producto"""
+        producto = tarjeta["producto"]
+        stock = producto["stock_actual"] or 0
+        texto, color = _estado_stock(stock, producto["stock_minimo"] or 0)
+        tarjeta["texto_estado"].value = texto
+        tarjeta["estado"].bgcolor = color
+        tarjeta["stock"].value = str(stock)
+        tarjeta["stock"].color = color
+        tarjeta["valor"].value = f"${stock * (producto['precio_compra'] or 0):,.2f}"
+
     def _animar_tarjeta(self, e):
         """Animación hover para las tarjetas"""
         e.control.scale = 1.02 if e.data == "true" else 1.0
         e.control.update()
 
     def cargar_inventario(self, filtro=None, estado=None, orden=None):
-        """Carga inventario desde la base de datos con LIMIT para evitar lag"""
+        """Carga inventario desde la caché del catálogo con límite para evitar lag"""
         try:
             # Actualizar variables internas si se proporcionan nuevos valores
             if filtro is not None:
@@ -430,95 +505,143 @@ class InventarioWindow:
                 self.orden_actual = orden
                 self.ordenar_dd.value = orden
 
-            with get_conn() as conn:
-                query = """
-                    SELECT p.*
-                    FROM productos p
-                    WHERE p.activo = 1
-                """
-                params = []
-                
-                if self.termino_busqueda:
-                    query += " AND (p.nombre LIKE ? OR p.descripcion LIKE ?)"
-                    params.extend([f"%{self.termino_busqueda}%", f"%{self.termino_busqueda}%"])
-                
-                if self.filtro_estado and self.filtro_estado != "Todos":
-                    if self.filtro_estado == "Bajo Stock":
-                        query += " AND p.stock_actual <= p.stock_minimo AND p.stock_actual > 0"
-                    elif self.filtro_estado == "Sin Stock":
-                        query += " AND p.stock_actual = 0"
-                    elif self.filtro_estado == "Normal":
-                        query += " AND p.stock_actual > p.stock_minimo"
-                
-                # ORDENAMIENTO
-                if self.orden_actual == "Nombre A-Z":
-                    query += " ORDER BY p.nombre ASC"
-                elif self.orden_actual == "Nombre Z-A":
-                    query += " ORDER BY p.nombre DESC"
-                elif self.orden_actual == "Stock Ascendente":
-                    query += " ORDER BY p.stock_actual ASC"
-                elif self.orden_actual == "Stock Descendente":
-                    query += " ORDER BY p.stock_actual DESC"
-                elif self.orden_actual == "Valor Ascendente":
-                    query += " ORDER BY (p.stock_actual * p.precio_compra) ASC"
-                elif self.orden_actual == "Valor Descendente":
-                    query += " ORDER BY (p.stock_actual * p.precio_compra) DESC"
-                else:
-                    query += " ORDER BY p.nombre ASC"
-
-                # ✅ LIMITAR a máximo 100 productos
-                query += " LIMIT 100"
-
-                productos = conn.execute(query, params).fetchall()
-                
-                # Limpiar y actualizar grid
-                self.grid_inventario.controls.clear()
-                for producto in productos:
-                    self.grid_inventario.controls.append(
-                        self._crear_tarjeta_inventario(dict(producto))
-                    )
-                
-                self.page.update()
+            # Se arma desde la caché del catálogo (máximo 100 productos) en el
+            # gateway; solo la última búsqueda se pinta
+            obtener_gateway().en_pagina(
+                self.page, _consultar_inventario,
+                self.termino_busqueda, self.filtro_estado, self.orden_actual,
+                al_terminar=self._pintar_inventario,
+                clave="inventario",
+            )
                 
         except Exception as e:
             print(f"Error cargando inventario: {e}")
 
+    def _pintar_inventario(self, productos):
+        """Limpia y actualiza el grid con el resultado de la consulta"""
+        self.grid_inventario.controls.clear()
+        self._tarjetas = {}
+        with self._lock_ajustes:
+            pendientes = dict(self._ajustes_pendientes)
+        for producto in productos:
+            if producto["id"] in pendientes:
+                # Lo que aún no se guarda se sigue viendo tras recargar
+                producto["stock_actual"] = max(0, (producto["stock_actual"] or 0) + pendientes[producto["id"]])
+            self.grid_inventario.controls.append(
+                self._crear_tarjeta_inventario(producto)
+            )
+        self.page.update()
+
 
     # ==================== FUNCIONES DE STOCK ====================
 
     def _agregar_stock(self, producto, cantidad):
         """Agrega stock automáticamente"""
-        try:
-            with get_conn() as conn:
-                nuevo_stock = producto["stock_actual"] + cantidad
-                conn.execute(
-                    "UPDATE productos SET stock_actual = ?, actualizado_en = ? WHERE id = ?",
-                    [nuevo_stock, datetime.now().isoformat(), producto["id"]]
-                )
-                conn.commit()
-            
-            self._mostrar_mensaje(f"+{cantidad} unidades agregadas a {producto['nombre']}",Colors.GREEN)
-            self.cargar_inventario_completo()
-            
-        except Exception as e:
-            self._mostrar_mensaje(f"Error: {str(e)}", Colors.RED)
+        self._ajustar_stock(producto, cantidad)
 
     def _quitar_stock(self, producto, cantidad):
         """Quita stock automáticamente"""
-        try:
-            nuevo_stock = max(0, producto["stock_actual"] - cantidad)
-            with get_conn() as conn:
-                conn.execute(
-                    "UPDATE productos SET stock_actual = ?, actualizado_en = ? WHERE id = ?",
-                    [nuevo_stock, datetime.now().isoformat(), producto["id"]]
-                )
-                conn.commit()
-            
-            self._mostrar_mensaje(f"-{cantidad} unidades quitadas de {producto['nombre']}", Colors.ORANGE)
+        self._ajustar_stock(producto, -cantidad)
+
+    def _ajustar_stock(self, producto, cantidad):
+        """
+        Aplica el ajuste en la tarjeta y las estadísticas al momento y lo deja
+        pendiente; los clics que lleguen dentro de ESPERA_AJUSTES se guardan
+        juntos en una sola escritura
+        """
+        anterior = producto["stock_actual"] or 0
+        diferencia = max(0, anterior + cantidad) - anterior
+        if diferencia == 0:
+            return
+        with self._lock_ajustes:
+            pendiente = self._ajustes_pendientes.get(producto["id"], 0) + diferencia
+            self._ajustes_pendientes[producto["id"]] = pendiente
+            programar = not self._guardado_programado
+            self._guardado_programado = True
+        self._cambiar_stock_local(producto, anterior + diferencia)
+        if programar:
+            self.page.run_task(self._guardar_ajustes)
+
+    async def _guardar_ajustes(self):
+        """Espera a que terminen los clics rápidos y guarda todos los ajustes pendientes"""
+        await asyncio.sleep(self.ESPERA_AJUSTES)
+        with self._lock_ajustes:
+            ajustes = {pid: d for pid, d in self._ajustes_pendientes.items() if d}
+            self._ajustes_pendientes = {}
+            self._guardado_programado = False
+        if not ajustes:
+            return
+
+        resultado = await obtener_gateway().escribir(ProductosBuilder.ajustar_stock_lote, ajustes)
+        if not resultado:
+            self._mostrar_mensaje("Error: no se pudo guardar el stock", Colors.RED)
             self.cargar_inventario_completo()
-            
+            return
+
+        # Alinea las tarjetas con lo guardado (ej: ventas hechas mientras tanto)
+        with self._lock_ajustes:
+            pendientes = set(self._ajustes_pendientes)
+        for producto_id, stock in resultado.items():
+            tarjeta = self._tarjetas.get(producto_id)
+            if tarjeta and producto_id not in pendientes:
+                self._cambiar_stock_local(tarjeta["producto"], stock)
+
+        if len(ajustes) == 1:
+            producto_id, diferencia = next(iter(ajustes.items()))
+            tarjeta = self._tarjetas.get(producto_id)
+            nombre = tarjeta["producto"]["nombre"] if tarjeta else f"#{producto_id}"
+            if diferencia > 0:
+                self._mostrar_mensaje(f"+{diferencia} unidades agregadas a {nombre}", Colors.GREEN)
+            else:
+                self._mostrar_mensaje(f"{diferencia} unidades quitadas de {nombre}", Colors.ORANGE)
+        else:
+            self._mostrar_mensaje(f"Stock actualizado en {len(ajustes)} productos", Colors.GREEN)
+
+    async def _guardar_stock_fijo(self, producto, nuevo_stock):
+        """Guarda el ajuste fino en el hilo escritor, en orden detrás de los lotes de +/-"""
+        resultado = await obtener_gateway().escribir(ProductosBuilder.fijar_stock, producto["id"], nuevo_stock)
+        if resultado is None:
+            self._mostrar_mensaje("Error: no se pudo guardar el stock", Colors.RED)
+            self.cargar_inventario_completo()
+            return
+        # Un lote de +/- terminado antes pudo dejar otro valor en la tarjeta
+        with self._lock_ajustes:
+            pendiente = producto["id"] in self._ajustes_pendientes
+        if not pendiente:
+            self._cambiar_stock_local(producto, resultado)
+        self._mostrar_mensaje(f"Stock de {producto['nombre']} actualizado a {resultado}", Colors.GREEN)
+
+    def _cambiar_stock_local(self, producto, nuevo_stock):
+        """
+        Cambia el stock mostrado de un producto: parcha solo su tarjeta y
+        ajusta las estadísticas del header por la diferencia
+        """
+        anterior = producto["stock_actual"] or 0
+        if nuevo_stock == anterior:
+            return
+        producto["stock_actual"] = nuevo_stock
+
+        if producto.get("activo", 1):
+            minimo = producto["stock_minimo"] or 0
+            estado_antes, _ = _estado_stock(anterior, minimo)
+            estado_ahora, _ = _estado_stock(nuevo_stock, minimo)
+            if estado_antes != estado_ahora:
+                if estado_antes in self._estadisticas:
+                    self._estadisticas[estado_antes] -= 1
+                if estado_ahora in self._estadisticas:
+                    self._estadisticas[estado_ahora] += 1
+            self._estadisticas["valor"] += (nuevo_stock - anterior) * (producto["precio_compra"] or 0)
+            self._pintar_estadisticas()
+
+        controles = [self.bajo_stock, self.sin_stock, self.valor_total]
+        tarjeta = self._tarjetas.get(producto["id"])
+        if tarjeta and tarjeta["producto"] is producto:
+            self._pintar_tarjeta(tarjeta)
+            controles += [tarjeta["estado"], tarjeta["stock"], tarjeta["valor"]]
+        try:
+            self.page.update(*controles)
         except Exception as e:
-            self._mostrar_mensaje(f"Error: {str(e)}", Colors.RED)
+            print(f"Error actualizando tarjeta de inventario: {e}")
 
     def _abrir_ajuste_fino(self, producto):
         """Abre diálogo para ajuste fino de stock"""
@@ -532,19 +655,16 @@ class InventarioWindow:
         def guardar_ajuste(_):
             try:
                 nuevo_stock = int(stock_actual.value)
-                with get_conn() as conn:
-                    conn.execute(
-                        "UPDATE productos SET stock_actual = ?, actualizado_en = ? WHERE id = ?",
-                        [nuevo_stock, datetime.now().isoformat(), producto["id"]]
-                    )
-                    conn.commit()
-                
-                self._mostrar_mensaje(f"Stock de {producto['nombre']} actualizado a {nuevo_stock}", Colors.GREEN)
-                self.cargar_inventario_completo()
-                self.page.close(dialog)
-                
             except ValueError:
                 self._mostrar_mensaje("Ingrese un número válido", Colors.RED)
+                return
+            # El valor fijado reemplaza los +/- que no se hayan guardado; un
+            # lote ya entregado al gateway se escribe antes (mismo hilo escritor)
+            with self._lock_ajustes:
+                self._ajustes_pendientes.pop(producto["id"], None)
+            self._cambiar_stock_local(producto, nuevo_stock)
+            self.page.close(dialog)
+            self.page.run_task(self._guardar_stock_fijo, producto, nuevo_stock)
 
         dialog = ft.AlertDialog(
             modal=True,
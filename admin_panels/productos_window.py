@@ -7,77 +7,88 @@ from flet import (
 import sqlite3
 import os
 from datetime import datetime
+from BuilderSql.pool_conexiones import obtener_conexion
+from BuilderSql.gateway_datos import obtener_gateway
+from BuilderSql.productos_builder import ProductosBuilder
+from BuilderSql.catalogo_productos import obtener_catalogo
 
 # Configuración de base de datos
 BASEDB = "./BASEDATOS/productos.db"
 os.makedirs(os.path.dirname(BASEDB), exist_ok=True)
 
 def get_conn() -> sqlite3.Connection:
-    """Devuelve una conexión nueva para el hilo actual."""
-    conn = sqlite3.connect(BASEDB, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Devuelve una conexión del pool compartido para el hilo actual."""
+    return obtener_conexion(BASEDB, row_factory=sqlite3.Row)
 
 def init_db():
-    """Inicializa la base de datos con tablas premium"""
+    """Inicializa la base de datos aplicando las migraciones de productos"""
+    ProductosBuilder.inicializar_bd()
+
+# Mismos filtros rápidos que ProductosBuilder.FILTROS_CATALOGO, sobre la caché
+FILTROS_CATALOGO = {
+    "Stock Bajo": lambda p: (p.stock_actual or 0) <= (p.stock_minimo or 0),
+    "Nuevos Hoy": lambda p: (p.creado_en or "")[:10] == datetime.now().strftime("%Y-%m-%d"),
+    "Destacados": lambda p: p.destacado == 1,
+    "Normal": lambda p: p.venta_normal_activa == 1,
+    "Mayoreo": lambda p: p.venta_mayoreo_activa == 1,
+    "Promoción": lambda p: p.venta_promocion_activa == 1,
+}
+
+def _pagina_productos(busqueda, filtro, cursor, limite):
+    """Tanda de productos para el scroll infinito (en un hilo del gateway)."""
+    if busqueda:
+        # Con texto se pagina en SQL para ordenar por relevancia (productos_fts)
+        return ProductosBuilder.pagina_productos(busqueda, filtro, cursor, limite)
+    productos, siguiente = obtener_catalogo().pagina(
+        "catalogo", FILTROS_CATALOGO.get(filtro), cursor, limite
+    )
+    return [dict(p) for p in productos], siguiente
+
+def _fijar_destacado(producto_id, destacado):
+    """Marca o desmarca un producto como destacado (en el hilo escritor del gateway)."""
     with get_conn() as conn:
-        # Tabla de productos premium (sin categorías)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS productos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                codigo_barras TEXT UNIQUE,
-                nombre TEXT NOT NULL,
-                descripcion TEXT,
-                
-                -- Precios y tipos de venta
-                precio_compra REAL DEFAULT 0,
-                precio_venta_normal REAL DEFAULT 0,
-                precio_venta_mayoreo REAL DEFAULT 0,
-                precio_venta_promocion REAL DEFAULT 0,
-                
-                -- Stocks
-                stock_actual INTEGER DEFAULT 0,
-                stock_minimo INTEGER DEFAULT 0,
-                stock_maximo INTEGER DEFAULT 0,
-                
-                -- Configuración de tipos de venta
-                venta_normal_activa INTEGER DEFAULT 1,
-                venta_mayoreo_activa INTEGER DEFAULT 0,
-                venta_promocion_activa INTEGER DEFAULT 0,
-                minimo_mayoreo INTEGER DEFAULT 10,
-                fecha_inicio_promocion TEXT,
-                fecha_fin_promocion TEXT,
-                
-                -- IVA personalizado
-                iva_porcentaje REAL DEFAULT 16.0,
-                
-                -- Imágenes y multimedia
-                imagen_path TEXT,
-                especificaciones_json TEXT,
-                
-                -- Estado
-                activo INTEGER DEFAULT 1,
-                destacado INTEGER DEFAULT 0,
-                creado_en TEXT DEFAULT CURRENT_TIMESTAMP,
-                actualizado_en TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Tabla de historial de precios
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS historial_precios (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                producto_id INTEGER,
-                tipo_precio TEXT,
-                precio_anterior REAL,
-                precio_nuevo REAL,
-                fecha_cambio TEXT DEFAULT CURRENT_TIMESTAMP,
-                usuario TEXT DEFAULT 'Sistema',
-                FOREIGN KEY (producto_id) REFERENCES productos(id)
-            )
-        """)
-        
-        conn.commit()
+        conn.execute("UPDATE productos SET destacado = ? WHERE id = ?", [destacado, producto_id])
+    return destacado
+
+def _desactivar_producto(producto_id):
+    """Baja lógica de un producto (en el hilo escritor del gateway)."""
+    with get_conn() as conn:
+        conn.execute("UPDATE productos SET activo = 0 WHERE id = ?", [producto_id])
+
+def _guardar_producto(datos, producto_id=None):
+    """Inserta o actualiza un producto (en el hilo escritor del gateway)."""
+    valores = [
+        datos["codigo_barras"], datos["nombre"],
+        datos["precio_compra"], datos["precio_venta_normal"],
+        datos["precio_venta_mayoreo"], datos["precio_venta_promocion"],
+        datos["stock_actual"], datos["stock_minimo"],
+        datos["iva_porcentaje"], datos["venta_normal_activa"],
+        datos["venta_mayoreo_activa"], datos["venta_promocion_activa"],
+        datos["minimo_mayoreo"], datos["actualizado_en"],
+    ]
+    with get_conn() as conn:
+        if producto_id is not None:
+            # Actualizar producto existente
+            conn.execute("""
+                UPDATE productos 
+                SET codigo_barras=?, nombre=?, precio_compra=?,
+                    precio_venta_normal=?, precio_venta_mayoreo=?, precio_venta_promocion=?,
+                    stock_actual=?, stock_minimo=?, iva_porcentaje=?,
+                    venta_normal_activa=?, venta_mayoreo_activa=?, venta_promocion_activa=?,
+                    minimo_mayoreo=?, actualizado_en=?
+                WHERE id=?
+            """, valores + [producto_id])
+        else:
+            # Insertar nuevo producto
+            conn.execute("""
+                INSERT INTO productos (
+                    codigo_barras, nombre, precio_compra,
+                    precio_venta_normal, precio_venta_mayoreo, precio_venta_promocion,
+                    stock_actual, stock_minimo, iva_porcentaje,
+                    venta_normal_activa, venta_mayoreo_activa, venta_promocion_activa,
+                    minimo_mayoreo, creado_en, actualizado_en
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, valores + [datos["actualizado_en"]])
 
 class ProductosWindow:
     def __init__(self, page: ft.Page, admin_panel):
@@ -99,7 +110,8 @@ class ProductosWindow:
         )
 
         # Control de carga progresiva
-        self.productos_offset = 0
+        self.productos_cargados = 0
+        self.productos_cursor = None
         self.productos_cargando = False
         self.productos_finalizados = False
 
@@ -505,8 +517,10 @@ class ProductosWindow:
 
     def cargar_productos(self, filtro=None, tipo_venta=None):
         """Reinicia la lista y carga la primera tanda de productos"""
-        self.productos_offset = 0
+        self.productos_cargados = 0
+        self.productos_cursor = None
         self.productos_finalizados = False
+        self.productos_cargando = False   # una carga en vuelo queda obsoleta
         self.termino_busqueda = filtro or ""
         self.filtro_activo = tipo_venta or "Todos"
         self.grid_productos.controls.clear()
@@ -521,7 +535,7 @@ class ProductosWindow:
         self.productos_cargando = True
         
         # Mostrar indicador de carga
-        if self.productos_offset > 0:
+        if self.productos_cargados > 0:
             self.grid_productos.controls.append(
                 ft.Container(
                     content=ft.Column([
@@ -535,50 +549,36 @@ class ProductosWindow:
             self.page.update()
 
         try:
-            with get_conn() as conn:
-                query = """
-                    SELECT p.*
-                    FROM productos p
-                    WHERE p.activo = 1
-                """
-                params = []
-
-                if self.termino_busqueda:
-                    query += " AND (p.nombre LIKE ? OR p.descripcion LIKE ? OR p.codigo_barras LIKE ?)"
-                    params.extend([f"%{self.termino_busqueda}%", f"%{self.termino_busqueda}%", f"%{self.termino_busqueda}%"])
-
-                if self.filtro_activo and self.filtro_activo != "Todos":
-                    if self.filtro_activo == "Stock Bajo":
-                        query += " AND p.stock_actual <= p.stock_minimo"
-                    elif self.filtro_activo == "Nuevos Hoy":
-                        hoy = datetime.now().strftime("%Y-%m-%d")
-                        query += " AND DATE(p.creado_en) = ?"
-                        params.append(hoy)
-                    elif self.filtro_activo == "Destacados":
-                        query += " AND p.destacado = 1"
-                    elif self.filtro_activo == "Normal":
-                        query += " AND p.venta_normal_activa = 1"
-                    elif self.filtro_activo == "Mayoreo":
-                        query += " AND p.venta_mayoreo_activa = 1"
-                    elif self.filtro_activo == "Promoción":
-                        query += " AND p.venta_promocion_activa = 1"
-
-                query += " ORDER BY p.destacado DESC, p.creado_en DESC LIMIT 12 OFFSET ?"
-                params.append(self.productos_offset)
-
-                productos = conn.execute(query, params).fetchall()
-
-            # Quitar loader si existe
-            if (self.productos_offset > 0 and 
-                self.grid_productos.controls and 
-                isinstance(self.grid_productos.controls[-1], ft.Container) and
-                len(self.grid_productos.controls[-1].content.controls) > 0 and
-                isinstance(self.grid_productos.controls[-1].content.controls[0], ft.ProgressRing)):
-                self.grid_productos.controls.pop()
+            # Paginación por llave sobre la caché del catálogo (o productos_fts si
+            # hay búsqueda); solo la última carga se pinta
+            obtener_gateway().en_pagina(
+                self.page, _pagina_productos,
+                self.termino_busqueda, self.filtro_activo, self.productos_cursor, 12,
+                al_terminar=self._pintar_productos,
+                al_fallar=self._error_cargando_productos,
+                clave="productos",
+            )
+        except Exception as e:
+            self._error_cargando_productos(e)
+
+    def _quitar_loader(self):
+        """Quita el indicador de carga si existe"""
+        if (self.productos_cargados > 0 and 
+            self.grid_productos.controls and 
+            isinstance(self.grid_productos.controls[-1], ft.Container) and
+            len(self.grid_productos.controls[-1].content.controls) > 0 and
+            isinstance(self.grid_productos.controls[-1].content.controls[0], ft.ProgressRing)):
+            self.grid_productos.controls.pop()
+
+    def _pintar_productos(self, pagina):
+        """Agrega al grid la tanda de productos consultada"""
+        productos, self.productos_cursor = pagina
+        try:
+            self._quitar_loader()
 
             if not productos:
                 self.productos_finalizados = True
-                if self.productos_offset == 0:
+                if self.productos_cargados == 0:
                     self.grid_productos.controls.append(
                         ft.Container(
                             content=ft.Text("No se encontraron productos", size=16, color=Colors.GREY_600),
@@ -593,7 +593,7 @@ class ProductosWindow:
                             content=ft.Column([
                                 ft.Icon(Icons.CHECK_CIRCLE, color=Colors.GREEN_500, size=30),
                                 ft.Text("¡Has llegado al final!", size=14, color=Colors.GREY_600),
-                                ft.Text(f"Se cargaron {self.productos_offset} productos", size=12, color=Colors.GREY_500)
+                                ft.Text(f"Se cargaron {self.productos_cargados} productos", size=12, color=Colors.GREY_500)
                             ], horizontal_alignment=CrossAxisAlignment.CENTER, spacing=8),
                             alignment=ft.alignment.center,
                             padding=30
@@ -601,33 +601,31 @@ class ProductosWindow:
                     )
             else:
                 for producto in productos:
-                    self.grid_productos.controls.append(self._crear_tarjeta_producto(dict(producto)))
+                    self.grid_productos.controls.append(self._crear_tarjeta_producto(producto))
 
-                self.productos_offset += len(productos)
-                if len(productos) < 12:
+                self.productos_cargados += len(productos)
+                if self.productos_cursor is None:
                     self.productos_finalizados = True
 
             self.page.update()
-
         except Exception as e:
-            print(f"Error cargando productos: {e}")
-            # Quitar loader si existe
-            if (self.productos_offset > 0 and 
-                self.grid_productos.controls and 
-                isinstance(self.grid_productos.controls[-1], ft.Container) and
-                len(self.grid_productos.controls[-1].content.controls) > 0 and
-                isinstance(self.grid_productos.controls[-1].content.controls[0], ft.ProgressRing)):
-                self.grid_productos.controls.pop()
-                
-            self.grid_productos.controls.append(
-                ft.Container(
-                    content=ft.Text(f"Error al cargar productos", color=Colors.RED_600),
-                    alignment=ft.alignment.center,
-                    padding=20
-                )
-            )
-            self.page.update()
+            self._error_cargando_productos(e)
+            return
+
+        self.productos_cargando = False
 
+    def _error_cargando_productos(self, e):
+        """Muestra el error de carga y libera el scroll infinito"""
+        print(f"Error cargando productos: {e}")
+        self._quitar_loader()
+        self.grid_productos.controls.append(
+            ft.Container(
+                content=ft.Text(f"Error al cargar productos", color=Colors.RED_600),
+                alignment=ft.alignment.center,
+                padding=20
+            )
+        )
+        self.page.update()
         self.productos_cargando = False
 
     def _detectar_scroll(self, e):
@@ -655,15 +653,7 @@ class ProductosWindow:
 
     def _toggle_destacado(self, producto):
         """Marca o desmarca un producto como destacado"""
-        try:
-            nuevo_estado = 1 - producto["destacado"]  # Invertir estado
-            with get_conn() as conn:
-                conn.execute(
-                    "UPDATE productos SET destacado = ? WHERE id = ?",
-                    [nuevo_estado, producto["id"]]
-                )
-                conn.commit()
-            
+        def al_terminar(nuevo_estado):
             # Actualizar estado en memoria
             producto["destacado"] = nuevo_estado
             
@@ -673,10 +663,17 @@ class ProductosWindow:
             self._mostrar_mensaje(
                 "Producto marcado como destacado" if nuevo_estado else "Producto desmarcado de destacados"
             )
-        except Exception as e:
+
+        def al_fallar(e):
             print(f"Error al cambiar estado de destacado: {e}")
             self._mostrar_mensaje(f"Error: {e}")
 
+        nuevo_estado = 1 - producto["destacado"]  # Invertir estado
+        obtener_gateway().en_pagina(
+            self.page, _fijar_destacado, producto["id"], nuevo_estado,
+            al_terminar=al_terminar, al_fallar=al_fallar, escritura=True,
+        )
+
     def _abrir_formulario_producto(self, e):
         """Abre el formulario para nuevo producto"""
         formulario = FormularioProducto(self.page, self)
@@ -689,17 +686,19 @@ class ProductosWindow:
 
     def _eliminar_producto(self, producto):
         """Elimina un producto con confirmación"""
+        def al_terminar(_):
+            self.cargar_productos()
+            self._cargar_estadisticas()
+            self._mostrar_mensaje("Producto eliminado")
+
         def confirmar_eliminacion(e):
-            try:
-                with get_conn() as conn:
-                    conn.execute("UPDATE productos SET activo = 0 WHERE id = ?", [producto["id"]])
-                    conn.commit()
-                self.cargar_productos()
-                self._cargar_estadisticas()
-                self.page.close(dialog)
-                self._mostrar_mensaje("Producto eliminado")
-            except Exception as ex:
-                self._mostrar_mensaje(f"Error: {ex}")
+            self.page.close(dialog)
+            obtener_gateway().en_pagina(
+                self.page, _desactivar_producto, producto["id"],
+                al_terminar=al_terminar,
+                al_fallar=lambda ex: self._mostrar_mensaje(f"Error: {ex}"),
+                escritura=True,
+            )
 
         dialog = ft.AlertDialog(
             modal=True,
@@ -900,58 +899,26 @@ class FormularioProducto:
                 "minimo_mayoreo": int(self.minimo_mayoreo.value or 10),
                 "actualizado_en": datetime.now().isoformat()
             }
+        except ValueError as ex:
+            self._mostrar_error(f"Error al guardar: {str(ex)}")
+            return
 
-            with get_conn() as conn:
-                if self.es_edicion:
-                    # Actualizar producto existente
-                    conn.execute("""
-                        UPDATE productos 
-                        SET codigo_barras=?, nombre=?, precio_compra=?,
-                            precio_venta_normal=?, precio_venta_mayoreo=?, precio_venta_promocion=?,
-                            stock_actual=?, stock_minimo=?, iva_porcentaje=?,
-                            venta_normal_activa=?, venta_mayoreo_activa=?, venta_promocion_activa=?,
-                            minimo_mayoreo=?, actualizado_en=?
-                        WHERE id=?
-                    """, [
-                        datos["codigo_barras"], datos["nombre"], 
-                        datos["precio_compra"], datos["precio_venta_normal"], 
-                        datos["precio_venta_mayoreo"], datos["precio_venta_promocion"],
-                        datos["stock_actual"], datos["stock_minimo"],
-                        datos["iva_porcentaje"], datos["venta_normal_activa"],
-                        datos["venta_mayoreo_activa"], datos["venta_promocion_activa"],
-                        datos["minimo_mayoreo"], datos["actualizado_en"], self.producto["id"]
-                    ])
-                else:
-                    # Insertar nuevo producto
-                    conn.execute("""
-                        INSERT INTO productos (
-                            codigo_barras, nombre, precio_compra,
-                            precio_venta_normal, precio_venta_mayoreo, precio_venta_promocion,
-                            stock_actual, stock_minimo, iva_porcentaje,
-                            venta_normal_activa, venta_mayoreo_activa, venta_promocion_activa,
-                            minimo_mayoreo, creado_en, actualizado_en
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, [
-                        datos["codigo_barras"], datos["nombre"], 
-                        datos["precio_compra"], datos["precio_venta_normal"], 
-                        datos["precio_venta_mayoreo"], datos["precio_venta_promocion"],
-                        datos["stock_actual"], datos["stock_minimo"],
-                        datos["iva_porcentaje"], datos["venta_normal_activa"],
-                        datos["venta_mayoreo_activa"], datos["venta_promocion_activa"],
-                        datos["minimo_mayoreo"], datos["actualizado_en"], datos["actualizado_en"]
-                    ])
-
-                conn.commit()
-
+        def al_terminar(_):
             self.page.close(self.dialog)
             self.win.cargar_productos()
             self.win._cargar_estadisticas()
             self.win._mostrar_mensaje("Producto guardado exitosamente")
 
-        except Exception as ex:
+        def al_fallar(ex):
             print(f"Error guardando producto: {ex}")
             self._mostrar_error(f"Error al guardar: {str(ex)}")
 
+        obtener_gateway().en_pagina(
+            self.page, _guardar_producto, datos,
+            self.producto["id"] if self.es_edicion else None,
+            al_terminar=al_terminar, al_fallar=al_fallar, escritura=True,
+        )
+
     def _mostrar_error(self, mensaje):
         snack_bar = ft.SnackBar(
             content=ft.Row([
@@ -1,10 +1,11 @@
 import flet as ft
 from datetime import datetime, timedelta
 from pathlib import Path
-import sqlite3
 import json
 import os
 from admin_panels.graficas_window import GraficasWindow
+from BuilderSql.gateway_datos import obtener_gateway
+from BuilderSql.ventas_builder import VentasBuilder
 
 class ReportesWindow:
     """Ventana de reportes con diseño profesional premium"""
@@ -287,13 +288,12 @@ class ReportesWindow:
             fecha_fin = self.fecha_fin
             
         datos = {
-            "ventas": [],
             "productos_vendidos": [],
             "total_ventas": 0,
             "num_transacciones": 0,
             "ticket_promedio": 0,
             "productos_top": [],
-            "ventas_por_dia": [],
+            "ventas_por_dia": {},
             "ventas_por_tipo": {"Normal": 0, "Mayoreo": 0, "Promoción": 0},
         }
 
@@ -302,84 +302,11 @@ class ReportesWindow:
                 print(f"Base de datos {self.ventas_db_path} no existe")
                 return datos
 
-            conn = sqlite3.connect(self.ventas_db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            if not self._tabla_existe(cursor, "ventas"):
-                print("Error obteniendo datos de ventas: no such table: ventas")
-                conn.close()
-                return datos
-
-            if not self._tabla_existe(cursor, "ventas_detalle"):
-                print("Error obteniendo datos de ventas: no such table: ventas_detalle")
-                conn.close()
-                return datos
-
-            fecha_inicio_str = fecha_inicio.strftime('%Y-%m-%d')
-            fecha_fin_str = fecha_fin.strftime('%Y-%m-%d')
-            
-            cursor.execute("""
-                SELECT * FROM ventas 
-                WHERE fecha BETWEEN ? AND ?
-                ORDER BY fecha DESC
-            """, [fecha_inicio_str, fecha_fin_str])
-            
-            ventas = cursor.fetchall()
-            datos["ventas"] = ventas
-            datos["num_transacciones"] = len(ventas)
-
-            productos_dict = {}
-            ventas_por_tipo = {"Normal": 0, "Mayoreo": 0, "Promoción": 0}
-            ventas_por_dia = {}
-            total_ventas = 0
-
-            for v in ventas:
-                total_venta = v["total"] or 0.0
-                total_ventas += total_venta
-                
-                # Obtener tipo de venta real desde la base de datos
-                try:
-                    tipo_venta = v["tipo_venta"] if v["tipo_venta"] else "Normal"
-                except (KeyError, IndexError):
-                    tipo_venta = "Normal"
-                    
-                ventas_por_tipo[tipo_venta] = ventas_por_tipo.get(tipo_venta, 0) + total_venta
-                
-                # Ventas por día
-                fecha_venta = v["fecha"]
-                ventas_por_dia[fecha_venta] = ventas_por_dia.get(fecha_venta, 0) + total_venta
-
-                cursor.execute("SELECT * FROM ventas_detalle WHERE venta_id = ?", [v["id"]])
-                detalles = cursor.fetchall()
-
-                for d in detalles:
-                    nombre = d["producto"]
-                    cantidad = d["cantidad"]
-                    ingresos = d["precio_unit"] * cantidad
-
-                    if nombre in productos_dict:
-                        productos_dict[nombre]["cantidad"] += cantidad
-                        productos_dict[nombre]["ingresos"] += ingresos
-                    else:
-                        productos_dict[nombre] = {
-                            "nombre": nombre,
-                            "cantidad": cantidad,
-                            "ingresos": ingresos
-                        }
-
-            datos["total_ventas"] = total_ventas
-            datos["ticket_promedio"] = total_ventas / datos["num_transacciones"] if datos["num_transacciones"] > 0 else 0
-            datos["ventas_por_dia"] = ventas_por_dia
-
-            datos["productos_top"] = sorted(
-                productos_dict.values(),
-                key=lambda x: x["ingresos"],
-                reverse=True
-            )[:10]
-
-            datos["ventas_por_tipo"] = ventas_por_tipo
-            conn.close()
+            # Totales del resumen ventas_diarias y top de productos en una consulta agrupada
+            datos.update(VentasBuilder.resumen_reporte(
+                fecha_inicio.strftime('%Y-%m-%d'),
+                fecha_fin.strftime('%Y-%m-%d'),
+            ))
 
         except Exception as e:
             print(f"Error obteniendo datos de ventas: {e}")
@@ -388,14 +315,6 @@ class ReportesWindow:
 
         return datos
 
-    def _tabla_existe(self, cursor, tabla):
-        """Valida si la tabla existe en la base de datos"""
-        cursor.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
-            [tabla],
-        )
-        return cursor.fetchone() is not None
-
     def _crear_campo_fecha_inicio(self):
         """Crea y registra el campo de fecha de inicio"""
         self.input_fecha_inicio = ft.TextField(
@@ -427,8 +346,15 @@ class ReportesWindow:
         return self.input_fecha_fin
 
     def _cargar_reporte(self):
-        """Carga los datos del reporte y actualiza la UI"""
-        datos = self._obtener_datos_ventas()
+        """Consulta los datos del reporte en el gateway y actualiza la UI al recibirlos"""
+        obtener_gateway().en_pagina(
+            self.page, self._obtener_datos_ventas, self.fecha_inicio, self.fecha_fin,
+            al_terminar=self._pintar_reporte,
+            clave="reporte_ventas",
+        )
+
+    def _pintar_reporte(self, datos):
+        """Actualiza métricas y tablas con los datos del reporte"""
 
         # Actualizar texto del período
         if self.texto_periodo:
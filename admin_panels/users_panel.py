@@ -2,68 +2,20 @@ import flet as ft
 import sqlite3
 import datetime
 import os
+from BuilderSql.pool_conexiones import obtener_conexion
+from BuilderSql.proveedores_builder import ProveedoresBuilder
 
 BASEDB = "./BASEDATOS/provedores.db"
 os.makedirs(os.path.dirname(BASEDB), exist_ok=True)
 
-# ----------  AYUDANTE: conexión nueva por uso  ----------
+# ----------  AYUDANTE: conexión del pool compartido  ----------
 def get_conn() -> sqlite3.Connection:
-    """Devuelve una conexión nueva para el hilo actual."""
-    conn = sqlite3.connect(BASEDB, check_same_thread=False)
-    conn.row_factory = sqlite3.Row      # filas tipo dict
-    return conn
+    """Devuelve una conexión del pool compartido para el hilo actual."""
+    return obtener_conexion(BASEDB, row_factory=sqlite3.Row)      # filas tipo dict
 
-# ----------  CREAR TABLAS (si no existen)  ----------
+# ----------  CREAR TABLAS (migraciones)  ----------
 def init_db():
-    with get_conn() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS proveedores (
-                id          INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre      TEXT NOT NULL,
-                contacto    TEXT,
-                telefono    TEXT,
-                email       TEXT,
-                direccion   TEXT,
-                activo      INTEGER DEFAULT 1,
-                creado_en   TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS compras (
-                id            INTEGER PRIMARY KEY AUTOINCREMENT,
-                folio         TEXT UNIQUE,
-                fecha         TEXT NOT NULL,
-                proveedor_id  INTEGER,
-                total         REAL DEFAULT 0,
-                estado        TEXT DEFAULT 'Pendiente',
-                notas         TEXT,
-                creado_en     TEXT DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (proveedor_id) REFERENCES proveedores(id)
-            )
-        """)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS detalle_compras (
-                id              INTEGER PRIMARY KEY AUTOINCREMENT,
-                compra_id       INTEGER,
-                producto        TEXT NOT NULL,
-                cantidad        INTEGER DEFAULT 1,
-                precio_unitario REAL DEFAULT 0,
-                total           REAL DEFAULT 0,
-                FOREIGN KEY (compra_id) REFERENCES compras(id)
-            )
-        """)
-        # # ---- datos demo (ELIMINADO) ----
-        # if conn.execute("SELECT COUNT(*) FROM proveedores").fetchone()[0] == 0:
-        #     demo = [
-        #         ("TUCAN MATERIALES", "Juan Pérez",   "555-0101", "ventas@tucan.com",        "Av Principal 123"),
-        #         ("CONSTRUBLOCK",     "María García", "555-0102", "contacto@construblock.com", "Calle Sec 456"),
-        #         ("ACEROS FORTALEZA", "Carlos López", "555-0103", "info@acerosfortaleza.com",  "Boulevard 789"),
-        #     ]
-        #     conn.executemany(
-        #         "INSERT INTO proveedores (nombre,contacto,telefono,email,direccion) VALUES (?,?,?,?,?)",
-        #         demo
-        #     )
-        conn.commit()
+    ProveedoresBuilder.inicializar_bd()   # migraciones versionadas de provedores.db
 
 # =========================  VENTANA PRINCIPAL  =========================
 class ComprasWindow:
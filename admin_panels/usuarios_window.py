@@ -1,14 +1,20 @@
 # usuarios_window.py – Versión corregida: widgets a pantalla completa
 import flet as ft
 from mananger.user_manager import (
-    crear_usuario, listar_todos, usuario_existe,
+    crear_usuario, usuario_existe,
     actualizar_usuario, eliminar_usuario
 )
+from mananger.directorio_usuarios import obtener_directorio
 
 class UsuariosWindow:
+    POR_PAGINA = 50  # filas de la tabla por página
+
     def __init__(self, page: ft.Page, admin_panel):
         self.page = page
         self.admin_panel = admin_panel
+        self.directorio = obtener_directorio()
+        self.pagina_actual = 1
+        self.filtros = {"rol": None, "estado": None, "tipo": None}
         self.page.title = "Usuarios - MAX TUCAN"
         self.page.bgcolor = "#f3f4f6"
         self.page.padding = 0
@@ -22,6 +28,19 @@ class UsuariosWindow:
 
     # -----------------  INTERFAZ PRINCIPAL -----------------
     def build_ui(self):
+        self.filtros_ui = {
+            campo: self._crear_filtro(etiqueta, campo)
+            for campo, etiqueta in (("rol", "Rol"), ("estado", "Estado"), ("tipo", "Tipo"))
+        }
+        self.texto_pagina = ft.Text("", size=14, color="#64748b")
+        self.boton_anterior = ft.IconButton(
+            ft.Icons.CHEVRON_LEFT, tooltip="Página anterior",
+            on_click=lambda e: self._cambiar_pagina(-1)
+        )
+        self.boton_siguiente = ft.IconButton(
+            ft.Icons.CHEVRON_RIGHT, tooltip="Página siguiente",
+            on_click=lambda e: self._cambiar_pagina(1)
+        )
         self.tabla_usuarios = self._crear_tabla_usuarios()
 
         # HEADER - parte superior fija
@@ -36,6 +55,7 @@ class UsuariosWindow:
                 ft.Text("Gestión de Usuarios",
                         size=28, weight=ft.FontWeight.BOLD,
                         color="#1e293b"),
+                ft.Row(list(self.filtros_ui.values()), spacing=10),
                 ft.ElevatedButton(
                     "Nuevo Usuario",
                     icon=ft.Icons.PERSON_ADD,
@@ -56,8 +76,15 @@ class UsuariosWindow:
         )
 
         # TABLA - ocupa el resto del espacio disponible
+        paginador = ft.Row(
+            [self.boton_anterior, self.texto_pagina, self.boton_siguiente],
+            alignment=ft.MainAxisAlignment.END
+        )
         tabla_container = ft.Container(
-            content=self.tabla_usuarios,
+            content=ft.Column(
+                [self.tabla_usuarios, paginador],
+                expand=True, scroll=ft.ScrollMode.AUTO
+            ),
             padding=ft.padding.all(20),
             expand=True,  # 🔹 ocupa todo el alto restante
             bgcolor=ft.Colors.WHITE,
@@ -110,13 +137,23 @@ class UsuariosWindow:
         )
 
     def _crear_filas_usuarios(self):
+        usuarios, total = self.directorio.pagina(self.pagina_actual, self.POR_PAGINA, **self.filtros)
+        paginas = max(1, -(-total // self.POR_PAGINA))
+        if self.pagina_actual > paginas:
+            # Se borraron usuarios o cambió el filtro: última página con datos
+            self.pagina_actual = paginas
+            usuarios, total = self.directorio.pagina(self.pagina_actual, self.POR_PAGINA, **self.filtros)
+        self.texto_pagina.value = f"Página {self.pagina_actual} de {paginas} · {total} usuarios"
+        self.boton_anterior.disabled = self.pagina_actual <= 1
+        self.boton_siguiente.disabled = self.pagina_actual >= paginas
+
         filas = []
-        for usuario_data in listar_todos():
+        for usuario_data in usuarios:
             def editar(e, u=usuario_data): self.editar_usuario(u)
             def eliminar(e, u=usuario_data): self.confirmar_eliminar(u)
 
-            # Determinar en qué archivo está guardado el usuario
-            archivo = "admin.json" if usuario_data["tipo"] == "admin" else "users.json"
+            # Archivo en el que está guardado el usuario
+            archivo = usuario_data["archivo"]
 
             filas.append(ft.DataRow(cells=[
                 ft.DataCell(ft.Text(usuario_data["usuario"], size=15, weight=ft.FontWeight.W_500)),
@@ -138,6 +175,31 @@ class UsuariosWindow:
             ]))
         return filas
 
+    # -----------------  FILTROS Y PÁGINAS -----------------
+    def _crear_filtro(self, etiqueta, campo):
+        def cambiar(e):
+            self.filtros[campo] = None if e.control.value == "Todos" else e.control.value
+            self.pagina_actual = 1
+            self.actualizar_vista()
+
+        return ft.Dropdown(
+            label=etiqueta,
+            value="Todos",
+            options=self._opciones_filtro(campo),
+            on_change=cambiar,
+            width=150,
+            border_radius=8
+        )
+
+    def _opciones_filtro(self, campo):
+        return [ft.dropdown.Option("Todos")] + [
+            ft.dropdown.Option(valor) for valor in self.directorio.valores(campo) if valor
+        ]
+
+    def _cambiar_pagina(self, delta):
+        self.pagina_actual = max(1, self.pagina_actual + delta)
+        self.actualizar_vista()
+
     # -----------------  ALTA / EDICIÓN -----------------
     def nuevo_usuario(self, e): self._abrir_dialogo_usuario()
     def editar_usuario(self, u): self._abrir_dialogo_usuario(u)
@@ -270,5 +332,8 @@ class UsuariosWindow:
         self.page.update()
 
     def actualizar_vista(self):
+        # Los roles/estados en uso pueden cambiar al crear o editar usuarios
+        for campo, filtro in self.filtros_ui.items():
+            filtro.options = self._opciones_filtro(campo)
         self.tabla_usuarios.rows = self._crear_filas_usuarios()
         self.page.update()
\ No newline at end of file
@@ -0,0 +1 @@
+"""Benchmarks de rendimiento; se ejecutan desde la raíz: python -m benchmarks.<nombre>"""
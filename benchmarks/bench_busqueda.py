@@ -0,0 +1,108 @@
+"""
+Benchmark de búsqueda de productos
+Compara LIKE '%texto%' sobre nombre, descripción y código de barras contra
+el índice productos_fts (ProductosBuilder.buscar_ids / pagina_productos), y
+mide tecla por tecla el índice de trigramas en memoria de la caja
+(IndiceBusqueda)
+
+Uso:
+    python -m benchmarks.bench_busqueda [productos]
+"""
+
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from BuilderSql import ProductosBuilder, CatalogoProductos, IndiceBusqueda, cerrar_pools
+
+MARCAS = ["Bimbo", "Lala", "Sabritas", "Jumex", "Nestlé", "Herdez", "Gamesa", "Marinela"]
+ARTICULOS = ["Café molido", "Azúcar estándar", "Jamón de pavo", "Piña en almíbar",
+             "Leche entera", "Galletas María", "Atún en agua", "Jabón líquido",
+             "Champú", "Papel higiénico", "Frijoles refritos", "Chiles jalapeños"]
+CONSULTAS = ["cafe", "azucar lala", "pina", "jamon", "galle", "7500000123", "champu nestle"]
+TECLEO = ["cafe lala", "jamon de pavo", "champu nestle 5"]
+
+
+def _poblar(conn: sqlite3.Connection, num: int):
+    azar = random.Random(7)
+    filas = []
+    for i in range(num):
+        articulo = azar.choice(ARTICULOS)
+        marca = azar.choice(MARCAS)
+        filas.append((
+            f"750{i:010d}",
+            f"{articulo} {marca} {azar.randint(100, 2000)}g",
+            f"{articulo} marca {marca}, presentación familiar",
+            10_000,
+        ))
+    conn.executemany(
+        "INSERT INTO productos(codigo_barras, nombre, descripcion, stock_actual) VALUES(?,?,?,?)", filas
+    )
+    conn.commit()
+
+
+def _like(conn, texto):
+    patron = f"%{texto}%"
+    return conn.execute(
+        "SELECT id FROM productos WHERE activo = 1 AND "
+        "(nombre LIKE ? OR descripcion LIKE ? OR codigo_barras LIKE ?) ORDER BY nombre LIMIT 50",
+        (patron, patron, patron),
+    ).fetchall()
+
+
+def _mediana_ms(funcion, *args, repeticiones: int = 15) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def _teclear(indice: IndiceBusqueda, frase: str):
+    """Milisegundos por tecla (una búsqueda por cada prefijo de la frase)"""
+    tiempos = []
+    for fin in range(1, len(frase) + 1):
+        inicio = time.perf_counter()
+        indice.buscar(frase[:fin])
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def main(num: int = 200_000):
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            ProductosBuilder.inicializar_bd()
+            conn = sqlite3.connect(str(ProductosBuilder.DB_PATH))
+            _poblar(conn, num)
+            print(f"{num:,} productos")
+            print(f"{'consulta':<16} {'LIKE':>10} {'buscar_ids':>12} {'pagina':>10} {'resultados':>11}")
+            for texto in CONSULTAS:
+                like = _mediana_ms(_like, conn, texto.split()[0])
+                fts = _mediana_ms(ProductosBuilder.buscar_ids, texto, 50)
+                pagina = _mediana_ms(ProductosBuilder.pagina_productos, texto)
+                encontrados = len(ProductosBuilder.buscar_ids(texto, 50))
+                print(f"{texto:<16} {like:>8.2f}ms {fts:>10.2f}ms {pagina:>8.2f}ms {encontrados:>11}")
+
+            productos = CatalogoProductos().vista("nombre")
+            inicio = time.perf_counter()
+            indice = IndiceBusqueda(productos).preparar()
+            print(f"\nIndiceBusqueda: armado en {time.perf_counter() - inicio:.2f}s")
+            print(f"{'tecleo':<18} {'mediana':>9} {'máxima':>9}")
+            for frase in TECLEO:
+                tiempos = _teclear(indice, frase)
+                print(f"{frase:<18} {statistics.median(tiempos):>7.2f}ms {max(tiempos):>7.2f}ms")
+            conn.close()
+        finally:
+            cerrar_pools()
+            os.chdir(original)
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
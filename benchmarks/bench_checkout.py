@@ -0,0 +1,120 @@
+"""
+Benchmark de cobro: ventas por segundo
+Compara el camino anterior (tres conexiones y tres commits por venta, un
+INSERT por renglón) contra VentasBuilder.procesar_venta (una transacción)
+
+Uso:
+    python -m benchmarks.bench_checkout [ventas] [renglones]
+"""
+
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from BuilderSql import VentasBuilder, ProductosBuilder, cerrar_pools
+
+
+def _preparar(num_productos: int = 200):
+    ProductosBuilder.inicializar_bd()
+    VentasBuilder.inicializar_bd()
+    with ProductosBuilder.get_conexion() as conn:
+        conn.executemany(
+            "INSERT INTO productos(codigo_barras, nombre, precio_venta_normal, stock_actual) VALUES(?,?,?,?)",
+            [(f"75000{i:05d}", f"Producto {i}", 10.0 + i, 10_000_000) for i in range(num_productos)]
+        )
+
+
+def _carrito(n: int, renglones: int) -> list:
+    return [
+        {"producto": {"id": (n + k) % 200 + 1, "nombre": f"Producto {(n + k) % 200}", "precio": 12.5},
+         "cantidad": 1 + k % 3}
+        for k in range(renglones)
+    ]
+
+
+def _venta_camino_anterior(usuario: str, carrito: list):
+    """Réplica del flujo previo de MenuVentas.procesar_compra_final"""
+    conn = sqlite3.connect(str(ProductosBuilder.DB_PATH))
+    cur = conn.cursor()
+    cur.execute("BEGIN")
+    for item in carrito:
+        cur.execute("SELECT nombre, stock_actual FROM productos WHERE id = ?", (item["producto"]["id"],))
+        cur.fetchone()
+    for item in carrito:
+        cur.execute(
+            "UPDATE productos SET stock_actual = stock_actual - ? WHERE id = ? AND stock_actual >= ?",
+            [item["cantidad"], item["producto"]["id"], item["cantidad"]]
+        )
+    conn.commit()
+    conn.close()
+
+    con = sqlite3.connect(str(VentasBuilder.DB_PATH))
+    cur = con.cursor()
+    ahora = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    total = sum(i["producto"]["precio"] * i["cantidad"] for i in carrito)
+    cur.execute(
+        "INSERT INTO ventas(usuario, fecha, fecha_hora, total, tipo_venta) VALUES(?,?,?,?,?)",
+        (usuario, datetime.date.today(), ahora, total, "Normal")
+    )
+    venta_id = cur.lastrowid
+    for item in carrito:
+        cur.execute(
+            "INSERT INTO ventas_detalle(venta_id, producto, cantidad, precio_unit) VALUES(?,?,?,?)",
+            (venta_id, item["producto"]["nombre"], item["cantidad"], item["producto"]["precio"])
+        )
+    con.commit()
+    con.close()
+
+    con = sqlite3.connect(str(VentasBuilder.DB_PATH))
+    con.execute(
+        "INSERT INTO auditoria(fecha_hora, usuario, tipo, descripcion, detalles) VALUES(?,?,?,?,?)",
+        (ahora, usuario, "venta", f"Venta realizada por ${total:.2f}", "")
+    )
+    con.commit()
+    con.close()
+
+
+def _venta_transaccional(usuario: str, carrito: list):
+    ok, mensaje, _ = VentasBuilder.procesar_venta(
+        usuario, carrito, "Normal", auditoria=("venta", "Venta realizada", "")
+    )
+    if not ok:
+        raise RuntimeError(mensaje)
+
+
+def _medir(funcion, ventas: int, renglones: int) -> float:
+    """Devuelve ventas por segundo"""
+    inicio = time.perf_counter()
+    for n in range(ventas):
+        funcion("cajero", _carrito(n, renglones))
+    return ventas / (time.perf_counter() - inicio)
+
+
+def main(ventas: int = 300, renglones: int = 5):
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            _preparar()
+            # Silenciar los print de cada venta para no medir la consola
+            stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+            try:
+                antes = _medir(_venta_camino_anterior, ventas, renglones)
+                ahora = _medir(_venta_transaccional, ventas, renglones)
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+            print(f"{ventas} ventas de {renglones} renglones")
+            print(f"camino anterior: {antes:10.1f} ventas/s")
+            print(f"procesar_venta:  {ahora:10.1f} ventas/s  (x{ahora / antes:.2f})")
+        finally:
+            cerrar_pools()
+            os.chdir(original)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,89 @@
+"""
+Benchmark de escrituras de JsonDB
+Mide escrituras por segundo (guardar de un usuario) con 1 k, 10 k y 100 k
+llaves: escritura inmediata con indent=2, inmediata compacta, una ráfaga
+en modo "manual" que termina en una sola sincronizar(), la misma ráfaga
+dentro de db.transaccion() en modo inmediato, y el motor de
+bitácora (JsonDBBitacora, una línea + fsync por cambio, compactando en
+segundo plano). Sin respaldos, para medir solo la escritura
+
+Uso:
+    python -m benchmarks.bench_jsondb [tamaños separados por coma]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from JsonSpace.JsonSP import JsonDB
+from JsonSpace.JsonBitacora import JsonDBBitacora
+
+TAMANOS = (1_000, 10_000, 100_000)
+SEGUNDOS_POR_CASO = 2.0     # tiempo máximo que se escribe en los casos inmediatos
+RAFAGA = 1_000              # cambios que se juntan en el modo manual
+
+
+def _usuarios(num: int) -> dict:
+    return {
+        f"empleado{i:06d}": {"password": f"clave{i}", "rol": "Empleado", "estado": "Activo", "tipo": "empleado"}
+        for i in range(num)
+    }
+
+
+def _preparar(directorio: str, num: int, clase=JsonDB, **opciones) -> JsonDB:
+    ruta = os.path.join(directorio, f"users_{num}_{len(os.listdir(directorio))}.json")
+    db = clase(ruta, respaldos=False, **opciones)
+    db.guardar("usuarios", _usuarios(num))
+    db.sincronizar()
+    return db
+
+
+def _inmediato(db: JsonDB) -> float:
+    """Escrituras por segundo, una por cambio"""
+    escrituras = 0
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < SEGUNDOS_POR_CASO:
+        db.actualizar(f"usuarios.empleado{escrituras % 1000:06d}", {"estado": f"v{escrituras}"})
+        escrituras += 1
+    return escrituras / (time.perf_counter() - inicio)
+
+
+def _rafaga(db: JsonDB) -> float:
+    """Cambios por segundo juntando RAFAGA cambios en una escritura"""
+    inicio = time.perf_counter()
+    for i in range(RAFAGA):
+        db.actualizar(f"usuarios.empleado{i % 1000:06d}", {"estado": f"r{i}"})
+    db.sincronizar()
+    return RAFAGA / (time.perf_counter() - inicio)
+
+
+def _transaccion(db: JsonDB) -> float:
+    """Cambios por segundo juntando RAFAGA cambios en una transacción"""
+    inicio = time.perf_counter()
+    with db.transaccion():
+        for i in range(RAFAGA):
+            db.actualizar(f"usuarios.empleado{i % 1000:06d}", {"estado": f"t{i}"})
+    return RAFAGA / (time.perf_counter() - inicio)
+
+
+def main():
+    tamanos = [int(t) for t in sys.argv[1].split(",")] if len(sys.argv) > 1 else TAMANOS
+    with tempfile.TemporaryDirectory() as directorio:
+        for num in tamanos:
+            indentado = _inmediato(_preparar(directorio, num))
+            compacto = _inmediato(_preparar(directorio, num, compacto=True))
+            manual = _rafaga(_preparar(directorio, num, modo_escritura="manual", compacto=True))
+            transaccion = _transaccion(_preparar(directorio, num, compacto=True))
+            bitacora_db = _preparar(directorio, num, clase=JsonDBBitacora, compacto=True)
+            bitacora_db.compactar()
+            bitacora = _inmediato(bitacora_db)
+            tamano = os.path.getsize(_preparar(directorio, num).ruta_archivo) / 1024
+            print(f"{num:>7,} llaves ({tamano:8,.0f} KB): inmediato indent=2 {indentado:8,.1f}/s | "
+                  f"inmediato compacto {compacto:8,.1f}/s | ráfaga manual {manual:10,.0f} cambios/s | "
+                  f"transacción {transaccion:10,.0f} cambios/s | "
+                  f"bitácora {bitacora:8,.1f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark de memoria del catálogo de la caja
+Compara los productos como diccionarios (fila completa en la caché + dict de
+17 llaves por producto en MenuVentas + copia de la lista por cada filtro)
+contra RegistroProducto con __slots__ compartido por la caja, vistas por
+índices y ProductoVenta solo para las tarjetas visibles. Reporta también
+cuánto tarda una recolección completa del gc con todo cargado, también con
+los registros congelados (gc.freeze) para decidir si vale la pena en la app
+
+Uso:
+    python -m benchmarks.bench_memoria_pos [productos,productos,...]
+"""
+
+import gc
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from BuilderSql import ProductosBuilder, CatalogoProductos, cerrar_pools
+from empleados.producto_venta import ProductoVenta
+
+TAMANOS = (10_000, 100_000, 500_000)
+
+
+def _poblar(conn: sqlite3.Connection, desde: int, hasta: int, lote: int = 50_000):
+    azar = random.Random(desde)
+    for inicio in range(desde, hasta, lote):
+        conn.executemany(
+            "INSERT INTO productos(codigo_barras, nombre, descripcion, precio_compra, precio_venta_normal, "
+            "precio_venta_mayoreo, stock_actual, stock_minimo, venta_mayoreo_activa) VALUES(?,?,?,?,?,?,?,?,?)",
+            [
+                (f"750{i:010d}", f"Producto {i}", f"Descripción del producto {i}",
+                 azar.uniform(5, 50), azar.uniform(10, 80), azar.uniform(8, 70),
+                 azar.randint(1, 200), 5, i % 2)
+                for i in range(inicio, min(inicio + lote, hasta))
+            ],
+        )
+        conn.commit()
+
+
+def _carga_anterior():
+    """Réplica del esquema previo: dicts en la caché y en la caja"""
+    conn = sqlite3.connect(str(ProductosBuilder.DB_PATH))
+    conn.row_factory = sqlite3.Row
+    cache = [dict(fila) for fila in conn.execute("SELECT * FROM productos WHERE activo = 1")]
+    conn.close()
+    cache.sort(key=lambda p: (p["nombre"] or "", p["id"]))
+    productos = [
+        {
+            "id": p["id"], "codigo_barras": p["codigo_barras"], "nombre": p["nombre"],
+            "descripcion": p["descripcion"], "precio": p["precio_venta_normal"],
+            "stock": p["stock_actual"], "stock_minimo": p["stock_minimo"], "tipo_precio": "Normal",
+            "imagen_path": p["imagen_path"], "precio_normal": p["precio_venta_normal"],
+            "precio_mayoreo": p["precio_venta_mayoreo"], "precio_promocion": p["precio_venta_promocion"],
+            "iva_porcentaje": p["iva_porcentaje"], "venta_normal_activa": p["venta_normal_activa"],
+            "venta_mayoreo_activa": p["venta_mayoreo_activa"],
+            "venta_promocion_activa": p["venta_promocion_activa"], "minimo_mayoreo": p["minimo_mayoreo"],
+        }
+        for p in cache if (p["stock_actual"] or 0) > 0
+    ]
+    filtrados = productos.copy()
+    return cache, productos, filtrados
+
+
+def _carga_compacta():
+    """Caché con RegistroProducto compartida por la caja; ProductoVenta solo en pantalla"""
+    catalogo = CatalogoProductos()
+    productos = [r for r in catalogo.vista("nombre") if (r.stock_actual or 0) > 0]
+    posicion_por_id = {p.id: i for i, p in enumerate(productos)}
+    filtrados = range(len(productos))
+    tarjetas = [ProductoVenta.desde_registro(productos[i], "normal") for i in filtrados[:20]]
+    return catalogo, productos, posicion_por_id, filtrados, tarjetas
+
+
+def _medir(funcion, congelar: bool = False):
+    """
+    (MB retenidos, segundos de carga, milisegundos de una recolección completa)
+    Con congelar=True lo cargado sale del recolector (gc.freeze) antes de medir la recolección
+    """
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+    retenido, _pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if congelar:
+        gc.freeze()
+    inicio = time.perf_counter()
+    gc.collect()
+    recoleccion = time.perf_counter() - inicio
+    if congelar:
+        gc.unfreeze()
+    del resultado
+    gc.collect()
+    return retenido / 1024 / 1024, segundos, recoleccion * 1000
+
+
+def main(tamanos=TAMANOS):
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            ProductosBuilder.inicializar_bd()
+            conn = sqlite3.connect(str(ProductosBuilder.DB_PATH))
+            cargados = 0
+            print(f"{'productos':>10} {'dicts':>10} {'slots':>10} {'ahorro':>7} "
+                  f"{'carga dicts':>12} {'carga slots':>12} {'gc dicts':>10} {'gc slots':>10} {'gc freeze':>10}")
+            for tamano in sorted(tamanos):
+                _poblar(conn, cargados, tamano)
+                cargados = tamano
+                mb_antes, carga_antes, gc_antes = _medir(_carga_anterior)
+                mb_ahora, carga_ahora, gc_ahora = _medir(_carga_compacta)
+                _mb, _carga, gc_congelado = _medir(_carga_compacta, congelar=True)
+                print(f"{tamano:>10,} {mb_antes:>8.1f}MB {mb_ahora:>8.1f}MB {mb_antes / mb_ahora:>6.1f}x "
+                      f"{carga_antes:>11.2f}s {carga_ahora:>11.2f}s {gc_antes:>8.1f}ms {gc_ahora:>8.1f}ms {gc_congelado:>8.1f}ms")
+            conn.close()
+        finally:
+            cerrar_pools()
+            os.chdir(original)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main([int(t) for t in sys.argv[1].split(",")])
+    else:
+        main()
@@ -0,0 +1,99 @@
+"""
+Benchmark del planificador de actualizaciones de la interfaz
+Simula una página de Flet (un ciclo de eventos en su propio hilo que cuenta
+los mensajes de update) y compara cuántos envíos salen con un page.update()
+por cambio contra PlanificadorUI, en una ráfaga de logs desde un hilo de
+trabajo y en agregar productos al carrito de la caja
+
+Uso:
+    python -m benchmarks.bench_planificador_ui [cambios]
+"""
+
+import asyncio
+import sys
+import threading
+import time
+
+from BuilderSql import PlanificadorUI
+
+
+class PaginaSimulada:
+    """Lo mínimo de ft.Page que usa el planificador: run_task y update"""
+
+    def __init__(self):
+        self.envios = 0
+        self.controles = 0
+        self._ciclo = asyncio.new_event_loop()
+        threading.Thread(target=self._ciclo.run_forever, daemon=True).start()
+
+    def run_task(self, funcion, *args):
+        return asyncio.run_coroutine_threadsafe(funcion(*args), self._ciclo)
+
+    def update(self, *controles):
+        self.envios += 1
+        self.controles += len(controles)
+
+    def cerrar(self):
+        self._ciclo.call_soon_threadsafe(self._ciclo.stop)
+
+
+class Control:
+    def __init__(self, pagina):
+        self.pagina = pagina
+
+    def update(self):
+        self.pagina.update(self)
+
+
+def _rafaga_logs(pagina, actualizar, cambios: int):
+    """Un hilo de trabajo agrega líneas de log (como enviar_factura_por_email)"""
+    logs = Control(pagina)
+
+    def trabajo():
+        for _ in range(cambios):
+            actualizar(logs)
+
+    hilo = threading.Thread(target=trabajo)
+    hilo.start()
+    hilo.join()
+
+
+def _carrito(pagina, actualizar, cambios: int):
+    """Cada producto agregado toca lista, contador y total del carrito"""
+    lista, contador, total = Control(pagina), Control(pagina), Control(pagina)
+    for _ in range(cambios):
+        actualizar(lista)
+        actualizar(contador)
+        actualizar(total)
+
+
+def _medir(nombre: str, escenario, cambios: int):
+    directa = PaginaSimulada()
+    inicio = time.perf_counter()
+    escenario(directa, lambda control: directa.update(), cambios)
+    t_directa = time.perf_counter() - inicio
+    directa.cerrar()
+
+    pagina = PaginaSimulada()
+    planificador = PlanificadorUI(pagina)
+    inicio = time.perf_counter()
+    escenario(pagina, lambda control: planificador.actualizar(control, pantalla=nombre), cambios)
+    t_planificador = time.perf_counter() - inicio
+    time.sleep(planificador.CUADRO * 3)
+    pagina.cerrar()
+
+    metricas = planificador.metricas()[nombre]
+    print(f"{nombre:<14} page.update(): {directa.envios:>6} envíos ({t_directa * 1000:7.1f} ms) | "
+          f"planificador: {metricas['envios']:>4} envíos de {metricas['solicitudes']} solicitudes, "
+          f"{metricas['controles']} controles ({t_planificador * 1000:7.1f} ms)")
+
+
+def main():
+    cambios = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    print(f"Cambios por escenario: {cambios:,}")
+    _medir("logs_correo", _rafaga_logs, cambios)
+    _medir("carrito", _carrito, cambios)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark de reportes: tiempo para armar los datos de la pantalla
+Compara el ciclo anterior de ReportesWindow._obtener_datos_ventas (una
+consulta de detalle por venta y agregación en Python) contra
+VentasBuilder.resumen_reporte (resumen ventas_diarias + una consulta agrupada)
+
+Uso:
+    python -m benchmarks.bench_reportes [ventas,ventas,...]
+"""
+
+import datetime
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from BuilderSql import VentasBuilder, cerrar_pools
+
+TAMANOS = (1_000, 100_000, 1_000_000)
+DIAS = 365
+FECHA_BASE = datetime.date(2024, 1, 1)
+TIPOS = ("Normal", "Mayoreo", "Promoción")
+
+
+def _poblar(conn: sqlite3.Connection, desde: int, hasta: int, lote: int = 50_000):
+    """Inserta ventas con 1-4 renglones hasta tener 'hasta' ventas"""
+    azar = random.Random(desde)
+    for inicio in range(desde, hasta, lote):
+        ventas, detalles = [], []
+        for venta_id in range(inicio + 1, min(inicio + lote, hasta) + 1):
+            fecha = (FECHA_BASE + datetime.timedelta(days=venta_id % DIAS)).isoformat()
+            total = 0.0
+            for _ in range(azar.randint(1, 4)):
+                cantidad = azar.randint(1, 5)
+                precio = azar.choice((9.5, 12.0, 18.0, 25.0, 40.0))
+                total += cantidad * precio
+                detalles.append((venta_id, f"Producto {azar.randint(1, 500)}", cantidad, precio))
+            ventas.append((venta_id, f"cajero{venta_id % 7}", fecha, total, TIPOS[venta_id % 3]))
+        conn.executemany(
+            "INSERT INTO ventas(id, usuario, fecha, total, tipo_venta) VALUES(?,?,?,?,?)", ventas
+        )
+        conn.executemany(
+            "INSERT INTO ventas_detalle(venta_id, producto, cantidad, precio_unit) VALUES(?,?,?,?)",
+            detalles,
+        )
+        conn.commit()
+
+
+def _ciclo_anterior(fecha_inicio: str, fecha_fin: str) -> dict:
+    """Réplica del ciclo previo: N+1 consultas y agregación en Python"""
+    conn = sqlite3.connect(str(VentasBuilder.DB_PATH))
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT * FROM ventas WHERE fecha BETWEEN ? AND ? ORDER BY fecha DESC",
+        [fecha_inicio, fecha_fin],
+    )
+    ventas = cursor.fetchall()
+    productos, por_tipo, por_dia, total = {}, {}, {}, 0
+    for v in ventas:
+        monto = v["total"] or 0.0
+        total += monto
+        tipo = v["tipo_venta"] or "Normal"
+        por_tipo[tipo] = por_tipo.get(tipo, 0) + monto
+        por_dia[v["fecha"]] = por_dia.get(v["fecha"], 0) + monto
+        cursor.execute("SELECT * FROM ventas_detalle WHERE venta_id = ?", [v["id"]])
+        for d in cursor.fetchall():
+            p = productos.setdefault(d["producto"], {"nombre": d["producto"], "cantidad": 0, "ingresos": 0})
+            p["cantidad"] += d["cantidad"]
+            p["ingresos"] += d["precio_unit"] * d["cantidad"]
+    conn.close()
+    top = sorted(productos.values(), key=lambda x: x["ingresos"], reverse=True)[:10]
+    return {"total_ventas": total, "num_transacciones": len(ventas), "productos_top": top}
+
+
+def _medir(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return time.perf_counter() - inicio, resultado
+
+
+def main(tamanos=TAMANOS):
+    original = os.getcwd()
+    fecha_inicio = FECHA_BASE.isoformat()
+    fecha_fin = (FECHA_BASE + datetime.timedelta(days=DIAS)).isoformat()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            VentasBuilder.inicializar_bd()
+            conn = sqlite3.connect(str(VentasBuilder.DB_PATH))
+            cargadas = 0
+            print(f"{'ventas':>10} {'ciclo anterior':>16} {'resumen_reporte':>16} {'mejora':>8}")
+            for tamano in sorted(tamanos):
+                _poblar(conn, cargadas, tamano)
+                cargadas = tamano
+                antes, viejo = _medir(_ciclo_anterior, fecha_inicio, fecha_fin)
+                ahora, nuevo = _medir(VentasBuilder.resumen_reporte, fecha_inicio, fecha_fin)
+                assert viejo["num_transacciones"] == nuevo["num_transacciones"]
+                assert abs(viejo["total_ventas"] - nuevo["total_ventas"]) < 1e-6 * max(1.0, viejo["total_ventas"])
+                assert [p["nombre"] for p in viejo["productos_top"]] == [p["nombre"] for p in nuevo["productos_top"]]
+                print(f"{tamano:>10,} {antes * 1000:>14.1f}ms {ahora * 1000:>14.1f}ms {antes / ahora:>7.1f}x")
+            conn.close()
+        finally:
+            cerrar_pools()
+            os.chdir(original)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main([int(t) for t in sys.argv[1].split(",")])
+    else:
+        main()
@@ -0,0 +1,64 @@
+"""
+Benchmark de la sincronización users.json -> tabla usuarios
+Mide UsuariosBuilder.inicializar_bd con N usuarios en una base temporal:
+la primera carga, un inicio sin cambios en el JSON (solo se compara el
+hash del archivo), un inicio con un usuario editado y otro con una llave
+nueva en el JSON (agrega una columna)
+
+Uso:
+    python -m benchmarks.bench_sync_usuarios [usuarios]
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from BuilderSql import UsuariosBuilder
+
+
+def _escribir(ruta: Path, usuarios: dict):
+    ruta.write_text(json.dumps({"usuarios": usuarios}, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _medir(nombre: str) -> float:
+    salida = io.StringIO()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(salida):
+        UsuariosBuilder.inicializar_bd()
+    ms = (time.perf_counter() - inicio) * 1000
+    resumen = salida.getvalue().strip().splitlines()
+    print(f"{nombre:<22} {ms:9.1f} ms  {resumen[-1] if resumen else '(sin cambios)'}")
+    return ms
+
+
+def main():
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print(f"Usuarios: {num:,}")
+    with tempfile.TemporaryDirectory() as directorio:
+        UsuariosBuilder.DB_PATH = Path(directorio) / "ventas.db"
+        UsuariosBuilder.JSON_FILE = Path(directorio) / "users.json"
+        usuarios = {
+            f"empleado{i:06d}": {"password": f"clave{i}", "rol": "Cajero", "estado": "Activo", "tipo": "empleado"}
+            for i in range(num)
+        }
+        _escribir(UsuariosBuilder.JSON_FILE, usuarios)
+        _medir("primera carga")
+        _medir("inicio sin cambios")
+
+        usuarios["empleado000007"]["estado"] = "Inactivo"
+        _escribir(UsuariosBuilder.JSON_FILE, usuarios)
+        _medir("un usuario editado")
+
+        usuarios["empleado000008"]["telefono"] = "555-0101"
+        del usuarios["empleado000009"]
+        _escribir(UsuariosBuilder.JSON_FILE, usuarios)
+        _medir("llave nueva + baja")
+        _medir("inicio sin cambios")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from reportlab.lib.utils import ImageReader
 from reportlab.platypus import Table, TableStyle
 from reportlab.lib import colors
 from reportlab.lib.colors import navy, white, black
+from JsonSpace.JsonSP import JsonDB
 
 class GeneradorFacturas:
     MARGEN_LEFT    = 50
@@ -26,8 +27,9 @@ class GeneradorFacturas:
         try:
             with open(self.empresa_file,  'r', encoding='utf-8') as f:
                 self.datos_empresa   = json.load(f)
-            with open(self.facturas_file, 'r', encoding='utf-8') as f:
-                self.config_facturas = json.load(f)
+            # Compartido entre cajas: el folio se toma con bloqueo entre procesos
+            self.db_facturas = JsonDB(str(self.facturas_file), crear_si_no_existe=False, respaldos=False)
+            self.config_facturas = self.db_facturas.todo()
         except Exception as e:
             print("Error cargando configuraciones:", e)
 
@@ -173,8 +175,8 @@ class GeneradorFacturas:
             # 2. Información de la factura y cliente
             c.setFont("Helvetica-Bold", 14)
             c.setFillColor(self.COLOR_PRIMARIO)
+            folio = self._reservar_folio()
             serie = self.config_facturas.get("serie_facturas", "A")
-            folio = self.config_facturas.get("folio_actual", "00000000000001")
             c.drawString(self.MARGEN_LEFT, y, f"FACTURA {serie}-{folio}")
             
             c.setFillColor(black)
@@ -209,7 +211,6 @@ class GeneradorFacturas:
             self._draw_footer(c, 60)
 
             c.save()
-            self._actualizar_folio()
             
             return str(output_path)
             
@@ -220,11 +221,14 @@ class GeneradorFacturas:
             return None
 
     # ---------- FOLIO ----------
-    def _actualizar_folio(self):
+    def _reservar_folio(self):
+        """Toma el folio actual y deja el siguiente en una sola transacción, así dos cajas no repiten folio"""
         try:
-            folio_act = int(self.config_facturas.get("folio_actual", "00000000000001"))
-            self.config_facturas["folio_actual"] = str(folio_act + 1).zfill(14)
-            with open(self.facturas_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config_facturas, f, indent=4, ensure_ascii=False)
+            with self.db_facturas.transaccion():
+                folio = self.db_facturas.obtener("folio_actual", "00000000000001")
+                self.db_facturas.guardar("folio_actual", str(int(folio) + 1).zfill(14))
+            self.config_facturas = self.db_facturas.todo()
+            return folio
         except Exception as e:
-            print("Error actualizando folio:", e)
\ No newline at end of file
+            print("Error actualizando folio:", e)
+            return self.config_facturas.get("folio_actual", "00000000000001")
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+GrillaProductos - Grilla virtualizada de tarjetas de producto para la caja
+Existe un número fijo de tarjetas (las que caben en unas cuantas pantallas,
+según las columnas que permite el ancho de la ventana);
+al desplazarse o filtrar se vuelven a enlazar a otros productos cambiando
+solo las propiedades que difieren, así la memoria y lo que se envía al
+cliente de Flet no crecen con el tamaño del catálogo ni con el scroll
+"""
+
+import math
+
+import flet as ft
+
+
+class TarjetaProducto:
+    """Tarjeta reutilizable: se crea una vez y se enlaza a distintos productos"""
+
+    # Color de la etiqueta de tarifa
+    COLORES_TARIFA = {
+        "Normal": ft.Colors.BLUE_500,
+        "Mayoreo": ft.Colors.GREEN_500,
+        "Promoción": ft.Colors.RED_500,
+    }
+
+    def __init__(self, al_agregar):
+        """
+        Args:
+            al_agregar: callback con el RegistroProducto enlazado al pulsar "Agregar"
+        """
+        self.registro = None
+        self._nombre = ft.Text(
+            "",
+            size=15,
+            weight=ft.FontWeight.W_600,
+            color=ft.Colors.GREY_800,
+            max_lines=2,
+            overflow=ft.TextOverflow.ELLIPSIS
+        )
+        self._precio = ft.Text(
+            "",
+            size=16,
+            weight=ft.FontWeight.BOLD,
+            color=ft.Colors.GREEN_700
+        )
+        self._texto_tarifa = ft.Text(
+            "",
+            size=10,
+            color=ft.Colors.WHITE,
+            weight=ft.FontWeight.W_500
+        )
+        self._etiqueta = ft.Container(
+            content=self._texto_tarifa,
+            bgcolor=ft.Colors.BLUE_500,
+            border_radius=8,
+            padding=ft.padding.symmetric(horizontal=6, vertical=2)
+        )
+        self._icono_stock = ft.Icon(ft.Icons.INVENTORY, size=12, color=ft.Colors.GREEN_600)
+        self._texto_stock = ft.Text("", size=11, color=ft.Colors.GREEN_600)
+
+        self.control = ft.Card(
+            elevation=2,
+            visible=False,
+            content=ft.Container(
+                content=ft.Column([
+                    ft.Container(
+                        content=ft.Column([
+                            self._nombre,
+                            ft.Container(height=5),
+                            ft.Row([
+                                ft.Icon(ft.Icons.ATTACH_MONEY, size=14, color=ft.Colors.GREEN_700),
+                                self._precio,
+                            ], spacing=5),
+                        ]),
+                        padding=ft.padding.symmetric(horizontal=15, vertical=10)
+                    ),
+                    ft.Container(
+                        content=ft.Row([
+                            ft.Row([
+                                self._icono_stock,
+                                self._texto_stock,
+                            ], spacing=5),
+                            ft.Container(expand=True),
+                            self._etiqueta
+                        ]),
+                        padding=ft.padding.symmetric(horizontal=15),
+                        bgcolor=ft.Colors.GREY_50,
+                    ),
+                    ft.Container(
+                        content=ft.ElevatedButton(
+                            content=ft.Row([
+                                ft.Icon(ft.Icons.ADD_SHOPPING_CART, size=16),
+                                ft.Text("Agregar", size=12, weight=ft.FontWeight.W_500)
+                            ], spacing=6, alignment=ft.MainAxisAlignment.CENTER),
+                            on_click=lambda e: self.registro is not None and al_agregar(self.registro),
+                            style=ft.ButtonStyle(
+                                color=ft.Colors.WHITE,
+                                bgcolor=ft.Colors.INDIGO_600,
+                                shape=ft.RoundedRectangleBorder(radius=8),
+                                padding=ft.padding.symmetric(horizontal=12, vertical=8)
+                            ),
+                            width=120
+                        ),
+                        padding=ft.padding.symmetric(vertical=10),
+                        alignment=ft.alignment.center
+                    )
+                ], spacing=0),
+                border_radius=12,
+            )
+        )
+
+    @staticmethod
+    def _poner(control, atributo, valor):
+        """Asigna solo si cambió (lo que no cambia no viaja al cliente)"""
+        if getattr(control, atributo) != valor:
+            setattr(control, atributo, valor)
+
+    def enlazar(self, registro, tipo_venta: str):
+        """Muestra un RegistroProducto con la tarifa del tipo de venta"""
+        self.registro = registro
+        stock = registro.stock_actual or 0
+        if stock == 0:
+            color, icono = ft.Colors.RED_600, ft.Icons.ERROR
+        elif stock <= (registro.stock_minimo or 0):
+            color, icono = ft.Colors.ORANGE_600, ft.Icons.WARNING
+        else:
+            color, icono = ft.Colors.GREEN_600, ft.Icons.INVENTORY
+        precio, tipo_precio = registro.tarifa(tipo_venta)
+
+        poner = self._poner
+        poner(self.control, "visible", True)
+        poner(self._nombre, "value", registro.nombre)
+        poner(self._precio, "value", f"{precio:.2f}")
+        poner(self._texto_tarifa, "value", tipo_precio)
+        poner(self._etiqueta, "bgcolor", self.COLORES_TARIFA.get(tipo_precio, ft.Colors.BLUE_500))
+        poner(self._icono_stock, "name", icono)
+        poner(self._icono_stock, "color", color)
+        poner(self._texto_stock, "value", f"Stock: {stock}")
+        poner(self._texto_stock, "color", color)
+
+    def vaciar(self):
+        """Oculta la tarjeta (no hay producto para esta posición)"""
+        self.registro = None
+        self._poner(self.control, "visible", False)
+
+
+class GrillaProductos:
+    """Ventana deslizante de tarjetas sobre una lista de posiciones"""
+
+    ANCHO_TARJETA = 260     # ancho máximo de una tarjeta (el max_extent de antes)
+    ESPACIO = 15            # separación entre tarjetas
+    MARGEN = 20             # padding de la grilla
+    COLUMNAS = 3            # mientras no se conozca el ancho disponible
+    FILAS_POOL = 8          # filas de tarjetas que existen a la vez
+    FILAS_SALTO = 3         # filas que avanza o retrocede la ventana
+    MARGEN_SCROLL = 120     # px al borde a partir de los cuales se mueve la ventana
+
+    def __init__(self, al_agregar, ancho: float = None):
+        """
+        Args:
+            al_agregar: callback con el RegistroProducto al pulsar "Agregar"
+            ancho: px disponibles para la grilla (None = COLUMNAS columnas)
+        """
+        self._al_agregar = al_agregar
+        self.columnas = self._columnas_para(ancho)
+        self._tarjetas = [TarjetaProducto(al_agregar) for _ in range(self.columnas * self.FILAS_POOL)]
+        self._productos = []
+        self._indices = range(0)
+        self._tipo_venta = "normal"
+        self.inicio = 0
+
+        self.grid = ft.GridView(
+            controls=[t.control for t in self._tarjetas],
+            runs_count=self.columnas,
+            spacing=self.ESPACIO,
+            run_spacing=self.ESPACIO,
+            padding=self.MARGEN,
+            expand=True,
+            on_scroll=self._al_desplazar
+        )
+        self.vacio = ft.Container(
+            content=ft.Column([
+                ft.Icon(ft.Icons.INVENTORY_2, size=48, color=ft.Colors.GREY_400),
+                ft.Text("No hay productos", size=16, color=ft.Colors.GREY_600),
+                ft.Text("Actualiza o verifica el inventario", size=12, color=ft.Colors.GREY_400),
+            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=12),
+            padding=40,
+            alignment=ft.alignment.top_center,
+            visible=False
+        )
+        self.control = ft.Stack([self.grid, self.vacio], expand=True)
+
+    @classmethod
+    def _columnas_para(cls, ancho) -> int:
+        """Columnas con tarjetas de a lo más ANCHO_TARJETA px (igual que max_extent)"""
+        if not ancho:
+            return cls.COLUMNAS
+        util = ancho - 2 * cls.MARGEN
+        return max(1, math.ceil(util / (cls.ANCHO_TARJETA + cls.ESPACIO)))
+
+    def ajustar_ancho(self, ancho: float):
+        """
+        Recalcula las columnas para el ancho disponible (ej: desde page.on_resized)
+        El pool crece o se recorta a columnas * FILAS_POOL tarjetas y la ventana
+        sigue empezando en la fila del primer producto que se veía
+        """
+        columnas = self._columnas_para(ancho)
+        if columnas == self.columnas:
+            return
+        self.columnas = columnas
+        tamano = columnas * self.FILAS_POOL
+        if len(self._tarjetas) < tamano:
+            self._tarjetas.extend(
+                TarjetaProducto(self._al_agregar) for _ in range(tamano - len(self._tarjetas))
+            )
+        else:
+            del self._tarjetas[tamano:]
+        self.grid.controls = [t.control for t in self._tarjetas]
+        self.grid.runs_count = columnas
+        self.inicio -= self.inicio % columnas
+        self._enlazar()
+        self._actualizar()
+
+    def mostrar(self, productos: list, indices, tipo_venta: str):
+        """
+        Enlaza la grilla a una nueva vista y vuelve al inicio
+        Args:
+            productos: lista de RegistroProducto
+            indices: posiciones a mostrar dentro de productos (range o array)
+            tipo_venta: tarifa que muestran las tarjetas
+        """
+        self._productos = productos
+        self._indices = indices
+        self._tipo_venta = tipo_venta
+        self.inicio = 0
+        self._enlazar()
+        self._actualizar(desplazar_a=0)
+
+    def refrescar(self, tipo_venta: str = None):
+        """Vuelve a enlazar la ventana actual (ej: cambió el tipo de venta o el stock)"""
+        if tipo_venta is not None:
+            self._tipo_venta = tipo_venta
+        self._enlazar()
+        self._actualizar()
+
+    def _enlazar(self):
+        productos, indices = self._productos, self._indices
+        total = len(indices)
+        for k, tarjeta in enumerate(self._tarjetas):
+            j = self.inicio + k
+            if j < total:
+                tarjeta.enlazar(productos[indices[j]], self._tipo_venta)
+            else:
+                tarjeta.vaciar()
+        self.vacio.visible = total == 0
+
+    def _actualizar(self, desplazar_a: float = None):
+        try:
+            if desplazar_a is not None:
+                self.grid.scroll_to(offset=desplazar_a, duration=0)
+            self.grid.update()
+            self.vacio.update()
+        except Exception:
+            # La grilla todavía no está en la página
+            pass
+
+    def _al_desplazar(self, e):
+        """Mueve la ventana cuando el scroll llega cerca de un borde"""
+        total = len(self._indices)
+        tamano = len(self._tarjetas)
+        if total <= tamano:
+            return
+        # Alto aproximado de una fila: contenido total entre las filas de la ventana
+        alto_fila = (e.max_scroll_extent + e.viewport_dimension) / self.FILAS_POOL
+        if e.pixels >= e.max_scroll_extent - self.MARGEN_SCROLL and self.inicio + tamano < total:
+            pendientes = math.ceil((total - self.inicio - tamano) / self.columnas)
+            filas = min(self.FILAS_SALTO, pendientes)
+            self.inicio += filas * self.columnas
+            self._enlazar()
+            self._actualizar(desplazar_a=max(0.0, e.pixels - filas * alto_fila))
+        elif e.pixels <= self.MARGEN_SCROLL and self.inicio > 0:
+            filas = min(self.FILAS_SALTO, self.inicio // self.columnas)
+            self.inicio -= filas * self.columnas
+            self._enlazar()
+            self._actualizar(desplazar_a=e.pixels + filas * alto_fila)
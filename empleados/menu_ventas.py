@@ -1,15 +1,22 @@
 import flet as ft
 from datetime import datetime
 from BASEDATOS import db
+from BuilderSql.catalogo_productos import obtener_catalogo
+from BuilderSql.indice_busqueda import IndiceBusqueda
+from BuilderSql.gateway_datos import obtener_gateway
+from BuilderSql.planificador_ui import obtener_planificador
 import json
 from pathlib import Path
-import sqlite3
 import os
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 import threading
+import time
+
+from .producto_venta import ProductoVenta
+from .grilla_productos import GrillaProductos
 
 try:
     from .facturas import GeneradorFacturas
@@ -20,14 +27,24 @@ except ImportError:
 
 
 class MenuVentas:
+    # Lector de código de barras: caracteres separados por menos de INTERVALO_ESCANER
+    # segundos y al menos MIN_TECLAS_ESCANER seguidos antes del Enter
+    INTERVALO_ESCANER = 0.03
+    MIN_TECLAS_ESCANER = 4
+
+    # Ancho que no es de la grilla: carrito (320) + separación (20) + márgenes (40)
+    ANCHO_FUERA_GRILLA = 380
+
     def __init__(self, page: ft.Page, nombre_usuario: str):
         self.page = page
+        self._ui = obtener_planificador(page)
         self.nombre_usuario = nombre_usuario
         self.page.title = f"Ventas – {self.nombre_usuario}"
         self.page.theme_mode = ft.ThemeMode.LIGHT
         self.page.bgcolor = "#f3f4f6"
         self.page.padding = 0
         self.carrito = []
+        self._venta_en_curso = False
         self.tipo_venta_actual = "normal"
         
         if FACTURAS_DISPONIBLE:
@@ -41,13 +58,17 @@ class MenuVentas:
         self.datos_empresa = self._cargar_datos_empresa()
         self.productos = []
         self.total_productos = 0
-        self._buscar_timer = None
+        self.indice_busqueda = IndiceBusqueda(self.productos)
         
-        # Control de carga progresiva
-        self.productos_offset = 0
-        self.productos_cargando = False
-        self.productos_finalizados = False
-        self.productos_filtrados = []
+        # self.productos son los RegistroProducto del catálogo compartido (sin
+        # copias); id -> posición en la lista, se rehace en cargar_productos_db
+        self.posicion_por_id = {}
+        self._secuencia_catalogo = None
+        self._ultima_tecla = 0.0
+        self._teclas_rapidas = 0
+        
+        # Vista actual: posiciones dentro de self.productos (range = sin filtro)
+        self.indices_filtrados = range(0)
 
         self.cargar_productos_db()
         self.build_ui()
@@ -120,85 +141,61 @@ class MenuVentas:
             return datos_default
 
     def cargar_productos_db(self):
-        """Carga productos activos desde la base de datos."""
+        """Toma de la caché compartida del catálogo los productos con stock."""
         try:
-            db_path = "./BASEDATOS/productos.db"
-            os.makedirs(os.path.dirname(db_path), exist_ok=True)
-            
-            conn = sqlite3.connect(db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='productos'")
-            tabla_existe = cursor.fetchone()
-            
-            if not tabla_existe:
-                print("⚠️ La tabla 'productos' no existe. No se cargarán productos.")
-                self.productos = []
-                self.total_productos = 0
-                conn.close()
-                return
-            
-            cursor.execute("""
-                SELECT 
-                    id, codigo_barras, nombre, descripcion,
-                    precio_venta_normal, precio_venta_mayoreo, precio_venta_promocion,
-                    stock_actual, stock_minimo, stock_maximo,
-                    venta_normal_activa, venta_mayoreo_activa, venta_promocion_activa,
-                    minimo_mayoreo, imagen_path, activo, iva_porcentaje
-                FROM productos 
-                WHERE activo = 1 AND stock_actual > 0
-                ORDER BY nombre
-            """)
-            
-            productos_db = cursor.fetchall()
-            self.productos = []
-            
-            for producto in productos_db:
-                precio_activo, tipo_precio = self._obtener_precio_segun_tipo_venta(producto)
-                
-                producto_dict = {
-                    "id": producto['id'],
-                    "codigo_barras": producto['codigo_barras'],
-                    "nombre": producto['nombre'],
-                    "descripcion": producto['descripcion'],
-                    "precio": precio_activo,
-                    "stock": producto['stock_actual'],
-                    "stock_minimo": producto['stock_minimo'],
-                    "tipo_precio": tipo_precio,
-                    "imagen_path": producto['imagen_path'],
-                    "precio_normal": producto['precio_venta_normal'],
-                    "precio_mayoreo": producto['precio_venta_mayoreo'],
-                    "precio_promocion": producto['precio_venta_promocion'],
-                    "iva_porcentaje": producto['iva_porcentaje'] if producto['iva_porcentaje'] is not None else 16.0,
-                    "venta_normal_activa": producto['venta_normal_activa'],
-                    "venta_mayoreo_activa": producto['venta_mayoreo_activa'],
-                    "venta_promocion_activa": producto['venta_promocion_activa'],
-                    "minimo_mayoreo": producto['minimo_mayoreo']
-                }
-                self.productos.append(producto_dict)
-            
+            self._secuencia_catalogo, vista = obtener_catalogo().instantanea("nombre")
+            self.productos = [registro for registro in vista if (registro.stock_actual or 0) > 0]
             self.total_productos = len(self.productos)
-            conn.close()
             
             if not self.productos:
                 print("ℹ️ No se encontraron productos activos con stock > 0.")
-                self.productos = []
-                self.total_productos = 0
             
         except Exception as e:
             print(f"Error cargando productos desde DB: {e}")
             self.productos = []
             self.total_productos = 0
 
-    def _obtener_precio_segun_tipo_venta(self, producto):
-        """Determina el precio activo según el tipo de venta actual"""
-        if self.tipo_venta_actual == "promocion" and producto['venta_promocion_activa'] and producto['precio_venta_promocion'] and producto['precio_venta_promocion'] > 0:
-            return producto['precio_venta_promocion'], "Promoción"
-        elif self.tipo_venta_actual == "mayoreo" and producto['venta_mayoreo_activa'] and producto['precio_venta_mayoreo'] and producto['precio_venta_mayoreo'] > 0:
-            return producto['precio_venta_mayoreo'], "Mayoreo"
-        else:
-            return producto['precio_venta_normal'], "Normal"
+        self.posicion_por_id = {p.id: i for i, p in enumerate(self.productos)}
+        self.indices_filtrados = range(len(self.productos))
+        # El índice de búsqueda se arma en segundo plano antes de la primera tecla
+        self.indice_busqueda = IndiceBusqueda(self.productos)
+        obtener_gateway().enviar_lectura(self.indice_busqueda.preparar)
+
+    def _refrescar_productos(self):
+        """Aplica solo los productos que cambiaron desde la última carga (ej: tras una venta)"""
+        catalogo = obtener_catalogo()
+        secuencia, cambiados = catalogo.cambios_desde(self._secuencia_catalogo)
+        if cambiados is None:
+            self.cargar_productos_db()
+            return
+        self._secuencia_catalogo = secuencia
+
+        for producto_id in cambiados:
+            registro = catalogo.obtener(producto_id)
+            posicion = self.posicion_por_id.get(producto_id)
+            vigente = registro is not None and (registro.stock_actual or 0) > 0
+            if (posicion is not None and vigente and self.productos[posicion] is registro
+                    and self._en_orden(posicion)):
+                # El catálogo ya actualizó el registro en sitio (stock, precios)
+                continue
+            if posicion is not None or vigente:
+                # Entra, sale o cambia de posición en la lista ordenada
+                self.cargar_productos_db()
+                return
+
+    def _en_orden(self, posicion):
+        """True si el producto sigue entre sus vecinos en el orden por nombre"""
+        llave = lambda p: (p.nombre or "", p.id)
+        actual = llave(self.productos[posicion])
+        if posicion > 0 and llave(self.productos[posicion - 1]) > actual:
+            return False
+        if posicion + 1 < len(self.productos) and llave(self.productos[posicion + 1]) < actual:
+            return False
+        return True
+
+    def _producto_venta(self, registro, cantidad=None):
+        """ProductoVenta con el precio del tipo de venta actual (diálogo, escáner y carrito)"""
+        return ProductoVenta.desde_registro(registro, self.tipo_venta_actual, cantidad)
 
     def build_ui(self):
         header = ft.Container(
@@ -238,6 +235,7 @@ class MenuVentas:
             label="🔍 Buscar producto...",
             hint_text="Escribe el nombre o código del producto",
             on_change=self.filtrar_productos,
+            on_submit=self.escanear_codigo,
             border_radius=12,
             border_color=ft.Colors.INDIGO_300,
             focused_border_color=ft.Colors.INDIGO_500,
@@ -245,16 +243,12 @@ class MenuVentas:
             height=45
         )
 
-        self.lista_productos = ft.GridView(
-            runs_count=3,
-            max_extent=260,
-            spacing=15,
-            run_spacing=15,
-            padding=20,
-            expand=True,
-            on_scroll=self._detectar_scroll
+        # Tarjetas recicladas: la grilla tiene siempre las mismas, enlazadas a la vista
+        self.grilla_productos = GrillaProductos(
+            al_agregar=lambda registro: self.mostrar_dialogo_cantidad(self._producto_venta(registro)),
+            ancho=self._ancho_grilla()
         )
-        self.productos_filtrados = self.productos.copy()
+        self.page.on_resized = lambda e: self.grilla_productos.ajustar_ancho(self._ancho_grilla())
         self.cargar_productos_ui()
 
         self.total_text = ft.Text("Total: $0.00", size=22, weight=ft.FontWeight.BOLD, color=ft.Colors.INDIGO_900)
@@ -372,7 +366,7 @@ class MenuVentas:
                                 content=self.buscador,
                                 padding=ft.padding.only(bottom=10)
                             ),
-                            self.lista_productos
+                            self.grilla_productos.control
                         ], expand=True, spacing=0),
                         carrito_area,
                     ], expand=True, spacing=20, vertical_alignment=ft.CrossAxisAlignment.START),
@@ -383,6 +377,12 @@ class MenuVentas:
         )
         self.actualizar_vista_carrito()
 
+    def _ancho_grilla(self):
+        """Px disponibles para la grilla de productos (None si la página aún no tiene ancho)"""
+        if not self.page.width:
+            return None
+        return self.page.width - self.ANCHO_FUERA_GRILLA
+
     def _crear_selector_tipo_venta(self):
         """Crea el selector de tipo de venta"""
         self.selector_tipo_venta = ft.Dropdown(
@@ -411,35 +411,14 @@ class MenuVentas:
             self.tipo_venta_actual = nuevo_tipo
             self.mostrar_mensaje_exito(f"Tipo de venta cambiado a: {self.obtener_nombre_tipo_venta()}")
             
-            for producto in self.productos:
-                producto["precio"], producto["tipo_precio"] = self._obtener_precio_segun_tipo_venta_db(producto)
-            
+            # Las tarifas ya están calculadas en el catálogo: solo se cambia cuál se lee
             for item in self.carrito:
-                producto_actualizado = next((p for p in self.productos if p["id"] == item["producto"]["id"]), None)
-                if producto_actualizado:
-                    item["producto"]["precio"] = producto_actualizado["precio"]
-                    item["producto"]["tipo_precio"] = producto_actualizado["tipo_precio"]
+                item["producto"].aplicar_tipo_venta(nuevo_tipo, item["cantidad"])
             
-            self.productos_filtrados = self.productos.copy()
-            self.cargar_productos_ui()
+            self.grilla_productos.refrescar(nuevo_tipo)
             self.actualizar_vista_carrito()
             self.calcular_total()
 
-    def _obtener_precio_segun_tipo_venta_db(self, producto):
-        """Determina el precio activo según el tipo de venta actual para productos ya cargados"""
-        if (self.tipo_venta_actual == "promocion" and 
-            producto.get('venta_promocion_activa') and 
-            producto.get('precio_promocion') and 
-            producto['precio_promocion'] > 0):
-            return producto['precio_promocion'], "Promoción"
-        elif (self.tipo_venta_actual == "mayoreo" and 
-              producto.get('venta_mayoreo_activa') and 
-              producto.get('precio_mayoreo') and 
-              producto['precio_mayoreo'] > 0):
-            return producto['precio_mayoreo'], "Mayoreo"
-        else:
-            return producto['precio_normal'], "Normal"
-
     def obtener_nombre_tipo_venta(self):
         """Obtiene el nombre legible del tipo de venta actual"""
         nombres = {
@@ -450,354 +429,97 @@ class MenuVentas:
         return nombres.get(self.tipo_venta_actual, "Venta Normal")
 
     def cargar_productos_ui(self):
-        """Reinicia la lista y carga la primera tanda de productos"""
-        self.productos_offset = 0
-        self.productos_finalizados = False
-        self.lista_productos.controls.clear()
-        try:
-            self.page.update()
-        except:
-            pass
-        self._cargar_mas_productos()
-
-    def _cargar_mas_productos(self):
-        """Carga productos de forma incremental (scroll infinito)"""
-        if self.productos_cargando or self.productos_finalizados:
-            return
-
-        self.productos_cargando = True
-        
-        # Mostrar indicador de carga
-        if self.productos_offset > 0:
-            self.lista_productos.controls.append(
-                ft.Container(
-                    content=ft.Column([
-                        ft.ProgressRing(width=30, height=30, color=ft.Colors.INDIGO_600),
-                        ft.Text("Cargando más productos...", size=12, color=ft.Colors.GREY_600)
-                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10),
-                    alignment=ft.alignment.center,
-                    padding=20
-                )
-            )
-            try:
-                self.page.update()
-            except:
-                pass
+        """Enlaza la grilla a la vista actual (self.indices_filtrados) desde el inicio"""
+        self.grilla_productos.mostrar(self.productos, self.indices_filtrados, self.tipo_venta_actual)
 
-        try:
-            # Obtener siguiente lote de productos (20 por vez)
-            LIMITE = 20
-            inicio = self.productos_offset
-            fin = inicio + LIMITE
-            productos_lote = self.productos_filtrados[inicio:fin]
-
-            # Quitar loader si existe
-            if (self.productos_offset > 0 and 
-                self.lista_productos.controls and 
-                isinstance(self.lista_productos.controls[-1], ft.Container) and
-                len(self.lista_productos.controls[-1].content.controls) > 0 and
-                isinstance(self.lista_productos.controls[-1].content.controls[0], ft.ProgressRing)):
-                self.lista_productos.controls.pop()
-
-            if not productos_lote:
-                # No hay más productos
-                self.productos_finalizados = True
-                if self.productos_offset == 0:
-                    # No hay productos en absoluto
-                    self.lista_productos.controls.append(
-                        ft.Container(
-                            content=ft.Column([
-                                ft.Icon(ft.Icons.INVENTORY_2, size=48, color=ft.Colors.GREY_400),
-                                ft.Text("No hay productos", size=16, color=ft.Colors.GREY_600),
-                                ft.Text("Actualiza o verifica el inventario", size=12, color=ft.Colors.GREY_400),
-                            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=12),
-                            padding=40,
-                            alignment=ft.alignment.center
-                        )
-                    )
-            else:
-                # Agregar productos al grid
-                for p in productos_lote:
-                    self.lista_productos.controls.append(self._crear_tarjeta_producto(p))
-                
-                self.productos_offset += len(productos_lote)
-                
-                # Si obtuvimos menos productos que el límite, ya no hay más
-                if len(productos_lote) < LIMITE:
-                    self.productos_finalizados = True
-
-            try:
-                self.page.update()
-            except:
-                pass
-
-        except Exception as e:
-            print(f"Error cargando productos: {e}")
-            # Quitar loader si existe
-            if (self.productos_offset > 0 and 
-                self.lista_productos.controls and 
-                isinstance(self.lista_productos.controls[-1], ft.Container) and
-                len(self.lista_productos.controls[-1].content.controls) > 0 and
-                isinstance(self.lista_productos.controls[-1].content.controls[0], ft.ProgressRing)):
-                self.lista_productos.controls.pop()
-                
-            self.lista_productos.controls.append(
-                ft.Container(
-                    content=ft.Text(f"Error al cargar productos", color=ft.Colors.RED_600),
-                    alignment=ft.alignment.center,
-                    padding=20
-                )
-            )
-            try:
-                self.page.update()
-            except:
-                pass
-
-        self.productos_cargando = False
-
-    def _detectar_scroll(self, e):
-        """Detecta cuando se llega al final del scroll para cargar más"""
-        if e.pixels >= e.max_scroll_extent - 100 and not self.productos_cargando:
-            self._cargar_mas_productos()
-
-    def _crear_tarjeta_producto(self, p):
-        """Crea una tarjeta individual de producto"""
-        stock_color = ft.Colors.GREEN_600
-        stock_icon = ft.Icons.INVENTORY
-        if p["stock"] <= p.get("stock_minimo", 5):
-            stock_color = ft.Colors.ORANGE_600
-            stock_icon = ft.Icons.WARNING
-        if p["stock"] == 0:
-            stock_color = ft.Colors.RED_600
-            stock_icon = ft.Icons.ERROR
-
-        badge_color = ft.Colors.BLUE_500
-        if p.get("tipo_precio") == "Mayoreo":
-            badge_color = ft.Colors.GREEN_500
-        elif p.get("tipo_precio") == "Promoción":
-            badge_color = ft.Colors.RED_500
-
-        return ft.Card(
-            elevation=2,
-            content=ft.Container(
-                content=ft.Column([
-                    ft.Container(
-                        content=ft.Column([
-                            ft.Text(
-                                p["nombre"], 
-                                size=15, 
-                                weight=ft.FontWeight.W_600, 
-                                color=ft.Colors.GREY_800,
-                                max_lines=2,
-                                overflow=ft.TextOverflow.ELLIPSIS
-                            ),
-                            ft.Container(height=5),
-                            ft.Row([
-                                ft.Icon(ft.Icons.ATTACH_MONEY, size=14, color=ft.Colors.GREEN_700),
-                                ft.Text(
-                                    f"{p['precio']:.2f}", 
-                                    size=16, 
-                                    weight=ft.FontWeight.BOLD, 
-                                    color=ft.Colors.GREEN_700
-                                ),
-                            ], spacing=5),
-                        ]),
-                        padding=ft.padding.symmetric(horizontal=15, vertical=10)
-                    ),
-                    ft.Container(
-                        content=ft.Row([
-                            ft.Row([
-                                ft.Icon(stock_icon, size=12, color=stock_color),
-                                ft.Text(f"Stock: {p['stock']}", size=11, color=stock_color),
-                            ], spacing=5),
-                            ft.Container(expand=True),
-                            ft.Container(
-                                content=ft.Text(
-                                    p.get("tipo_precio", "Normal"), 
-                                    size=10, 
-                                    color=ft.Colors.WHITE,
-                                    weight=ft.FontWeight.W_500
-                                ),
-                                bgcolor=badge_color,
-                                border_radius=8,
-                                padding=ft.padding.symmetric(horizontal=6, vertical=2)
-                            )
-                        ]),
-                        padding=ft.padding.symmetric(horizontal=15),
-                        bgcolor=ft.Colors.GREY_50,
-                    ),
-                    ft.Container(
-                        content=ft.ElevatedButton(
-                            content=ft.Row([
-                                ft.Icon(ft.Icons.ADD_SHOPPING_CART, size=16),
-                                ft.Text("Agregar", size=12, weight=ft.FontWeight.W_500)
-                            ], spacing=6, alignment=ft.MainAxisAlignment.CENTER),
-                            on_click=lambda e, prod=p: self.mostrar_dialogo_cantidad(prod),
-                            style=ft.ButtonStyle(
-                                color=ft.Colors.WHITE,
-                                bgcolor=ft.Colors.INDIGO_600,
-                                shape=ft.RoundedRectangleBorder(radius=8),
-                                padding=ft.padding.symmetric(horizontal=12, vertical=8)
-                            ),
-                            width=120
-                        ),
-                        padding=ft.padding.symmetric(vertical=10),
-                        alignment=ft.alignment.center
-                    )
-                ], spacing=0),
-                border_radius=12,
-            )
-        )
-
-    def _cargar_productos_ui_legacy(self, productos):
-        """Método legacy - mantener por compatibilidad pero no usar"""
-        self.lista_productos.controls.clear()
-
-        # Limitar a 20 productos visibles
-        productos_visibles = productos[:20]
+    def filtrar_productos(self, e):
+        texto = self.buscador.value
 
-        if not productos_visibles:
-            self.lista_productos.controls.append(
-                ft.Container(
-                    content=ft.Column([
-                        ft.Icon(ft.Icons.INVENTORY_2, size=48, color=ft.Colors.GREY_400),
-                        ft.Text("No hay productos", size=16, color=ft.Colors.GREY_600),
-                        ft.Text("Actualiza o verifica el inventario", size=12, color=ft.Colors.GREY_400),
-                    ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=12),
-                    padding=40,
-                    alignment=ft.alignment.center
-                )
-            )
+        # Un lector de códigos "teclea" cada carácter en pocos milisegundos
+        ahora = time.perf_counter()
+        if ahora - self._ultima_tecla < self.INTERVALO_ESCANER:
+            self._teclas_rapidas += 1
         else:
-            for p in productos_visibles:
-                stock_color = ft.Colors.GREEN_600
-                stock_icon = ft.Icons.INVENTORY
-                if p["stock"] <= p.get("stock_minimo", 5):
-                    stock_color = ft.Colors.ORANGE_600
-                    stock_icon = ft.Icons.WARNING
-                if p["stock"] == 0:
-                    stock_color = ft.Colors.RED_600
-                    stock_icon = ft.Icons.ERROR
-
-                badge_color = ft.Colors.BLUE_500
-                if p.get("tipo_precio") == "Mayoreo":
-                    badge_color = ft.Colors.GREEN_500
-                elif p.get("tipo_precio") == "Promoción":
-                    badge_color = ft.Colors.RED_500
-
-                tile = ft.Card(
-                    elevation=2,
-                    content=ft.Container(
-                        content=ft.Column([
-                            ft.Container(
-                                content=ft.Column([
-                                    ft.Text(
-                                        p["nombre"], 
-                                        size=15, 
-                                        weight=ft.FontWeight.W_600, 
-                                        color=ft.Colors.GREY_800,
-                                        max_lines=2,
-                                        overflow=ft.TextOverflow.ELLIPSIS
-                                    ),
-                                    ft.Container(height=5),
-                                    ft.Row([
-                                        ft.Icon(ft.Icons.ATTACH_MONEY, size=14, color=ft.Colors.GREEN_700),
-                                        ft.Text(
-                                            f"{p['precio']:.2f}", 
-                                            size=16, 
-                                            weight=ft.FontWeight.BOLD, 
-                                            color=ft.Colors.GREEN_700
-                                        ),
-                                    ], spacing=5),
-                                ]),
-                                padding=ft.padding.symmetric(horizontal=15, vertical=10)
-                            ),
-                            ft.Container(
-                                content=ft.Row([
-                                    ft.Row([
-                                        ft.Icon(stock_icon, size=12, color=stock_color),
-                                        ft.Text(f"Stock: {p['stock']}", size=11, color=stock_color),
-                                    ], spacing=5),
-                                    ft.Container(expand=True),
-                                    ft.Container(
-                                        content=ft.Text(
-                                            p.get("tipo_precio", "Normal"), 
-                                            size=10, 
-                                            color=ft.Colors.WHITE,
-                                            weight=ft.FontWeight.W_500
-                                        ),
-                                        bgcolor=badge_color,
-                                        border_radius=8,
-                                        padding=ft.padding.symmetric(horizontal=6, vertical=2)
-                                    )
-                                ]),
-                                padding=ft.padding.symmetric(horizontal=15),
-                                bgcolor=ft.Colors.GREY_50,
-                            ),
-                            ft.Container(
-                                content=ft.ElevatedButton(
-                                    content=ft.Row([
-                                        ft.Icon(ft.Icons.ADD_SHOPPING_CART, size=16),
-                                        ft.Text("Agregar", size=12, weight=ft.FontWeight.W_500)
-                                    ], spacing=6, alignment=ft.MainAxisAlignment.CENTER),
-                                    on_click=lambda e, prod=p: self.mostrar_dialogo_cantidad(prod),
-                                    style=ft.ButtonStyle(
-                                        color=ft.Colors.WHITE,
-                                        bgcolor=ft.Colors.INDIGO_600,
-                                        shape=ft.RoundedRectangleBorder(radius=8),
-                                        padding=ft.padding.symmetric(horizontal=12, vertical=8)
-                                    ),
-                                    width=120
-                                ),
-                                padding=ft.padding.symmetric(vertical=10),
-                                alignment=ft.alignment.center
-                            )
-                        ], spacing=0),
-                        border_radius=12,
-                    )
-                )
-                self.lista_productos.controls.append(tile)
+            self._teclas_rapidas = 0
+        self._ultima_tecla = ahora
 
+        if self._es_rafaga_escaner():
+            # Lo resuelve escanear_codigo con el Enter del lector
+            return
+        self._aplicar_filtro(texto)
+
+    def _aplicar_filtro(self, texto):
+        """Busca en el índice de trigramas desde el gateway; solo se pinta la búsqueda más reciente"""
+        indice = self.indice_busqueda
+        obtener_gateway().en_pagina(
+            self.page, indice.buscar, texto,
+            al_terminar=lambda posiciones: self._mostrar_filtrados(indice, posiciones),
+            clave="menu_ventas_busqueda",
+        )
 
-    def filtrar_productos(self, e):
-        texto = self.buscador.value.lower().strip()
+    def _mostrar_filtrados(self, indice, posiciones):
+        if indice is not self.indice_busqueda:
+            # La lista se recargó mientras se buscaba: las posiciones ya no aplican
+            return
+        try:
+            self.indices_filtrados = range(len(self.productos)) if posiciones is None else posiciones
+            # Reiniciar carga incremental con productos filtrados
+            self.cargar_productos_ui()
+        except Exception as ex:
+            print(f"Error en filtro de productos: {ex}")
+
+    def _es_rafaga_escaner(self) -> bool:
+        """True si lo último escrito llegó como ráfaga de un lector de códigos"""
+        return self._teclas_rapidas >= self.MIN_TECLAS_ESCANER
+
+    def escanear_codigo(self, e):
+        """
+        Enter en el buscador: si el texto es un código de barras conocido el
+        producto va directo al carrito (sin debounce ni diálogo de cantidad)
+        """
+        codigo = self.buscador.value.strip()
+        rafaga = self._es_rafaga_escaner()
+        self._teclas_rapidas = 0
+        obtener_gateway().descartar("menu_ventas_busqueda")
+
+        registro = obtener_catalogo().por_codigo(codigo) if codigo else None
+        if registro is None or (registro.stock_actual or 0) <= 0:
+            if rafaga:
+                self.buscador.value = ""
+                self.mostrar_mensaje_error(f"Código {codigo} no encontrado o sin stock")
+            else:
+                # Enter sobre texto normal: filtrar ya
+                self._aplicar_filtro(codigo)
+            return
 
-        # Debounce para evitar bloqueos al escribir rapido
-        if self._buscar_timer:
+        producto = self._producto_venta(registro)
+        if self.agregar_escaneado(producto):
+            self.buscador.value = ""
+            if not isinstance(self.indices_filtrados, range):
+                # Los primeros dígitos del lector alcanzaron a filtrar la lista
+                self._mostrar_filtrados(self.indice_busqueda, None)
             try:
-                self._buscar_timer.cancel()
+                self.buscador.focus()
             except Exception:
                 pass
+            self.mostrar_mensaje_exito(f"Agregado: {producto.nombre}")
 
-        def _aplicar_filtro():
-            try:
-                if not texto:
-                    self.productos_filtrados = self.productos.copy()
-                else:
-                    self.productos_filtrados = [
-                        p for p in self.productos
-                        if texto in p["nombre"].lower() or
-                           (p.get("codigo_barras") and texto in p["codigo_barras"].lower())
-                    ]
-                
-                # Reiniciar carga incremental con productos filtrados
-                self.cargar_productos_ui()
-            except Exception as ex:
-                print(f"Error en filtro de productos: {ex}")
-
-        self._buscar_timer = threading.Timer(0.3, _aplicar_filtro)
-        self._buscar_timer.daemon = True
-        self._buscar_timer.start()
+    def agregar_escaneado(self, producto) -> bool:
+        """Suma una unidad al carrito validando contra el stock cargado"""
+        en_carrito = next(
+            (item["cantidad"] for item in self.carrito if item["producto"].id == producto.id), 0
+        )
+        if en_carrito + 1 > producto.stock:
+            self.mostrar_mensaje_error(f"Stock insuficiente. Disponible: {producto.stock}")
+            return False
+        self.agregar_al_carrito(producto, 1)
+        return True
 
     def actualizar_productos(self, e=None):
-        self.cargar_productos_db()
-        self.productos_filtrados = self.productos.copy()
+        self._refrescar_productos()
+        self.indices_filtrados = range(len(self.productos))
         self.cargar_productos_ui()
         self.mostrar_mensaje_exito("Productos actualizados")
-        try:
-            self.page.update()
-        except:
-            pass
 
     def mostrar_dialogo_cantidad(self, producto):
         cantidad_field = ft.TextField(
@@ -811,12 +533,12 @@ class MenuVentas:
             try:
                 cantidad = int(cantidad_field.value)
                 if cantidad > 0:
-                    if cantidad <= producto["stock"]:
+                    if cantidad <= producto.stock:
                         self.agregar_al_carrito(producto, cantidad)
                         self.page.close(dlg)
-                        self.mostrar_mensaje_exito(f"Agregado: {producto['nombre']} x{cantidad}")
+                        self.mostrar_mensaje_exito(f"Agregado: {producto.nombre} x{cantidad}")
                     else:
-                        self.mostrar_mensaje_error(f"Stock insuficiente. Disponible: {producto['stock']}")
+                        self.mostrar_mensaje_error(f"Stock insuficiente. Disponible: {producto.stock}")
                 else:
                     self.mostrar_mensaje_error("La cantidad debe ser mayor a 0")
             except ValueError:
@@ -824,10 +546,10 @@ class MenuVentas:
 
         dlg = ft.AlertDialog(
             modal=True,
-            title=ft.Text(f"Agregar {producto['nombre']}"),
+            title=ft.Text(f"Agregar {producto.nombre}"),
             content=ft.Column([
-                ft.Text(f"Precio: ${producto['precio']:.2f} ({producto.get('tipo_precio', 'Normal')})"),
-                ft.Text(f"Stock disponible: {producto['stock']}"),
+                ft.Text(f"Precio: ${producto.precio:.2f} ({producto.tipo_precio})"),
+                ft.Text(f"Stock disponible: {producto.stock}"),
                 ft.Text(f"Tipo de Venta: {self.obtener_nombre_tipo_venta()}"),
                 cantidad_field
             ], tight=True),
@@ -840,11 +562,14 @@ class MenuVentas:
 
     def agregar_al_carrito(self, producto, cantidad=1):
         for item in self.carrito:
-            if item["producto"]["id"] == producto["id"]:
+            if item["producto"].id == producto.id:
                 item["cantidad"] += cantidad
                 break
         else:
-            self.carrito.append({"producto": producto, "cantidad": cantidad})
+            item = {"producto": producto, "cantidad": cantidad}
+            self.carrito.append(item)
+        # Mayoreo solo a partir de minimo_mayoreo piezas
+        item["producto"].aplicar_tipo_venta(self.tipo_venta_actual, item["cantidad"])
         
         self.actualizar_vista_carrito()
         self.calcular_total()
@@ -868,7 +593,7 @@ class MenuVentas:
             for i, item in enumerate(self.carrito):
                 producto = item["producto"]
                 cantidad = item["cantidad"]
-                total_item = producto["precio"] * cantidad
+                total_item = producto.precio * cantidad
                 
                 item_card = ft.Card(
                     elevation=1,
@@ -876,15 +601,15 @@ class MenuVentas:
                         content=ft.Row([
                             ft.Column([
                                 ft.Text(
-                                    producto["nombre"], 
+                                    producto.nombre, 
                                     size=13, 
                                     weight=ft.FontWeight.W_600,
                                     max_lines=1,
                                     overflow=ft.TextOverflow.ELLIPSIS
                                 ),
                                 ft.Row([
-                                    ft.Text(f"${producto['precio']:.2f}", size=11, color=ft.Colors.GREY_600),
-                                    ft.Text(f"({producto.get('tipo_precio', 'Normal')})", size=10, color=ft.Colors.GREY_500),
+                                    ft.Text(f"${producto.precio:.2f}", size=11, color=ft.Colors.GREY_600),
+                                    ft.Text(f"({producto.tipo_precio})", size=10, color=ft.Colors.GREY_500),
                                     ft.Text("×", size=11, color=ft.Colors.GREY_500),
                                     ft.Text(f"{cantidad}", size=11, color=ft.Colors.GREY_600),
                                 ], spacing=4),
@@ -911,19 +636,13 @@ class MenuVentas:
                 self.lista_carrito.controls.append(item_card)
         
         self.actualizar_contador_carrito()
-        try:
-            self.page.update()
-        except:
-            pass
+        self._ui.actualizar(self.lista_carrito, pantalla="menu_ventas")
 
     def actualizar_contador_carrito(self):
         """Actualiza el contador de items en el carrito"""
         total_items = sum(item["cantidad"] for item in self.carrito)
         self.carrito_header.content.controls[2].content.value = str(total_items)
-        try:
-            self.carrito_header.update()
-        except:
-            pass
+        self._ui.actualizar(self.carrito_header, pantalla="menu_ventas")
 
     def mostrar_dialogo_tipo_cliente(self, e):
         if not self.carrito:
@@ -1201,13 +920,13 @@ class MenuVentas:
         for item in self.carrito:
             producto = item["producto"]
             cantidad = item["cantidad"]
-            total_item = producto["precio"] * cantidad
+            total_item = producto.precio * cantidad
             
-            iva_porcentaje = producto.get("iva_porcentaje", 16.0)
+            iva_porcentaje = producto.iva_porcentaje
             
             items_resumen.append(
                 ft.Row([
-                    ft.Text(f"{producto['nombre']}", size=12, expand=2,
+                    ft.Text(f"{producto.nombre}", size=12, expand=2,
                            max_lines=1, overflow=ft.TextOverflow.ELLIPSIS),
                     ft.Text(f"x{cantidad}", size=12, width=40),
                     ft.Text(f"${total_item:.2f}", size=12, weight=ft.FontWeight.W_500, width=70),
@@ -1280,44 +999,6 @@ class MenuVentas:
         print("DEBUG: Iniciando procesamiento de compra...")
         subtotal, iva_total, total = self._calcular_totales_carrito()
 
-        try:
-            print("DEBUG: Actualizando stock en base de datos...")
-            db_path = "./BASEDATOS/productos.db"
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("BEGIN")
-            es_valido, mensaje = self._validar_stock_carrito(cursor)
-            if not es_valido:
-                conn.rollback()
-                conn.close()
-                self.mostrar_mensaje_error(mensaje)
-                return
-            
-            for item in self.carrito:
-                producto_id = item["producto"]["id"]
-                cantidad_vendida = item["cantidad"]
-                
-                cursor.execute(
-                    "UPDATE productos SET stock_actual = stock_actual - ? WHERE id = ? AND stock_actual >= ?",
-                    [cantidad_vendida, producto_id, cantidad_vendida]
-                )
-                if cursor.rowcount == 0:
-                    conn.rollback()
-                    conn.close()
-                    self.mostrar_mensaje_error("Stock insuficiente al procesar la venta")
-                    return
-                print(f"DEBUG: Stock actualizado para producto ID {producto_id}, cantidad: {cantidad_vendida}")
-            
-            conn.commit()
-            conn.close()
-            print("DEBUG: Stock actualizado exitosamente")
-            
-        except Exception as ex:
-            print(f"ERROR: Al actualizar stock: {ex}")
-            import traceback
-            traceback.print_exc()
-        
         print("DEBUG: Guardando venta en base de datos...")
         # Guardar con el tipo de venta actual (formato corto para coincir con reportes)
         tipo_venta_map = {
@@ -1326,29 +1007,50 @@ class MenuVentas:
             "promocion": "Promoción"
         }
         tipo_venta_guardar = tipo_venta_map.get(self.tipo_venta_actual, "Normal")
-        if db.guardar_venta(self.nombre_usuario, self.carrito, tipo_venta_guardar):
+        detalles_venta = f"Total: ${total:.2f} | Productos: {len(self.carrito)} | Tipo: {tipo_venta_guardar}"
+
+        if self._venta_en_curso:
+            return
+        self._venta_en_curso = True
+        carrito = [dict(item) for item in self.carrito]
+
+        def al_terminar(resultado):
+            self._venta_en_curso = False
+            exito, mensaje, _venta_id = resultado
+            self._finalizar_compra(exito, mensaje, carrito, datos_cliente, subtotal, iva_total, total,
+                                   generar_factura, tipo_envio)
+
+        def al_fallar(ex):
+            self._venta_en_curso = False
+            print(f"ERROR: Al guardar la venta: {ex}")
+            self.mostrar_mensaje_error("Error al guardar la venta")
+
+        # Stock, venta, detalles y auditoría se confirman juntos o no se aplica nada;
+        # la transacción corre en el hilo escritor del gateway, no en el de la interfaz
+        obtener_gateway().en_pagina(
+            self.page, db.procesar_venta,
+            self.nombre_usuario, carrito, tipo_venta_guardar,
+            ("venta", f"Venta realizada por ${total:.2f}", detalles_venta),
+            al_terminar=al_terminar, al_fallar=al_fallar, escritura=True
+        )
+
+    def _finalizar_compra(self, exito, mensaje, carrito, datos_cliente, subtotal, iva_total, total,
+                          generar_factura=False, tipo_envio=None):
+        """Factura y limpieza del carrito una vez confirmada (o rechazada) la venta"""
+        if exito:
             print("DEBUG: Venta guardada exitosamente")
             
-            # Registrar venta en auditoría
-            detalles_venta = f"Total: ${total:.2f} | Productos: {len(self.carrito)} | Tipo: {tipo_venta_guardar}"
-            db.registrar_auditoria(
-                usuario=self.nombre_usuario,
-                tipo="venta",
-                descripcion=f"Venta realizada por ${total:.2f}",
-                detalles=detalles_venta
-            )
-            
             if generar_factura and FACTURAS_DISPONIBLE and self.generador_facturas:
                 print("DEBUG: Generando factura PDF...")
                 try:
                     items_factura = [
                         {
-                            "descripcion": item["producto"]["nombre"],
+                            "descripcion": item["producto"].nombre,
                             "cantidad": item["cantidad"],
-                            "precio": item["producto"]["precio"],
-                            "iva_porcentaje": item["producto"].get("iva_porcentaje", 16.0)
+                            "precio": item["producto"].precio,
+                            "iva_porcentaje": item["producto"].iva_porcentaje
                         }
-                        for item in self.carrito
+                        for item in carrito
                     ]
                     
                     ruta_factura = self.generador_facturas.generar_factura_pdf(
@@ -1404,7 +1106,7 @@ class MenuVentas:
             self.limpiar_carrito()
             self.actualizar_productos()
         else:
-            self.mostrar_mensaje_error("Error al procesar la venta en la base de datos")
+            self.mostrar_mensaje_error(mensaje)
 
     def enviar_factura_por_email(self, ruta_factura, correo_destino, nombre_cliente, total):
         """Envía la factura por correo electrónico usando la configuración guardada"""
@@ -1436,9 +1138,8 @@ class MenuVentas:
             ],
         )
         
-        # Mostrar diálogo
+        # Mostrar diálogo (page.open ya envía la página)
         self.page.open(self.progress_dialog)
-        self.page.update()
         
         # Función para agregar logs al diálogo con actualización forzada
         def agregar_log(mensaje, tipo="info"):
@@ -1454,12 +1155,8 @@ class MenuVentas:
                 ], spacing=8)
                 
                 self.progress_logs.controls.append(log_row)
-                # Forzar actualización - protegido para threads
-                try:
-                    self.progress_logs.update()
-                    self.page.update()
-                except:
-                    pass
+                # Se llama desde el hilo de envío: el planificador lo junta por cuadro
+                self._ui.actualizar(self.progress_logs, pantalla="menu_ventas")
             except Exception as ex:
                 print(f"Error agregando log: {ex}")
             time.sleep(0.3)  # Pequeña pausa para que se vea cada paso
@@ -1479,7 +1176,7 @@ class MenuVentas:
                         self.progress_dialog.actions = [
                             ft.TextButton("Cerrar", on_click=lambda e: self.page.close(self.progress_dialog)),
                         ]
-                        self.progress_dialog.update()
+                        self._ui.actualizar(self.progress_dialog, pantalla="menu_ventas")
                     except:
                         pass
                     print("ERROR: Configure el email en Configuraciones")
@@ -1575,7 +1272,7 @@ class MenuVentas:
                     self.progress_dialog.actions = [
                         ft.TextButton("Cerrar", on_click=lambda e: self.page.close(self.progress_dialog)),
                     ]
-                    self.progress_dialog.update()
+                    self._ui.actualizar(self.progress_dialog, pantalla="menu_ventas")
                 except:
                     pass
                 
@@ -1611,7 +1308,7 @@ class MenuVentas:
                     self.progress_dialog.actions = [
                         ft.TextButton("Cerrar", on_click=lambda e: self.page.close(self.progress_dialog)),
                     ]
-                    self.progress_dialog.update()
+                    self._ui.actualizar(self.progress_dialog, pantalla="menu_ventas")
                 except:
                     pass
                 
@@ -1631,7 +1328,7 @@ class MenuVentas:
                     self.progress_dialog.actions = [
                         ft.TextButton("Cerrar", on_click=lambda e: self.page.close(self.progress_dialog)),
                     ]
-                    self.progress_dialog.update()
+                    self._ui.actualizar(self.progress_dialog, pantalla="menu_ventas")
                 except:
                     pass
                 
@@ -1651,7 +1348,7 @@ class MenuVentas:
                     self.progress_dialog.actions = [
                         ft.TextButton("Cerrar", on_click=lambda e: self.page.close(self.progress_dialog)),
                     ]
-                    self.progress_dialog.update()
+                    self._ui.actualizar(self.progress_dialog, pantalla="menu_ventas")
                 except:
                     pass
                 
@@ -1672,7 +1369,7 @@ class MenuVentas:
 
     def eliminar_del_carrito(self, indice):
         if 0 <= indice < len(self.carrito):
-            producto_nombre = self.carrito[indice]["producto"]["nombre"]
+            producto_nombre = self.carrito[indice]["producto"].nombre
             self.carrito.pop(indice)
             self.actualizar_vista_carrito()
             self.calcular_total()
@@ -1721,10 +1418,7 @@ class MenuVentas:
     def calcular_total(self):
         _, _, total = self._calcular_totales_carrito()
         self.total_text.value = f"Total: ${total:.2f}"
-        try:
-            self.total_text.update()
-        except:
-            pass
+        self._ui.actualizar(self.total_text, pantalla="menu_ventas")
 
     def _calcular_totales_carrito(self):
         subtotal = 0.0
@@ -1732,26 +1426,13 @@ class MenuVentas:
         for item in self.carrito:
             producto = item["producto"]
             cantidad = item["cantidad"]
-            precio = float(producto.get("precio", 0))
+            precio = float(producto.precio)
             subtotal += precio * cantidad
-            iva_porcentaje = float(producto.get("iva_porcentaje", 16.0) or 0)
+            iva_porcentaje = float(producto.iva_porcentaje or 0)
             iva_total += (precio * cantidad) * (iva_porcentaje / 100)
         total = subtotal + iva_total
         return round(subtotal, 2), round(iva_total, 2), round(total, 2)
 
-    def _validar_stock_carrito(self, cursor):
-        for item in self.carrito:
-            producto_id = item["producto"]["id"]
-            cantidad = item["cantidad"]
-            cursor.execute("SELECT nombre, stock_actual FROM productos WHERE id = ?", (producto_id,))
-            row = cursor.fetchone()
-            if not row:
-                return False, "Producto no encontrado en inventario"
-            nombre_producto, stock_actual = row
-            if stock_actual < cantidad:
-                return False, f"Stock insuficiente para {nombre_producto}. Disponible: {stock_actual}"
-        return True, ""
-
     def mostrar_mensaje_exito(self, mensaje):
         try:
             snack = ft.SnackBar(
@@ -1765,7 +1446,7 @@ class MenuVentas:
             )
             self.page.overlay.append(snack)
             snack.open = True
-            self.page.update()
+            self._ui.actualizar(pantalla="menu_ventas")
         except Exception as ex:
             print(f"\u2705 {mensaje}")
 
@@ -1782,7 +1463,7 @@ class MenuVentas:
             )
             self.page.overlay.append(snack)
             snack.open = True
-            self.page.update()
+            self._ui.actualizar(pantalla="menu_ventas")
         except Exception as ex:
             print(f"\u274c {mensaje}")
 
@@ -1799,7 +1480,7 @@ class MenuVentas:
             )
             self.page.overlay.append(snack)
             snack.open = True
-            self.page.update()
+            self._ui.actualizar(pantalla="menu_ventas")
         except Exception as ex:
             print(f"ℹ️ {mensaje}")
 
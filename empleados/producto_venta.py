@@ -0,0 +1,48 @@
+"""
+ProductoVenta - Registro compacto de un producto en la caja
+Lo que la caja necesita de un producto (precio según el tipo de venta,
+stock, datos de la tarjeta) en un objeto con __slots__ en lugar de un dict
+de 17 llaves. MenuVentas los arma solo para el diálogo de cantidad, el
+escáner y el carrito; la lista completa son los RegistroProducto del
+catálogo compartido, con las tarifas ya calculadas
+"""
+
+from BuilderSql.registros import RegistroCompacto, indice_tarifa, MAYOREO, NORMAL
+
+
+class ProductoVenta(RegistroCompacto):
+    """Producto con stock disponible tal como lo muestra y cobra la caja"""
+
+    __slots__ = (
+        "id", "codigo_barras", "nombre", "descripcion",
+        "precio", "tipo_precio",
+        "stock", "stock_minimo", "imagen_path", "iva_porcentaje",
+        "minimo_mayoreo", "tarifas",
+    )
+
+    @classmethod
+    def desde_registro(cls, registro, tipo_venta: str, cantidad: int = None):
+        """Crea el producto de caja a partir de un RegistroProducto del catálogo"""
+        p = cls.__new__(cls)
+        p.id = registro.id
+        p.codigo_barras = registro.codigo_barras
+        p.nombre = registro.nombre
+        p.descripcion = registro.descripcion
+        p.stock = registro.stock_actual
+        p.stock_minimo = registro.stock_minimo
+        p.imagen_path = registro.imagen_path
+        p.iva_porcentaje = registro.iva_porcentaje if registro.iva_porcentaje is not None else 16.0
+        p.minimo_mayoreo = registro.minimo_mayoreo
+        p.tarifas = registro.tarifas
+        p.aplicar_tipo_venta(tipo_venta, cantidad)
+        return p
+
+    def aplicar_tipo_venta(self, tipo_venta: str, cantidad: int = None):
+        """
+        Fija precio y tipo_precio desde las tarifas precalculadas
+        Con cantidad, mayoreo solo aplica a partir de minimo_mayoreo piezas
+        """
+        i = indice_tarifa(tipo_venta)
+        if i == MAYOREO and cantidad is not None and cantidad < (self.minimo_mayoreo or 0):
+            i = NORMAL
+        self.precio, self.tipo_precio = self.tarifas[i * 2], self.tarifas[i * 2 + 1]
@@ -2,6 +2,7 @@ import flet as ft
 import asyncio
 from datetime import datetime, date
 from BASEDATOS import db
+from BuilderSql.planificador_ui import obtener_planificador
 
 class SalaEmpleados:
     """Sala de Empleados"""
@@ -18,6 +19,7 @@ class SalaEmpleados:
         self.reloj_hora = None
         self.reloj_fecha = None
         self.reloj_task = None
+        self._ui = obtener_planificador(self.page)
         
         # Paleta de colores premium
         self.colors = {
@@ -45,20 +47,26 @@ class SalaEmpleados:
         self.build_ui()
 
     def _actualizar_reloj(self):
-        """Actualiza la hora y fecha en pantalla"""
+        """Actualiza la hora y fecha en pantalla; devuelve los controles que cambiaron"""
         ahora = datetime.now()
-        if self.reloj_hora:
-            self.reloj_hora.value = ahora.strftime("%H:%M")
-        if self.reloj_fecha:
-            self.reloj_fecha.value = ahora.strftime("%A, %d %B %Y")
+        cambiados = []
+        for control, valor in (
+            (self.reloj_hora, ahora.strftime("%H:%M")),
+            (self.reloj_fecha, ahora.strftime("%A, %d %B %Y")),
+        ):
+            if control and control.value != valor:
+                control.value = valor
+                cambiados.append(control)
+        return cambiados
 
     async def _reloj_loop(self):
         """Bucle de actualizacion de reloj"""
         while True:
             try:
-                self._actualizar_reloj()
-                if self.page:
-                    self.page.update()
+                # La hora se muestra en minutos: solo se envía cuando cambia
+                cambiados = self._actualizar_reloj()
+                if self.page and cambiados:
+                    self._ui.actualizar(*cambiados, pantalla="sala_empleados")
             except Exception as e:
                 # Silenciar errores cuando la página cambia o se cierra
                 print(f"⚠️ Advertencia en reloj: {e}")
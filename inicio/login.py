@@ -1,6 +1,6 @@
 # login.py — versión final sin contenedor blanco y pantalla completa
 import flet as ft
-from mananger.user_manager import ADMIN_DB, USERS_DB
+from mananger.directorio_usuarios import obtener_directorio
 from admin_panels.admin_panel import AdminPanel
 from BASEDATOS import db
 import time
@@ -149,8 +149,7 @@ class LoginApp:
     # ---------- LOGIN ----------
 # ---------- LOGIN ----------
     def obtener_usuario(self, nombre_usuario):
-        return (ADMIN_DB.obtener(f"usuarios.{nombre_usuario}") or
-                USERS_DB.obtener(f"usuarios.{nombre_usuario}"))
+        return obtener_directorio().obtener(nombre_usuario)
 
     def validar_login(self, e):
         self.progress_ring.visible = True
@@ -171,9 +170,11 @@ class LoginApp:
         self.entrada_user.error_text = ""
         self.entrada_contraseña.error_text = ""
 
+        # Una búsqueda en el directorio en memoria (sin leer admin.json ni users.json)
+        registro = obtener_directorio().verificar(usuario, contraseña)
+
         # 1) ¿es admin?
-        admin_data = ADMIN_DB.obtener(f"usuarios.{usuario}")
-        if admin_data and admin_data.get("password") == contraseña:
+        if registro and registro["archivo"] == "admin.json":
             self.mensaje_login.value = ""
             self.page.update()
             # Registrar acceso en auditoría
@@ -187,8 +188,7 @@ class LoginApp:
             return
 
         # 2) ¿es empleado?
-        emp_data = USERS_DB.obtener(f"usuarios.{usuario}")
-        if emp_data and emp_data.get("password") == contraseña:
+        if registro:
             self.mensaje_login.value = ""
             self.page.update()
             # Registrar acceso en auditoría
@@ -0,0 +1,188 @@
+# directorio_usuarios.py
+"""
+DirectorioUsuarios - Índice en memoria de los usuarios de admin.json y users.json
+Se arma una vez y se mantiene al día con las notificaciones de JsonDB (solo se
+vuelve a leer el archivo que cambió). Búsqueda por usuario en O(1), índices
+secundarios por rol, estado y tipo, y listado paginado para la pantalla de usuarios
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class DirectorioUsuarios:
+    """Usuarios de uno o más JsonDB indexados por nombre, rol, estado y tipo"""
+
+    # Campos con índice secundario
+    CAMPOS_INDICE = ("rol", "estado", "tipo")
+
+    def __init__(self, fuentes):
+        """
+        Args:
+            fuentes: lista de (JsonDB, archivo, tipo_por_defecto) en orden de
+                     prioridad; si un usuario aparece en dos archivos gana el
+                     primero (igual que el login, que revisa admin.json antes)
+        """
+        self._fuentes = list(fuentes)
+        self._lock = threading.Lock()
+        self._por_archivo = {archivo: {} for _, archivo, _ in self._fuentes}
+        self._sucios = {archivo for _, archivo, _ in self._fuentes}
+        self._por_usuario = {}
+        self._indices = {campo: {} for campo in self.CAMPOS_INDICE}
+        self._orden = []
+        self._filtrados = {}
+        self._metricas = {"recargas_archivo": 0, "reconstrucciones": 0}
+        for db, archivo, _ in self._fuentes:
+            db.suscribir(lambda db, externo, archivo=archivo: self._marcar_sucio(archivo))
+
+    # ==================== SINCRONIZACIÓN ====================
+
+    def _marcar_sucio(self, archivo: str):
+        with self._lock:
+            self._sucios.add(archivo)
+
+    def _al_dia(self):
+        """Vuelve a leer solo los archivos que cambiaron desde la última vez"""
+        # version() revisa la firma del archivo: un cambio de otro proceso
+        # llega como notificación y marca el archivo como sucio
+        for db, _, _ in self._fuentes:
+            db.version()
+        with self._lock:
+            if not self._sucios:
+                return
+            sucios, self._sucios = self._sucios, set()
+
+        # Se lee fuera del lock propio: la notificación entra con el lock de
+        # JsonDB tomado y toma este, así nunca se esperan en orden cruzado
+        leidos = {}
+        for db, archivo, tipo_defecto in self._fuentes:
+            if archivo in sucios:
+                leidos[archivo] = self._leer(db, archivo, tipo_defecto)
+
+        with self._lock:
+            self._por_archivo.update(leidos)
+            self._metricas["recargas_archivo"] += len(leidos)
+            self._reconstruir()
+
+    @staticmethod
+    def _leer(db, archivo: str, tipo_defecto: str) -> Dict[str, dict]:
+        usuarios = db.obtener("usuarios") or {}
+        return {
+            nombre: {
+                "usuario": nombre,
+                "password": datos.get("password", ""),
+                "rol": datos.get("rol", ""),
+                "estado": datos.get("estado", ""),
+                "tipo": datos.get("tipo", tipo_defecto),
+                "archivo": archivo,
+            }
+            for nombre, datos in usuarios.items()
+        }
+
+    def _reconstruir(self):
+        """Índice principal, secundarios y orden del listado (con el lock tomado)"""
+        por_usuario = {}
+        for _, archivo, _ in reversed(self._fuentes):
+            por_usuario.update(self._por_archivo[archivo])
+        indices = {campo: {} for campo in self.CAMPOS_INDICE}
+        for nombre, registro in por_usuario.items():
+            for campo in self.CAMPOS_INDICE:
+                indices[campo].setdefault(registro[campo], set()).add(nombre)
+
+        prioridad = {archivo: i for i, (_, archivo, _) in enumerate(self._fuentes)}
+        self._orden = sorted(
+            por_usuario.values(),
+            key=lambda r: (prioridad[r["archivo"]], r["usuario"].casefold(), r["usuario"])
+        )
+        self._por_usuario = por_usuario
+        self._indices = indices
+        self._filtrados = {}
+        self._metricas["reconstrucciones"] += 1
+
+    # ==================== CONSULTAS ====================
+
+    def obtener(self, usuario: str) -> Optional[dict]:
+        """
+        Registro del usuario (usuario, password, rol, estado, tipo, archivo) o None
+        El dict se comparte: no debe modificarse
+        """
+        self._al_dia()
+        return self._por_usuario.get(usuario)
+
+    def existe(self, usuario: str) -> bool:
+        return self.obtener(usuario) is not None
+
+    def verificar(self, usuario: str, password: str) -> Optional[dict]:
+        """Registro del usuario si la contraseña coincide, si no None"""
+        registro = self.obtener(usuario)
+        if registro is not None and registro["password"] == password:
+            return registro
+        return None
+
+    def usuarios_con(self, campo: str, valor: str) -> set:
+        """Nombres de usuario con campo == valor (campo en CAMPOS_INDICE)"""
+        self._al_dia()
+        return set(self._indices[campo].get(valor, ()))
+
+    def valores(self, campo: str) -> List[str]:
+        """Valores distintos de un campo indexado (ej: roles en uso)"""
+        self._al_dia()
+        return sorted(self._indices[campo])
+
+    def listar(self, rol: str = None, estado: str = None, tipo: str = None) -> List[dict]:
+        """
+        Usuarios en el orden del listado (admin.json primero, luego por nombre)
+        Los filtros en None no se aplican; la lista se comparte: no debe modificarse
+        """
+        self._al_dia()
+        filtro = (rol, estado, tipo)
+        with self._lock:
+            if filtro == (None, None, None):
+                return self._orden
+            lista = self._filtrados.get(filtro)
+            if lista is None:
+                nombres = None
+                for campo, valor in zip(self.CAMPOS_INDICE, filtro):
+                    if valor is None:
+                        continue
+                    conjunto = self._indices[campo].get(valor, set())
+                    nombres = conjunto if nombres is None else nombres & conjunto
+                lista = [r for r in self._orden if r["usuario"] in nombres]
+                self._filtrados[filtro] = lista
+            return lista
+
+    def pagina(self, numero: int = 1, por_pagina: int = 50, **filtros) -> Tuple[List[dict], int]:
+        """
+        Una página del listado
+        Args:
+            numero: página, empezando en 1
+            por_pagina: usuarios por página
+            filtros: rol, estado y/o tipo (ver listar)
+        Returns:
+            tuple: (usuarios de la página, total de usuarios con esos filtros)
+        """
+        lista = self.listar(**filtros)
+        inicio = (max(numero, 1) - 1) * por_pagina
+        return lista[inicio:inicio + por_pagina], len(lista)
+
+    def metricas(self) -> dict:
+        with self._lock:
+            return dict(self._metricas, usuarios=len(self._por_usuario))
+
+
+_directorio = None
+_directorio_lock = threading.Lock()
+
+
+def obtener_directorio() -> DirectorioUsuarios:
+    """Directorio compartido de admin.json + users.json"""
+    global _directorio
+    if _directorio is None:
+        with _directorio_lock:
+            if _directorio is None:
+                from mananger.user_manager import ADMIN_DB, USERS_DB
+                _directorio = DirectorioUsuarios([
+                    (ADMIN_DB, "admin.json", "admin"),
+                    (USERS_DB, "users.json", "empleado"),
+                ])
+    return _directorio
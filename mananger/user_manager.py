@@ -58,50 +58,63 @@ def crear_usuario(username: str,
         })
 
 def listar_todos() -> List[Dict[str, Any]]:
-    """Flat list with every user (admins + employees)."""
-    usuarios = []
-    
-    # Obtener usuarios de admin.json
-    admins = ADMIN_DB.obtener("usuarios") or {}
-    for username, data in admins.items():
-        usuarios.append({
-            "usuario": username,
-            "password": data.get("password", ""),
-            "rol": data.get("rol", ""),
-            "estado": data.get("estado", ""),
-            "tipo": data.get("tipo", "admin")
-        })
-    
-    # Obtener usuarios de users.json
-    empls = USERS_DB.obtener("usuarios") or {}
-    for username, data in empls.items():
-        usuarios.append({
-            "usuario": username,
-            "password": data.get("password", ""),
-            "rol": data.get("rol", ""),
-            "estado": data.get("estado", ""),
-            "tipo": data.get("tipo", "empleado")
-        })
-    
-    return usuarios
+    """
+    Flat list with every user (admins + employees), from the shared
+    in-memory directory. The dicts are shared: do not modify them.
+    """
+    from mananger.directorio_usuarios import obtener_directorio
+    return obtener_directorio().listar()
 
 def usuario_existe(username: str) -> bool:
-    return ADMIN_DB.existe(_key(username)) or USERS_DB.existe(_key(username))
+    from mananger.directorio_usuarios import obtener_directorio
+    return obtener_directorio().existe(username)
+
+def importar_usuarios(usuarios: List[Dict[str, Any]]) -> int:
+    """
+    Alta masiva: crea o reemplaza cada usuario con una sola escritura (y un
+    solo respaldo) por archivo. Cada elemento usa las llaves de crear_usuario
+    (username, password, rol, estado, tipo). Devuelve cuántos usuarios se
+    guardaron.
+    
+    Todos los elementos se validan antes de escribir: si a alguno le falta
+    una llave no se guarda ninguno. La escritura es atómica por archivo
+    (admin.json y users.json se escriben por separado): si falla la de uno,
+    el otro puede ya haber quedado guardado.
+    """
+    # Se arma todo antes de tocar los archivos
+    por_archivo = {ADMIN_DB: [], USERS_DB: []}
+    for u in usuarios:
+        tipo = u.get("tipo", "empleado")
+        por_archivo[ADMIN_DB if tipo == "admin" else USERS_DB].append((u["username"], {
+            "password": u["password"],
+            "rol": u.get("rol", "Empleado"),
+            "estado": u.get("estado", "Activo"),
+            "tipo": tipo
+        }))
+    
+    for db, registros in por_archivo.items():
+        if not registros:
+            continue
+        with db.transaccion():
+            for username, datos in registros:
+                db.guardar(_key(username), datos)
+    return len(usuarios)
 
 def actualizar_usuario(username: str, cambios: dict):
     """Actualiza cualquier campo de un usuario existente."""
-    if ADMIN_DB.existe(_key(username)):
-        ADMIN_DB.actualizar(_key(username), cambios)
-    elif USERS_DB.existe(_key(username)):
-        USERS_DB.actualizar(_key(username), cambios)
-    else:
-        raise KeyError("Usuario no encontrado")
+    for db in (ADMIN_DB, USERS_DB):
+        # Revisar y actualizar bajo el mismo lock
+        with db.transaccion():
+            if db.existe(_key(username)):
+                db.actualizar(_key(username), cambios)
+                return
+    raise KeyError("Usuario no encontrado")
 
 def eliminar_usuario(username: str):
     """Borra el usuario del archivo que corresponda."""
-    if ADMIN_DB.existe(_key(username)):
-        ADMIN_DB.eliminar(_key(username))
-    elif USERS_DB.existe(_key(username)):
-        USERS_DB.eliminar(_key(username))
-    else:
-        raise KeyError("Usuario no encontrado")
\ No newline at end of file
+    for db in (ADMIN_DB, USERS_DB):
+        with db.transaccion():
+            if db.existe(_key(username)):
+                db.eliminar(_key(username))
+                return
+    raise KeyError("Usuario no encontrado")
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Pruebas de JsonDBBitacora: compactación con cambios de otro proceso
+"""
+
+import os
+import tempfile
+import unittest
+
+from JsonSpace.JsonBitacora import JsonDBBitacora
+
+
+class TestCompactacion(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, "datos.json")
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_cambio_externo_durante_compactacion_no_se_pierde(self):
+        a = JsonDBBitacora(self.ruta, respaldos=False, fsync=False)
+        b = JsonDBBitacora(self.ruta, respaldos=False, fsync=False)
+        a.guardar("x", 1)
+
+        # A toma la foto; B escribe antes de que A reemplace foto y bitácora
+        with a._lock:
+            datos = a._leer_datos()
+            hasta = a._tam_bitacora
+            foto = a._firma[0]
+        b.guardar("y", 2)
+        a._reemplazar_foto(a._serializar(datos), hasta, foto)
+
+        self.assertEqual(a.obtener("y"), 2)
+        self.assertEqual(JsonDBBitacora(self.ruta).obtener("y"), 2)
+
+        # Un set de la raíz desde A ya no pisa el cambio de B
+        a.guardar("z", 3)
+        self.assertEqual(JsonDBBitacora(self.ruta).todo(copia=True), {"x": 1, "y": 2, "z": 3})
+
+    def test_compactacion_sin_cambios_externos_conserva_cache(self):
+        db = JsonDBBitacora(self.ruta, respaldos=False, fsync=False)
+        db.guardar("x", 1)
+        db.compactar()
+        self.assertIsNotNone(db._firma)
+        self.assertEqual(db.obtener("x"), 1)
+        self.assertEqual(os.path.getsize(db.ruta_bitacora), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Pruebas de SumideroAuditoria: filas inválidas y errores transitorios
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from BuilderSql.sumidero_auditoria import SumideroAuditoria
+
+
+class TestSumidero(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, "ventas.db")
+        con = sqlite3.connect(self.ruta)
+        con.execute("""
+            CREATE TABLE auditoria(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fecha_hora TEXT NOT NULL,
+                usuario TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                descripcion TEXT,
+                detalles TEXT,
+                CHECK (tipo <> 'invalido')
+            )
+        """)
+        con.commit()
+        con.close()
+        self.sumidero = SumideroAuditoria(self._conectar, intervalo=60)
+
+    def tearDown(self):
+        self.sumidero.cerrar()
+        self.directorio.cleanup()
+
+    def _conectar(self):
+        return sqlite3.connect(self.ruta)
+
+    def _filas(self):
+        con = self._conectar()
+        try:
+            return con.execute("SELECT usuario, tipo FROM auditoria ORDER BY id").fetchall()
+        finally:
+            con.close()
+
+    def test_usuario_none_no_traba_la_cola(self):
+        self.sumidero.registrar("2024-01-01 10:00:00", None, "login", "x")
+        self.sumidero.registrar("2024-01-01 10:00:01", "ana", "login", "y")
+        self.assertTrue(self.sumidero.vaciar())
+        self.assertEqual(self._filas(), [("", "login"), ("ana", "login")])
+
+    def test_fila_rechazada_se_descarta_y_el_resto_se_escribe(self):
+        self.sumidero.registrar("2024-01-01 10:00:00", "ana", "login", "x")
+        self.sumidero.registrar("2024-01-01 10:00:01", "ana", "invalido", "x")
+        self.sumidero.registrar("2024-01-01 10:00:02", "luis", "venta", "y")
+        self.assertTrue(self.sumidero.vaciar())
+
+        self.assertEqual(self._filas(), [("ana", "login"), ("luis", "venta")])
+        metricas = self.sumidero.metricas()
+        self.assertEqual(metricas["pendientes"], 0)
+        self.assertEqual(metricas["escritos"], 2)
+        self.assertEqual(metricas["descartados"], 1)
+
+    def test_base_bloqueada_conserva_el_lote(self):
+        bloqueo = self._conectar()
+        bloqueo.execute("BEGIN EXCLUSIVE")
+        self.sumidero._obtener_conexion = lambda: sqlite3.connect(self.ruta, timeout=0)
+        self.sumidero.registrar("2024-01-01 10:00:00", "ana", "login", "x")
+        self.assertFalse(self.sumidero.vaciar())
+        self.assertEqual(self.sumidero.metricas()["pendientes"], 1)
+
+        bloqueo.rollback()
+        bloqueo.close()
+        self.assertTrue(self.sumidero.vaciar())
+        self.assertEqual(self._filas(), [("ana", "login")])
+
+
+if __name__ == "__main__":
+    unittest.main()